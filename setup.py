@@ -36,6 +36,9 @@ if __name__ == "__main__":
                 "greenlet==1.1.2",
                 "anyio==3.5.0"
             ],
+            'orjson': [
+                "orjson==3.6.5"
+            ],
         },
         python_requires=">=3.7",
         description="A comprehensive FastaAPI's CRUD router generator for SQLALchemy.",
@@ -1,16 +1,20 @@
 import asyncio
 import inspect
+import os
 from functools import partial
 from typing import \
     Any, \
     List, \
-    TypeVar, Union, Callable, Optional
+    TypeVar, Union, Callable, Optional, Type
 
+import fastapi
 from fastapi import \
     Depends, APIRouter
 from pydantic import \
     BaseModel
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
 from sqlalchemy.sql.schema import Table
+from starlette.responses import JSONResponse
 
 from . import sqlalchemy_to_pydantic
 from .misc.abstract_execute import SQLALchemyExecuteService
@@ -19,10 +23,22 @@ from .misc.abstract_query import SQLAlchemyPGSQLQueryService, \
     SQLAlchemySQLITEQueryService, SQLAlchemyNotSupportQueryService
 from .misc.abstract_route import SQLAlchemySQLLiteRouteSource, SQLAlchemyPGSQLRouteSource, \
     SQLAlchemyNotSupportRouteSource
-from .misc.crud_model import CRUDModel
-from .misc.memory_sql import async_memory_db, sync_memory_db
-from .misc.type import CrudMethods, SqlType
-from .misc.utils import convert_table_to_model, Base
+from .misc.batch import add_batch_route, batch_session
+from .misc.crud_model import CRUDModel, REQUEST_METHODS
+from .misc.coalescer import FindOneCoalescer
+from .misc.exceptions import RelationLoadingNotSupportedException, CoalescingNotSupportedException, \
+    SQLiteWriteQueueNotSupportedException, AsyncModeMismatchException
+from .misc.lazy_route import LazyAPIRoute, LazyEndpoint
+from .misc.memory_sql import async_memory_db, sync_memory_db, MemorySql
+from .misc.sqlite_writer import QueuedRoutes, SQLiteWriter
+from .misc.openapi import attach_openapi_fragment, load_openapi_fragment, render_openapi_fragment
+from .misc.read_session import ReadSessionRouter
+from .misc.response_cache import ResponseCache, ResponseCacheBackend
+from .misc.schema_builder import schema_hash
+from .misc.type import CrudMethods, SqlType, PaginationMode, CountStrategy, StreamFormat, WriteMode, \
+    CRUDRequestMapping, ReadSessionPolicy, RelationLoading
+from .misc.utils import convert_table_to_model, Base, api_parameter_schema_builder, check_crud_method, \
+    crud_method_to_pydantic
 
 CRUDModelType = TypeVar("CRUDModelType", bound=BaseModel)
 CompulsoryQueryModelType = TypeVar("CompulsoryQueryModelType", bound=BaseModel)
@@ -33,6 +49,7 @@ def crud_router_builder(
         *,
         db_model: Union[Table, 'DeclarativeBaseModel'],
         db_session: Callable = None,
+        memory_db: Optional[MemorySql] = None,
         autocommit: bool = True,
         crud_methods: Optional[List[CrudMethods]] = None,
         exclude_columns: Optional[List[str]] = None,
@@ -41,6 +58,36 @@ def crud_router_builder(
         async_mode: Optional[bool] = None,
         foreign_include: Optional[Base] = None,
         sql_type: Optional[SqlType] = None,
+        pagination_mode: PaginationMode = PaginationMode.offset,
+        count_strategy: Optional[CountStrategy] = None,
+        count_cache_ttl: float = 60,
+        stream_format: Optional[StreamFormat] = None,
+        stream_chunk_size: int = 1000,
+        write_mode: WriteMode = WriteMode.orm,
+        statement_cache_size: int = 512,
+        response_class: Optional[Type[JSONResponse]] = None,
+        lazy: bool = False,
+        prerender_openapi: bool = False,
+        openapi_cache_dir: Optional[str] = None,
+        read_db_session: Optional[Union[Callable, List[Callable]]] = None,
+        read_session_policy: ReadSessionPolicy = ReadSessionPolicy.round_robin,
+        read_your_writes_seconds: float = 0,
+        read_your_writes_key: str = 'quickcrud-read-your-writes',
+        read_your_writes_secret: Optional[Union[str, bytes]] = None,
+        response_cache: Optional[ResponseCacheBackend] = None,
+        response_cache_ttl: float = 60,
+        response_cache_stale_ttl: float = 0,
+        response_cache_refresh_ahead: Optional[float] = None,
+        etag: bool = False,
+        etag_column: Optional[str] = None,
+        sparse_fieldsets: bool = False,
+        default_fields: Optional[List[str]] = None,
+        relation_loading: RelationLoading = RelationLoading.join,
+        batch_path: Optional[str] = None,
+        find_one_coalesce_window: Optional[float] = None,
+        find_one_coalesce_max_keys: int = 100,
+        sqlite_write_queue: bool = False,
+        sqlite_write_group_size: int = 64,
         **router_kwargs: Any) -> APIRouter:
     """
     @param db_model:
@@ -49,6 +96,12 @@ def crud_router_builder(
     @param db_session:
         The callable variable and return a session generator that will be used to get database connection session for fastapi.
 
+    @param memory_db:
+        the embedded SQLite database of the router if db_session is not given, default is an in-memory database on
+        one connection, e.g. MemorySql(database='app.db') for a file database in WAL mode, whose reads run on a pool
+        of read connections (from fastapi_quickcrud.misc.memory_sql import MemorySql), the table is created,
+        async_mode should be the async_mode of memory_db if it is given
+
     @param autocommit:
         set False if you handle commit in your db_session.
 
@@ -84,6 +137,167 @@ def crud_router_builder(
     @param sql_type:
         You sql database type
 
+    @param pagination_mode:
+        PaginationMode.offset (default) paginate FIND_MANY by limit/offset,
+        PaginationMode.cursor paginate FIND_MANY by an opaque cursor from the next_cursor response header,
+        the page is located by a seek predicate on order_by_columns + primary key instead of skipping rows
+
+    @param count_strategy:
+        how to count the x-total-count header of find many api, default is the count of the returned page
+        CountStrategy.exact: a COUNT query, run on a second connection at the same time as the page query in async mode
+        CountStrategy.window: COUNT(*) OVER() in the page query
+        CountStrategy.estimated: the row estimate of PostgreSQL (reltuples/query planner) or SQLite (sqlite_stat1),
+                                 fallback to exact if the estimate is not available
+        CountStrategy.cached: the exact count memoized by the filter for count_cache_ttl seconds
+
+    @param count_cache_ttl:
+        seconds, the time to live of the memoized count of CountStrategy.cached
+
+    @param stream_format:
+        stream the response of FIND_MANY and FIND_MANY_WITH_FOREIGN_TREE with a server side cursor
+        instead of loading the whole result into memory,
+        StreamFormat.ndjson: one json object per line (application/x-ndjson)
+        StreamFormat.json_array: an incrementally encoded json array (application/json)
+
+    @param stream_chunk_size:
+        the number of rows fetched, validated and encoded at a time when stream_format is set
+
+    @param write_mode:
+        WriteMode.orm (default) load the matched rows as ORM instances and write them by the unit of work,
+        WriteMode.core write by set based statements with RETURNING (PostgreSQL, SQLite >= 3.35),
+        e.g. PATCH_MANY/UPDATE_MANY run one UPDATE ... WHERE ... RETURNING, DELETE_MANY runs one DELETE ... RETURNING,
+        CREATE_MANY runs multi rows INSERT ... VALUES ... RETURNING in batches,
+        fallback to WriteMode.orm if the database does not support RETURNING
+
+    @param statement_cache_size:
+        the max number of query shapes (the filter keys and operators, order by, join, limit/offset presence)
+        of FIND_ONE/FIND_MANY to cache the generated select statement, the values of the request are bound
+        as parameters, 0 to build the statement for each request
+
+    @param response_class:
+        a JSONResponse class which FIND_ONE, FIND_MANY and FIND_MANY_WITH_FOREIGN_TREE return the rows in directly,
+        e.g. ORJSONResponse (from fastapi_quickcrud.misc.response import ORJSONResponse, requires orjson),
+        the rows are only projected to the fields of the response model instead of validated and encoded by
+        the response_model of fastapi, which still documents the response in the OpenAPI schema
+
+    @param lazy:
+        register lightweight placeholder routes and build the request/response models and the endpoint of each
+        crud method on its first request or the generation of the OpenAPI schema, instead of all of them up front,
+        the routes of FIND_ONE_WITH_FOREIGN_TREE/FIND_MANY_WITH_FOREIGN_TREE are still built up front,
+        ignored if crud_models is given
+
+    @param prerender_openapi:
+        render the OpenAPI operations and schemas of the router at build time, the app merges them instead of
+        generating them if app.openapi = openapi_with_fragments(app)
+        (from fastapi_quickcrud.misc.openapi import openapi_with_fragments)
+
+    @param openapi_cache_dir:
+        prerender the OpenAPI of the router into a json file of this directory, named by the hash of the table,
+        the arguments and the routes of the router, the file is loaded instead if it exists,
+        so that the routes of lazy mode are not built for the OpenAPI, ignored if crud_models is given
+
+    @param read_db_session:
+        the session generator, or a list of them, of the read replicas, which FIND_ONE, FIND_MANY,
+        FIND_ONE_WITH_FOREIGN_TREE and FIND_MANY_WITH_FOREIGN_TREE get the session from instead of db_session,
+        the session generators take no dependency
+
+    @param read_session_policy:
+        how to select one of the read_db_session for a request,
+        ReadSessionPolicy.round_robin (default) or ReadSessionPolicy.random
+
+    @param read_your_writes_seconds:
+        seconds, the client which wrote through the router reads from db_session in this window,
+        the client is marked by the cookie read_your_writes_key set by the write APIs,
+        or the header of the same name which the client without cookies copies from the response of the write,
+        0 (default) to read from read_db_session always
+
+    @param read_your_writes_key:
+        the name of the cookie and the header of read_your_writes_seconds
+
+    @param read_your_writes_secret:
+        the key of the HMAC which signs the mark of read_your_writes_key, default is a random key of the process,
+        the processes behind a load balancer should be given the same secret
+
+    @param response_cache:
+        a ResponseCacheBackend which caches the responses of FIND_ONE and FIND_MANY by the path and the query,
+        e.g. MemoryResponseCacheBackend (from fastapi_quickcrud.misc.response_cache import MemoryResponseCacheBackend)
+        for an in-process LRU, or a subclass implementing the async methods for a shared store in async mode,
+        the write APIs of the router invalidate the responses of the written primary key, or of the whole table,
+        once their session commits, the x-cache response header is HIT, STALE or MISS,
+        the counters are exposed by router.response_cache.stats, not applied to stream_format
+
+    @param response_cache_ttl:
+        seconds, the time to live of the cached response
+
+    @param response_cache_stale_ttl:
+        seconds, return the expired response in this time after response_cache_ttl and refresh it in the background
+
+    @param response_cache_refresh_ahead:
+        0 - 1, refresh the cached response in the background when it is requested after this fraction of
+        response_cache_ttl, so that the hot responses do not expire
+
+    @param etag:
+        set the ETag header of FIND_ONE and FIND_MANY, and return 304 Not Modified if it matches the If-None-Match
+        of the request, the ETag is the hash of the shaped rows, or built from etag_column if it is set
+
+    @param etag_column:
+        a version column, e.g. updated_at, the ETag is built from the max of it and the count of the rows matched by
+        the filters, which are queried before the rows, so that the rows are not fetched and serialized if it matches,
+        the changes of the joined tables do not change it, implies etag
+
+    @param sparse_fieldsets:
+        add the fields query parameter to FIND_ONE and FIND_MANY, which narrows the select, the columns of
+        join_foreign_table (<table>.<column>) and the response to the given columns, the primary key is always in it
+
+    @param default_fields:
+        the columns of FIND_MANY if the fields query parameter is not given, e.g. leave the heavy columns out of
+        the list
+
+    @param relation_loading:
+        how to load the tables of join_foreign_table in FIND_ONE, FIND_MANY and the foreign tree APIs,
+        RelationLoading.join (default): inner join them into the select, the rows of a parent are repeated by the
+                                        product of its related rows, and limit/offset apply to the joined rows
+        RelationLoading.select_in: select the page of the parent rows, then the related rows of each table by one
+                                   query of the keys of the parents, on their own connections at the same time in
+                                   async mode if the engine has a connection pool, not applied to stream_format
+        RelationLoading.json_agg: aggregate the related rows of each table into a json array per parent row in the
+                                  database (json_agg of PostgreSQL, json_group_array of SQLite), the BLOB columns
+                                  are not supported by SQLite
+        the parents without related rows are returned with an empty list by select_in and json_agg
+
+    @param batch_path:
+        add a POST route of this path, e.g. /test/batch, which runs an ordered list of operations
+        ({"id", "method", "path", "query", "body"}) by the routes of this router on one session and one transaction,
+        and returns the status code, the headers and the body of each operation. The operations can reference the
+        response bodies of the earlier operations by ${<id or index>.<key>...}, e.g. {"parent_id": "${parent.id}"}.
+        The batch stops at the first operation responding an error status, rolls back and responds that status,
+        see also batch_router_builder (from fastapi_quickcrud.misc.batch import batch_router_builder)
+        for the batch across routers
+
+    @param find_one_coalesce_window:
+        seconds, e.g. 0.002, coalesce the FIND_ONE requests of different primary keys arriving in this window into
+        one WHERE pk IN (...) query, which runs on the session of the first request of the window, and the requests
+        of a primary key being queried wait for the rows of that query instead of querying again (single flight),
+        the requests with join_foreign_table or the other query parameters are not coalesced, async mode only,
+        the counters are exposed by router.find_one_coalescer.stats
+
+    @param find_one_coalesce_max_keys:
+        the query of find_one_coalesce_window runs before the end of the window once it has this number of primary
+        keys
+
+    @param sqlite_write_queue:
+        SQLite only, the write APIs queue in the event loop for one writer connection of the engine of db_session,
+        shared by the routers of the engine, instead of fighting over the lock of the database, the writer
+        connection runs on a thread of its own, each write runs with its own session in a SAVEPOINT, and the writes
+        which finish while others are queued are committed by one COMMIT (group commit) before their responses,
+        the read APIs keep running on the other connections of the pool at the same time,
+        the engine should have a connection pool (not StaticPool), e.g. MemorySql(True, database='app.db'),
+        the writes are committed by the group even if autocommit is False,
+        the counters are exposed by router.sqlite_writer.stats
+
+    @param sqlite_write_group_size:
+        the max number of the writes committed by one COMMIT of sqlite_write_queue
+
     @param router_kwargs:
         other argument for FastApi's views
 
@@ -93,20 +307,41 @@ def crud_router_builder(
 
     db_model, NO_PRIMARY_KEY = convert_table_to_model(db_model)
 
+    if stream_format and relation_loading == RelationLoading.select_in:
+        raise RelationLoadingNotSupportedException(f'{relation_loading} is not supported by stream_format')
+
     constraints = db_model.__table__.constraints
 
     if db_session is None:
-        if async_mode:
+        if memory_db is not None:
+            if async_mode is not None and async_mode != memory_db.async_mode:
+                raise AsyncModeMismatchException(f'async_mode is {async_mode} but the async_mode of memory_db is '
+                                                 f'{memory_db.async_mode}')
+            db_connection = memory_db
+            async_mode = memory_db.async_mode
+        elif async_mode:
             db_connection = async_memory_db
-            db_session: Callable = db_connection.async_get_memory_db_session
         else:
             db_connection = sync_memory_db
-            db_session: Callable = db_connection.get_memory_db_session
+        db_session: Callable = db_connection.get_db_session()
+        if read_db_session is None:
+            read_db_session = db_connection.get_read_db_session()
         db_connection.create_memory_table(db_model)
 
     if async_mode is None:
         async_mode = inspect.isasyncgen(db_session())
 
+    read_session_router = None
+    read_session = db_session
+    if read_db_session is not None:
+        read_session_router = ReadSessionRouter(db_session,
+                                                read_db_session,
+                                                policy=read_session_policy,
+                                                read_your_writes_seconds=read_your_writes_seconds,
+                                                read_your_writes_key=read_your_writes_key,
+                                                read_your_writes_secret=read_your_writes_secret)
+        read_session = read_session_router.read_db_session()
+
     if sql_type is None:
         async def async_runner(f):
             return [i.bind.name async for i in f()]
@@ -120,6 +355,30 @@ def crud_router_builder(
             raise RuntimeError("Some unknown problem occurred error, maybe you are uvicorn.run with reload=True. "
                                "Try declaring sql_type for crud_router_builder yourself using from fastapi_quickcrud.misc.type import SqlType")
 
+    batch_db_session = db_session
+    # the routes share the session of the batch if the request is an operation of a batch
+    db_session = batch_session(db_session)
+    read_session = db_session if read_session_router is None else batch_session(read_session)
+
+    sqlite_writer = None
+    if sqlite_write_queue:
+        if sql_type != SqlType.sqlite:
+            raise SQLiteWriteQueueNotSupportedException('sqlite_write_queue is supported by SQLite only')
+
+        async def async_bind_runner(f):
+            return [i.bind async for i in f()]
+
+        if async_mode:
+            bind, = asyncio.get_event_loop().run_until_complete(async_bind_runner(batch_db_session))
+        else:
+            bind, = [i.bind for i in batch_db_session()]
+        if isinstance(getattr(bind, 'sync_engine', bind).pool, (StaticPool, SingletonThreadPool)):
+            raise SQLiteWriteQueueNotSupportedException('sqlite_write_queue needs the engine with a connection pool, '
+                                                        'the writer connection is not shared with the reads')
+        sqlite_writer = SQLiteWriter.of(bind, max_group_size=sqlite_write_group_size)
+        # the write APIs get the session of the writer connection
+        db_session = sqlite_writer.session_dependency()
+
     if not crud_methods and NO_PRIMARY_KEY == False:
         crud_methods = CrudMethods.get_declarative_model_full_crud_method()
     if not crud_methods and NO_PRIMARY_KEY == True:
@@ -136,7 +395,22 @@ def crud_router_builder(
         routes_source = SQLAlchemyNotSupportRouteSource
         query_service = SQLAlchemyNotSupportQueryService
 
-    if not crud_models:
+    user_crud_models = crud_models is not None
+    lazy_model_builder = None
+    if not crud_models and lazy:
+        lazy_model_builder = api_parameter_schema_builder(db_model,
+                                                          constraints=constraints,
+                                                          exclude_columns=exclude_columns,
+                                                          sql_type=sql_type,
+                                                          foreign_include=foreign_include,
+                                                          exclude_primary_key=NO_PRIMARY_KEY,
+                                                          pagination_mode=pagination_mode,
+                                                          sparse_fieldsets=sparse_fieldsets)
+        for crud_method in crud_methods:
+            check_crud_method(lazy_model_builder, crud_method)
+        crud_models = CRUDModel(PRIMARY_KEY_NAME=lazy_model_builder.primary_key_str,
+                                UNIQUE_LIST=lazy_model_builder.unique_fields)
+    elif not crud_models:
         crud_models_builder: CRUDModel = sqlalchemy_to_pydantic
         crud_models: CRUDModel = crud_models_builder(db_model=db_model,
                                                      constraints=constraints,
@@ -144,20 +418,31 @@ def crud_router_builder(
                                                      exclude_columns=exclude_columns,
                                                      sql_type=sql_type,
                                                      foreign_include=foreign_include,
-                                                     exclude_primary_key=NO_PRIMARY_KEY)
+                                                     exclude_primary_key=NO_PRIMARY_KEY,
+                                                     pagination_mode=pagination_mode,
+                                                     sparse_fieldsets=sparse_fieldsets)
 
     foreign_table_mapping = {db_model.__tablename__: db_model}
     if foreign_include:
         for i in foreign_include:
             model , _= convert_table_to_model(i)
             foreign_table_mapping[model.__tablename__] = i
-    crud_service = query_service(model=db_model, async_mode=async_mode, foreign_table_mapping=foreign_table_mapping)
+    crud_service = query_service(model=db_model, async_mode=async_mode, foreign_table_mapping=foreign_table_mapping,
+                                 pagination_mode=pagination_mode, count_strategy=count_strategy,
+                                 write_mode=write_mode, statement_cache_size=statement_cache_size,
+                                 etag_column=etag_column, default_fields=default_fields,
+                                 relation_loading=relation_loading)
     # else:
     #     crud_service = SQLAlchemyPostgreQueryService(model=db_model, async_mode=async_mode)
 
     result_parser = result_parser_builder(async_model=async_mode,
                                           crud_models=crud_models,
-                                          autocommit=autocommit)
+                                          autocommit=autocommit,
+                                          stream_format=stream_format,
+                                          stream_chunk_size=stream_chunk_size,
+                                          response_class=response_class,
+                                          etag_by_payload=etag and etag_column is None,
+                                          relation_loading=relation_loading)
     methods_dependencies = crud_models.get_available_request_method()
     primary_name = crud_models.PRIMARY_KEY_NAME
     if primary_name:
@@ -166,9 +451,27 @@ def crud_router_builder(
         path = ""
     unique_list: List[str] = crud_models.UNIQUE_LIST
 
-    execute_service = SQLALchemyExecuteService()
-
-    def find_one_api(request_response_model: dict, dependencies):
+    execute_service = SQLALchemyExecuteService(count_strategy=count_strategy, count_cache_ttl=count_cache_ttl)
+
+    read_response_cache = None
+    if response_cache is not None:
+        read_response_cache = ResponseCache(response_cache,
+                                            namespace=f'quickcrud:{db_model.__tablename__}',
+                                            primary_key_name=primary_name,
+                                            ttl=response_cache_ttl,
+                                            stale_ttl=response_cache_stale_ttl,
+                                            refresh_ahead=response_cache_refresh_ahead)
+
+    find_one_coalescer = None
+    if find_one_coalesce_window is not None:
+        if not async_mode:
+            raise CoalescingNotSupportedException('find_one_coalesce_window is supported in async mode only')
+        find_one_coalescer = FindOneCoalescer(query_service=crud_service,
+                                              execute_service=execute_service,
+                                              window=find_one_coalesce_window,
+                                              max_keys=find_one_coalesce_max_keys)
+
+    def find_one_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
         _request_url_param_model = request_response_model.get('requestUrlParamModel', None)
@@ -176,29 +479,32 @@ def crud_router_builder(
                                request_url_param_model=_request_url_param_model,
                                request_query_model=_request_query_model,
                                response_model=_response_model,
-                               db_session=db_session,
+                               db_session=read_session,
                                query_service=crud_service,
                                parsing_service=result_parser,
                                execute_service=execute_service,
                                dependencies=dependencies,
                                api=api,
-                               async_mode=async_mode)
+                               async_mode=async_mode,
+                               response_cache=read_response_cache,
+                               coalescer=find_one_coalescer)
 
-    def find_many_api(request_response_model: dict, dependencies):
+    def find_many_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
         routes_source.find_many(path="",
                                 request_query_model=_request_query_model,
                                 response_model=_response_model,
-                                db_session=db_session,
+                                db_session=read_session,
                                 query_service=crud_service,
                                 parsing_service=result_parser,
                                 execute_service=execute_service,
                                 dependencies=dependencies,
                                 api=api,
-                                async_mode=async_mode)
+                                async_mode=async_mode,
+                                response_cache=None if stream_format else read_response_cache)
 
-    def upsert_one_api(request_response_model: dict, dependencies):
+    def upsert_one_api(request_response_model: dict, dependencies, api):
         _request_body_model = request_response_model.get('requestBodyModel', None)
         _response_model = request_response_model.get('responseModel', None)
         routes_source.upsert_one(path="",
@@ -213,7 +519,7 @@ def crud_router_builder(
                                  async_mode=async_mode,
                                  unique_list=unique_list)
 
-    def upsert_many_api(request_response_model: dict, dependencies):
+    def upsert_many_api(request_response_model: dict, dependencies, api):
         _request_body_model = request_response_model.get('requestBodyModel', None)
         _response_model = request_response_model.get('responseModel', None)
 
@@ -229,7 +535,23 @@ def crud_router_builder(
                                   unique_list=unique_list,
                                   async_mode=async_mode)
 
-    def create_one_api(request_response_model: dict, dependencies):
+    def bulk_load_api(request_response_model: dict, dependencies, api):
+        _request_query_model = request_response_model.get('requestQueryModel', None)
+        _response_model = request_response_model.get('responseModel', None)
+
+        routes_source.bulk_load(path="/bulk_load",
+                                request_query_model=_request_query_model,
+                                response_model=_response_model,
+                                db_session=db_session,
+                                query_service=crud_service,
+                                parsing_service=result_parser,
+                                execute_service=execute_service,
+                                dependencies=dependencies,
+                                api=api,
+                                unique_list=unique_list,
+                                async_mode=async_mode)
+
+    def create_one_api(request_response_model: dict, dependencies, api):
         _request_body_model = request_response_model.get('requestBodyModel', None)
         _response_model = request_response_model.get('responseModel', None)
         routes_source.create_one(path="",
@@ -244,7 +566,7 @@ def crud_router_builder(
                                  async_mode=async_mode,
                                  unique_list=unique_list)
 
-    def create_many_api(request_response_model: dict, dependencies):
+    def create_many_api(request_response_model: dict, dependencies, api):
         _request_body_model = request_response_model.get('requestBodyModel', None)
         _response_model = request_response_model.get('responseModel', None)
 
@@ -260,7 +582,7 @@ def crud_router_builder(
                                   unique_list=unique_list,
                                   async_mode=async_mode)
 
-    def delete_one_api(request_response_model: dict, dependencies):
+    def delete_one_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _request_url_model = request_response_model.get('requestUrlParamModel', None)
         _response_model = request_response_model.get('responseModel', None)
@@ -277,7 +599,7 @@ def crud_router_builder(
                                  api=api,
                                  async_mode=async_mode)
 
-    def delete_many_api(request_response_model: dict, dependencies):
+    def delete_many_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
 
@@ -292,7 +614,7 @@ def crud_router_builder(
                                   api=api,
                                   async_mode=async_mode)
 
-    def post_redirect_get_api(request_response_model: dict, dependencies):
+    def post_redirect_get_api(request_response_model: dict, dependencies, api):
         _request_body_model = request_response_model.get('requestBodyModel', None)
         _response_model = request_response_model.get('responseModel', None)
 
@@ -306,7 +628,7 @@ def crud_router_builder(
                                         async_mode=async_mode,
                                         response_model=_response_model)
 
-    def patch_one_api(request_response_model: dict, dependencies):
+    def patch_one_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
         _request_body_model = request_response_model.get('requestBodyModel', None)
@@ -325,7 +647,7 @@ def crud_router_builder(
                                 async_mode=async_mode,
                                 response_model=_response_model)
 
-    def patch_many_api(request_response_model: dict, dependencies):
+    def patch_many_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
         _request_body_model = request_response_model.get('requestBodyModel', None)
@@ -342,7 +664,7 @@ def crud_router_builder(
                                  async_mode=async_mode,
                                  response_model=_response_model)
 
-    def put_one_api(request_response_model: dict, dependencies):
+    def put_one_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
         _request_body_model = request_response_model.get('requestBodyModel', None)
@@ -360,7 +682,7 @@ def crud_router_builder(
                               response_model=_response_model,
                               request_url_param_model=_request_url_param_model)
 
-    def put_many_api(request_response_model: dict, dependencies):
+    def put_many_api(request_response_model: dict, dependencies, api):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _response_model = request_response_model.get('responseModel', None)
         _request_body_model = request_response_model.get('requestBodyModel', None)
@@ -377,7 +699,7 @@ def crud_router_builder(
                                async_mode=async_mode,
                                response_model=_response_model)
 
-    def find_one_foreign_tree_api(request_response_model: dict, dependencies):
+    def find_one_foreign_tree_api(request_response_model: dict, dependencies, api):
         _foreign_list_model = request_response_model.get('foreignListModel', None)
         for i in _foreign_list_model:
             _request_query_model = i["request_query_model"]
@@ -389,7 +711,7 @@ def crud_router_builder(
                                                 request_query_model=_request_query_model,
                                                 response_model=_response_model,
                                                 request_url_param_model=request_url_param_model,
-                                                db_session=db_session,
+                                                db_session=read_session,
                                                 query_service=crud_service,
                                                 parsing_service=result_parser,
                                                 execute_service=execute_service,
@@ -398,7 +720,7 @@ def crud_router_builder(
                                                 function_name=_function_name,
                                                 async_mode=async_mode)
 
-    def find_many_foreign_tree_api(request_response_model: dict, dependencies):
+    def find_many_foreign_tree_api(request_response_model: dict, dependencies, api):
         _foreign_list_model = request_response_model.get('foreignListModel', None)
         for i in _foreign_list_model:
             _request_query_model = i["request_query_model"]
@@ -410,7 +732,7 @@ def crud_router_builder(
                                                  request_query_model=_request_query_model,
                                                  response_model=_response_model,
                                                  request_url_param_model=request_url_param_model,
-                                                 db_session=db_session,
+                                                 db_session=read_session,
                                                  query_service=crud_service,
                                                  parsing_service=result_parser,
                                                  execute_service=execute_service,
@@ -424,6 +746,7 @@ def crud_router_builder(
         CrudMethods.FIND_MANY.value: find_many_api,
         CrudMethods.UPSERT_ONE.value: upsert_one_api,
         CrudMethods.UPSERT_MANY.value: upsert_many_api,
+        CrudMethods.BULK_LOAD.value: bulk_load_api,
         CrudMethods.CREATE_MANY.value: create_many_api,
         CrudMethods.CREATE_ONE.value: create_one_api,
         CrudMethods.DELETE_ONE.value: delete_one_api,
@@ -436,19 +759,110 @@ def crud_router_builder(
         CrudMethods.FIND_ONE_WITH_FOREIGN_TREE.value: find_one_foreign_tree_api,
         CrudMethods.FIND_MANY_WITH_FOREIGN_TREE.value: find_many_foreign_tree_api
     }
+    if sqlite_writer is not None:
+        def queued_api(register):
+            # the endpoints of the write APIs run with the sessions of the writer
+            def register_queued(request_response_model: dict, dependencies, api):
+                register(request_response_model, dependencies, QueuedRoutes(api, sqlite_writer))
+
+            return register_queued
+
+        api_register = {key: queued_api(register) for key, register in api_register.items()}
+    api_path = {
+        CrudMethods.FIND_ONE.value: path,
+        CrudMethods.DELETE_ONE.value: path,
+        CrudMethods.PATCH_ONE.value: path,
+        CrudMethods.UPDATE_ONE.value: path,
+        CrudMethods.BULK_LOAD.value: "/bulk_load"
+    }
     api = APIRouter(**router_kwargs)
 
     if dependencies is None:
         dependencies = []
     dependencies = [Depends(dep) for dep in dependencies]
-    for request_method in methods_dependencies:
-        value_of_dict_crud_model = crud_models.get_model_by_request_method(request_method)
-        crud_model_of_this_request_methods = value_of_dict_crud_model.keys()
-        for crud_model_of_this_request_method in crud_model_of_this_request_methods:
-            request_response_model_of_this_request_method = value_of_dict_crud_model[crud_model_of_this_request_method]
-            api_register[crud_model_of_this_request_method.value](request_response_model_of_this_request_method,
-                                                                  dependencies)
-
+    write_dependencies = dependencies
+    if read_session_router is not None:
+        write_dependencies = write_dependencies + [Depends(read_session_router.mark)]
+    if read_response_cache is not None:
+        write_dependencies = write_dependencies + [
+            Depends(read_response_cache.invalidate_dependency(db_session, async_mode))]
+
+    def dependencies_of(crud_method: CrudMethods):
+        if crud_method.value in [CrudMethods.FIND_ONE.value,
+                                 CrudMethods.FIND_MANY.value,
+                                 CrudMethods.FIND_ONE_WITH_FOREIGN_TREE.value,
+                                 CrudMethods.FIND_MANY_WITH_FOREIGN_TREE.value]:
+            return dependencies
+        return write_dependencies
+
+    def lazy_api(crud_method: CrudMethods, dependencies):
+        def build(recorder):
+            request_response_model = crud_method_to_pydantic(lazy_model_builder, crud_method)
+            api_register[crud_method.value](request_response_model.dict(), dependencies, recorder)
+
+        request_method = CRUDRequestMapping.get_request_method_by_crud_method(crud_method.value).value
+        api.add_api_route(api_path.get(crud_method.value, ""),
+                          LazyEndpoint(build),
+                          methods=[request_method],
+                          dependencies=dependencies,
+                          route_class_override=LazyAPIRoute)
+
+    if lazy_model_builder is not None:
+        for crud_method in sorted(crud_methods, key=lambda i: REQUEST_METHODS.index(
+                CRUDRequestMapping.get_request_method_by_crud_method(i.value).value)):
+            if crud_method.value in [CrudMethods.FIND_ONE_WITH_FOREIGN_TREE.value,
+                                     CrudMethods.FIND_MANY_WITH_FOREIGN_TREE.value]:
+                request_response_model = crud_method_to_pydantic(lazy_model_builder, crud_method)
+                api_register[crud_method.value](request_response_model.dict(), dependencies_of(crud_method), api)
+            else:
+                lazy_api(crud_method, dependencies_of(crud_method))
+    else:
+        for request_method in methods_dependencies:
+            value_of_dict_crud_model = crud_models.get_model_by_request_method(request_method)
+            crud_model_of_this_request_methods = value_of_dict_crud_model.keys()
+            for crud_model_of_this_request_method in crud_model_of_this_request_methods:
+                request_response_model_of_this_request_method = \
+                    value_of_dict_crud_model[crud_model_of_this_request_method]
+                api_register[crud_model_of_this_request_method.value](
+                    request_response_model_of_this_request_method,
+                    dependencies_of(crud_model_of_this_request_method),
+                    api)
+
+    if batch_path is not None:
+        add_batch_route(api,
+                        path=batch_path,
+                        routes=list(api.routes),
+                        db_session=batch_db_session,
+                        async_mode=async_mode,
+                        autocommit=autocommit,
+                        dependencies=dependencies)
+
+    if openapi_cache_dir and not user_crud_models:
+        openapi_key = schema_hash(db_model.__table__,
+                                  foreign_include=foreign_include,
+                                  sql_type=sql_type,
+                                  exclude_column=sorted(exclude_columns or []),
+                                  exclude_primary_key=NO_PRIMARY_KEY,
+                                  pagination_mode=pagination_mode,
+                                  sparse_fieldsets=sparse_fieldsets,
+                                  crud_methods=[i.value for i in crud_methods],
+                                  async_mode=async_mode,
+                                  response_class=response_class,
+                                  stream_format=stream_format,
+                                  routes=[(i.path, sorted(i.methods)) for i in api.routes],
+                                  dependencies=dependencies,
+                                  router_kwargs=router_kwargs,
+                                  fastapi_version=fastapi.__version__)
+        fragment = load_openapi_fragment(os.path.join(openapi_cache_dir,
+                                                      f'{db_model.__tablename__}_{openapi_key}.json'),
+                                         partial(render_openapi_fragment, api.routes))
+        attach_openapi_fragment(api.routes, fragment)
+    elif prerender_openapi or openapi_cache_dir:
+        attach_openapi_fragment(api.routes, render_openapi_fragment(api.routes))
+
+    api.response_cache = read_response_cache
+    api.find_one_coalescer = find_one_coalescer
+    api.sqlite_writer = sqlite_writer
     return api
 
 
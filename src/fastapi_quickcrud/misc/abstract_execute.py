@@ -1,12 +1,30 @@
-from typing import Any
+import asyncio
+import json
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
 
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql.elements import BinaryExpression
 
+from .abstract_query import BoundStatement, Explain, RelationStatement, returning_rows
+from .bulk_load import BlockingStreamReader
+from .cache import LRUCache
+from .type import BulkLoadFormat, CountStrategy
+
 
 class SQLALchemyExecuteService(object):
 
-    def __init__(self):
-        pass
+    def __init__(self, count_strategy: Optional[CountStrategy] = None, count_cache_ttl: float = 60,
+                 count_cache_size: int = 1024):
+        """
+        :param count_strategy: how to count the total of find many api, None means the count of the page
+        :param count_cache_ttl: seconds, the time to live of the count of CountStrategy.cached
+        :param count_cache_size: the max number of filter to memoize the count of CountStrategy.cached
+        """
+        self.count_strategy = count_strategy
+        self.count_cache = LRUCache(maxsize=count_cache_size, ttl=count_cache_ttl) \
+            if count_strategy == CountStrategy.cached else None
 
     # @staticmethod
     # async def async_execute_and_expire(session, stmt: BinaryExpression) -> Any:
@@ -37,10 +55,233 @@ class SQLALchemyExecuteService(object):
         session.flush()
 
     @staticmethod
-    async def async_execute(session, stmt: BinaryExpression) -> Any:
-        return await session.execute(stmt)
+    def _unpack(stmt: Union[BinaryExpression, BoundStatement]) -> Tuple[BinaryExpression, Optional[dict]]:
+        # the cached statement of the query service is executed with the values of the request
+        if isinstance(stmt, BoundStatement):
+            return stmt.statement, stmt.params
+        return stmt, None
+
+    @classmethod
+    async def async_execute(cls, session, stmt: Union[BinaryExpression, BoundStatement]) -> Any:
+        return await session.execute(*cls._unpack(stmt))
+
+    @classmethod
+    def execute(cls, session, stmt: Union[BinaryExpression, BoundStatement]) -> Any:
+        return session.execute(*cls._unpack(stmt))
+
+    @staticmethod
+    async def async_execute_returning(session, stmt_list: List[BinaryExpression]) -> List[dict]:
+        returned_rows = []
+        for stmt in stmt_list:
+            returned_rows += returning_rows(await session.execute(stmt))
+        return returned_rows
+
+    @staticmethod
+    def execute_returning(session, stmt_list: List[BinaryExpression]) -> List[dict]:
+        returned_rows = []
+        for stmt in stmt_list:
+            returned_rows += returning_rows(session.execute(stmt))
+        return returned_rows
 
     @staticmethod
-    def execute(session, stmt: BinaryExpression) -> Any:
-        return session.execute(stmt)
+    async def async_execute_many(session, stmt: BinaryExpression, rows: List[dict]) -> int:
+        await session.execute(stmt, rows)
+        return len(rows)
+
+    @staticmethod
+    def execute_many(session, stmt: BinaryExpression, rows: List[dict]) -> int:
+        session.execute(stmt, rows)
+        return len(rows)
+
+    @staticmethod
+    def copy_expert(session, copy_sql: str, reader: BlockingStreamReader) -> int:
+        """
+        COPY ... FROM STDIN by the blocking copy_expert of psycopg2, the reader is read as the body arrives
+        """
+        cursor = session.connection().connection.cursor()
+        dbapi = session.bind.dialect.dbapi
+        try:
+            cursor.copy_expert(copy_sql, reader)
+            return cursor.rowcount
+        except dbapi.IntegrityError as e:
+            raise IntegrityError(copy_sql, None, e) from e
+        finally:
+            cursor.close()
+
+    @staticmethod
+    async def async_copy_to_table(session, *, table_name: str, schema_name: Optional[str], columns: List[str],
+                                  source: AsyncIterator[bytes], bulk_format: BulkLoadFormat, header=False) -> int:
+        """
+        COPY ... FROM STDIN by copy_to_table of asyncpg, the source is read as it arrives
+        """
+        import asyncpg
+        connection = await session.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        try:
+            status = await driver_connection.copy_to_table(
+                table_name,
+                source=source,
+                columns=columns,
+                schema_name=schema_name,
+                format=bulk_format.value,
+                header=header if bulk_format == BulkLoadFormat.csv else None)
+        except asyncpg.IntegrityConstraintViolationError as e:
+            raise IntegrityError(f'COPY {table_name}', None, e) from e
+        # the status is COPY <count>
+        return int(status.split()[-1])
+
+    @classmethod
+    async def async_stream(cls, session, stmt: Union[BinaryExpression, BoundStatement]) -> Any:
+        return await session.stream(*cls._unpack(stmt))
+
+    @classmethod
+    def stream(cls, session, stmt: Union[BinaryExpression, BoundStatement]) -> Any:
+        return session.execute(*cls._unpack(stmt), execution_options={'stream_results': True})
+
+    @staticmethod
+    def _read_count(stmt, value) -> Optional[int]:
+        if value is None:
+            return None
+        if isinstance(stmt, Explain):
+            if isinstance(value, str):
+                value = json.loads(value)
+            value = value[0]['Plan']['Plan Rows']
+        return int(value)
+
+    def _count_cache_key(self, count_stmt_list):
+        if self.count_cache is None:
+            return None
+        compiled = count_stmt_list[-1].compile()
+        return str(compiled), repr(sorted(compiled.params.items()))
+
+    def count(self, session, count_stmt_list: List[BinaryExpression]) -> Optional[int]:
+        if not count_stmt_list:
+            return None
+        cache_key = self._count_cache_key(count_stmt_list)
+        if cache_key is not None:
+            total_count = self.count_cache.get(cache_key)
+            if total_count is not None:
+                return total_count
+        total_count = None
+        for stmt in count_stmt_list[:-1]:
+            try:
+                # a failed statement aborts the transaction of PostgreSQL, the fallback runs after its SAVEPOINT
+                with session.begin_nested():
+                    total_count = self._read_count(stmt, session.execute(stmt).scalar())
+            except OperationalError:
+                # the statistics of estimated count is not ready, e.g. sqlite_stat1 not exist
+                continue
+            if total_count is not None:
+                break
+        else:
+            total_count = self._read_count(count_stmt_list[-1], session.execute(count_stmt_list[-1]).scalar())
+        if cache_key is not None:
+            self.count_cache.set(cache_key, total_count)
+        return total_count
+
+    async def async_count(self, session, count_stmt_list: List[BinaryExpression]) -> Optional[int]:
+        if not count_stmt_list:
+            return None
+        cache_key = self._count_cache_key(count_stmt_list)
+        if cache_key is not None:
+            total_count = self.count_cache.get(cache_key)
+            if total_count is not None:
+                return total_count
+        total_count = None
+        for stmt in count_stmt_list[:-1]:
+            try:
+                async with session.begin_nested():
+                    total_count = self._read_count(stmt, (await session.execute(stmt)).scalar())
+            except OperationalError:
+                continue
+            if total_count is not None:
+                break
+        else:
+            total_count = self._read_count(count_stmt_list[-1],
+                                           (await session.execute(count_stmt_list[-1])).scalar())
+        if cache_key is not None:
+            self.count_cache.set(cache_key, total_count)
+        return total_count
+
+    async def _async_count_on_new_connection(self, engine: AsyncEngine,
+                                             count_stmt_list: List[BinaryExpression]) -> Optional[int]:
+        async with engine.connect() as connection:
+            return await self.async_count(connection, count_stmt_list)
+
+    @staticmethod
+    def _pooled_engine(session) -> Optional[AsyncEngine]:
+        """
+        the engine of the session if it has a connection pool, so that a statement can run on a second connection
+        """
+        bind = getattr(session, 'bind', None)
+        if isinstance(bind, AsyncEngine) and not isinstance(bind.sync_engine.pool, StaticPool):
+            return bind
+        return None
+
+    async def async_execute_with_count(self, session, stmt: Union[BinaryExpression, BoundStatement],
+                                       count_stmt_list: List[BinaryExpression]) -> Tuple[Any, Optional[int]]:
+        """
+        execute the page query, the exact count query run on a second connection at the same time
+        if the session is bound to an engine with a connection pool
+        """
+        bind = self._pooled_engine(session)
+        if self.count_strategy == CountStrategy.exact and count_stmt_list and bind is not None:
+            return await asyncio.gather(session.execute(*self._unpack(stmt)),
+                                        self._async_count_on_new_connection(bind, count_stmt_list))
+        query_result = await session.execute(*self._unpack(stmt))
+        return query_result, await self.async_count(session, count_stmt_list)
+
+    @staticmethod
+    def _parent_key_chunks(parent_rows, relation: RelationStatement) -> List[list]:
+        parent_keys = list(dict.fromkeys(row._mapping[relation.parent_key] for row in parent_rows
+                                         if row._mapping[relation.parent_key] is not None))
+        return [parent_keys[index:index + relation.chunk_size]
+                for index in range(0, len(parent_keys), relation.chunk_size)]
+
+    def load_relations(self, session, query_result,
+                       relation_stmt_list: List[RelationStatement]) -> Tuple[Any, List[Tuple[RelationStatement, list]]]:
+        """
+        load the related rows of RelationLoading.select_in by one query of the keys of the parent rows per relation,
+        the parent rows are buffered since they are read twice, the result of them is returned with the related rows
+        """
+        if not relation_stmt_list:
+            return query_result, []
+        frozen_result = query_result.freeze()
+        parent_rows = frozen_result().fetchall()
+        relations = []
+        for relation in relation_stmt_list:
+            rows = []
+            for parent_keys in self._parent_key_chunks(parent_rows, relation):
+                rows += session.execute(relation.statement, {'parent_keys': parent_keys}).fetchall()
+            relations.append((relation, rows))
+        return frozen_result(), relations
+
+    async def _async_load_relation(self, session, relation: RelationStatement, parent_rows) -> list:
+        rows = []
+        for parent_keys in self._parent_key_chunks(parent_rows, relation):
+            rows += (await session.execute(relation.statement, {'parent_keys': parent_keys})).fetchall()
+        return rows
+
+    async def _async_load_relation_on_new_connection(self, engine: AsyncEngine, relation: RelationStatement,
+                                                     parent_rows) -> list:
+        async with engine.connect() as connection:
+            return await self._async_load_relation(connection, relation, parent_rows)
 
+    async def async_load_relations(self, session, query_result, relation_stmt_list: List[RelationStatement]) \
+            -> Tuple[Any, List[Tuple[RelationStatement, list]]]:
+        """
+        the relations run on their own connections at the same time if the session is bound to an engine with
+        a connection pool
+        """
+        if not relation_stmt_list:
+            return query_result, []
+        frozen_result = query_result.freeze()
+        parent_rows = frozen_result().fetchall()
+        bind = self._pooled_engine(session)
+        if bind is not None and len(relation_stmt_list) > 1:
+            rows_list = await asyncio.gather(*[self._async_load_relation_on_new_connection(bind, relation, parent_rows)
+                                               for relation in relation_stmt_list])
+        else:
+            rows_list = [await self._async_load_relation(session, relation, parent_rows)
+                         for relation in relation_stmt_list]
+        return frozen_result(), list(zip(relation_stmt_list, rows_list))
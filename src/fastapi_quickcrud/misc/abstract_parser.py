@@ -1,36 +1,64 @@
-import copy
+import json
 from http import HTTPStatus
+from itertools import chain
 from urllib.parse import urlencode
+
+from fastapi.encoders import jsonable_encoder
 from pydantic import parse_obj_as
-from starlette.responses import Response, RedirectResponse
+from starlette.responses import Response, RedirectResponse, StreamingResponse
 
-from .utils import group_find_many_join
+from .abstract_query import returning_rows
+from .utils import group_find_many_join, encode_cursor, JoinAggregator, RowMapper, attach_relations
+from .batch import in_batch
+from .etag import payload_etag
 from .exceptions import FindOneApiNotRegister
+from .response import model_projector
+from .sqlite_writer import queued_write
+from .type import WINDOW_TOTAL_COUNT_KEYWORD, StreamFormat, RelationLoading
 
 
 class SQLAlchemyGeneralSQLeResultParse(object):
 
-    def __init__(self, async_model, crud_models, autocommit):
+    def __init__(self, async_model, crud_models, autocommit, stream_format=None, stream_chunk_size=1000,
+                 response_class=None, etag_by_payload=False, relation_loading=RelationLoading.join):
 
         """
         :param async_model: bool
         :param crud_models: pre ready
         :param autocommit: bool
+        :param stream_format: StreamFormat, stream the response of find many api in this format if set
+        :param stream_chunk_size: the number of rows fetched, validated and encoded at a time when streaming
+        :param response_class: JSONResponse class, return the rows of find one/many api in it directly if set
+        :param etag_by_payload: set the ETag header of find one/many api by the hash of the shaped rows
+        :param relation_loading: the rows of join_foreign_table are merged per parent only if RelationLoading.join
         """
 
         self.async_mode = async_model
         self.crud_models = crud_models
         self.primary_name = crud_models.PRIMARY_KEY_NAME
         self.autocommit = autocommit
+        self.stream_format = stream_format
+        self.stream_chunk_size = stream_chunk_size
+        self.response_class = response_class
+        self.etag_by_payload = etag_by_payload
+        self.relation_loading = relation_loading
+        # the keys of the select -> RowMapper, the keys vary by the join_foreign_table of the request
+        self._row_mappers = {}
 
     async def async_commit(self, session):
         await session.flush()
-        if self.autocommit:
+        if in_batch(session):
+            return
+        # the write of the SQLite writer releases its SAVEPOINT, and is committed by the group
+        if self.autocommit or queued_write(session) is not None:
             await session.commit()
 
     def commit(self, session):
         session.flush()
-        if self.autocommit:
+        # the operations of a batch are committed once by the batch
+        if in_batch(session):
+            return
+        if self.autocommit or queued_write(session) is not None:
             session.commit()
 
     async def async_delete(self, session, data):
@@ -103,34 +131,77 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         await self.async_commit(session)
         return result
 
-    @staticmethod
-    def find_one_sub_func(sql_execute_result, response_model, fastapi_response, **kwargs):
-        join = kwargs.get('join_mode', None)
+    def returning_sub_func(self, response_model, sql_execute_result, fastapi_response, one):
+        returned_rows = returning_rows(sql_execute_result)
+        if not returned_rows:
+            return Response(status_code=HTTPStatus.NOT_FOUND if one else HTTPStatus.NO_CONTENT)
+        if one:
+            returned_rows, = returned_rows
+        return self._response_builder(response_model=response_model,
+                                      sql_execute_result=returned_rows,
+                                      fastapi_response=fastapi_response)
+
+    def update_returning(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        session = kwargs.get('session')
+        update_one = kwargs.get('update_one')
+        result = self.returning_sub_func(response_model, sql_execute_result, fastapi_response, update_one)
+        self.commit(session)
+        return result
+
+    async def async_update_returning(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        session = kwargs.get('session')
+        update_one = kwargs.get('update_one')
+        result = self.returning_sub_func(response_model, sql_execute_result, fastapi_response, update_one)
+        await self.async_commit(session)
+        return result
+
+    def _direct_response(self, content, response_model, fastapi_response) -> Response:
+        """
+        the rows are trusted, they are only projected to the fields of the response model and encoded by
+        the response class, the validation and encoding of the response_model of the route are bypassed
+        """
+        headers = {key: value for key, value in fastapi_response.headers.items()
+                   if key not in ('content-length', 'content-type')}
+        return self.response_class(content=model_projector(response_model)(content), headers=headers)
+
+    def _shaped_response(self, content, response_model, fastapi_response):
+        if self.response_class is not None:
+            content = self._direct_response(content, response_model, fastapi_response)
+        if self.etag_by_payload:
+            headers = content.headers if isinstance(content, Response) else fastapi_response.headers
+            headers['etag'] = payload_etag(content)
+        return content
+
+    def _row_mapper(self, keys) -> RowMapper:
+        keys = tuple(keys)
+        row_mapper = self._row_mappers.get(keys, None)
+        if row_mapper is None:
+            row_mapper = self._row_mappers[keys] = RowMapper(keys)
+        return row_mapper
+
+    def _join_rows(self, join_mode) -> bool:
+        """
+        whether the rows of the select are the joined rows of the parents and the related rows
+        """
+        return bool(join_mode) and self.relation_loading == RelationLoading.join
+
+    def find_one_sub_func(self, sql_execute_result, response_model, fastapi_response, **kwargs):
+        join = self._join_rows(kwargs.get('join_mode', None))
+        relations = kwargs.get('relations', None)
 
         one_row_data = sql_execute_result.fetchall()
         if not one_row_data:
             return Response('specific data not found', status_code=HTTPStatus.NOT_FOUND)
-        response = []
-        for i in one_row_data:
-            i = dict(i)
-            result__ = copy.deepcopy(i)
-            tmp = {}
-            for key_, value_ in result__.items():
-                if '_____' in key_:
-                    key, foreign_column = key_.split('_____')
-                    if key not in tmp:
-                        tmp[key] = {foreign_column: value_}
-                    else:
-                        tmp[key][foreign_column] = value_
-                else:
-                    tmp[key_] = value_
-            response.append(tmp)
+        row_mapper = self._row_mapper(sql_execute_result.keys())
+        response = [row_mapper(i) for i in one_row_data]
         if join:
-            response = group_find_many_join(response)
+            response = group_find_many_join(response, kwargs.get('primary_key', None))
+        if relations:
+            response = attach_relations(response, relations)
         if isinstance(response, list):
             response = response[0]
         fastapi_response.headers["x-total-count"] = str(1)
-        return response
+        return self._shaped_response(response, response_model, fastapi_response)
 
     async def async_find_one(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
         result = self.find_one_sub_func(sql_execute_result, response_model, fastapi_response, **kwargs)
@@ -142,33 +213,31 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         self.commit(kwargs.get('session'))
         return result
 
-    @staticmethod
-    def find_many_sub_func(response_model, sql_execute_result, fastapi_response, **kwargs):
-        join = kwargs.get('join_mode', None)
+    def find_many_sub_func(self, response_model, sql_execute_result, fastapi_response, **kwargs):
+        join = self._join_rows(kwargs.get('join_mode', None))
+        relations = kwargs.get('relations', None)
+        cursor_keys = kwargs.get('cursor_keys', None)
+        limit = kwargs.get('limit', None)
+        total_count = kwargs.get('total_count', None)
         result = sql_execute_result.fetchall()
         if not result:
             return Response(status_code=HTTPStatus.NO_CONTENT)
-        response = []
-        for i in result:
-            i = dict(i)
-            result__ = copy.deepcopy(i)
-            tmp = {}
-            for key_, value_ in result__.items():
-                if '_____' in key_:
-                    key, foreign_column = key_.split('_____')
-                    if key not in tmp:
-                        tmp[key] = {foreign_column: value_}
-                    else:
-                        tmp[key][foreign_column] = value_
-                else:
-                    tmp[key_] = value_
-            response.append(tmp)
-
-        fastapi_response.headers["x-total-count"] = str(len(response))
+        if cursor_keys and limit and len(result) >= limit:
+            last_row = result[-1]._mapping
+            fastapi_response.headers["next_cursor"] = encode_cursor(cursor_keys,
+                                                                    [last_row[key] for key in cursor_keys])
+        row_mapper = self._row_mapper(sql_execute_result.keys())
+        if row_mapper.total_count_index is not None:
+            total_count = result[0][row_mapper.total_count_index]
+        response = [row_mapper(i) for i in result]
+
+        fastapi_response.headers["x-total-count"] = str(len(response) if total_count is None else total_count)
         if join:
-            response = group_find_many_join(response)
-        response = parse_obj_as(response_model, response)
-        return response
+            response = group_find_many_join(response, kwargs.get('primary_key', None))
+        if relations:
+            response = attach_relations(response, relations)
+        # the rows are validated once by the response_model of the route
+        return self._shaped_response(response, response_model, fastapi_response)
 
     async def async_find_many(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
         result = self.find_many_sub_func(response_model, sql_execute_result, fastapi_response, **kwargs)
@@ -180,6 +249,122 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         self.commit(kwargs.get('session'))
         return result
 
+    def _stream_find_many_response(self, first_chunk, fastapi_response, content, **kwargs) -> StreamingResponse:
+        """
+        the headers are decided by the first chunk since they are sent before the body,
+        x-total-count is omitted if it is unknown until the end of the stream
+        """
+        cursor_keys = kwargs.get('cursor_keys', None)
+        limit = kwargs.get('limit', None)
+        total_count = kwargs.get('total_count', None)
+        total_count = first_chunk[0]._mapping.get(WINDOW_TOTAL_COUNT_KEYWORD, total_count)
+        if total_count is None and len(first_chunk) < self._stream_first_chunk_size(**kwargs):
+            total_count = len(first_chunk)
+        if total_count is not None:
+            fastapi_response.headers["x-total-count"] = str(total_count)
+        if cursor_keys and limit and len(first_chunk) >= limit:
+            last_row = first_chunk[-1]._mapping
+            fastapi_response.headers["next_cursor"] = encode_cursor(cursor_keys,
+                                                                    [last_row[key] for key in cursor_keys])
+        headers = {key: value for key, value in fastapi_response.headers.items()
+                   if key not in ('content-length', 'content-type')}
+        media_type = 'application/x-ndjson' if self.stream_format == StreamFormat.ndjson else 'application/json'
+        return StreamingResponse(content, headers=headers, media_type=media_type)
+
+    def _stream_first_chunk_size(self, **kwargs) -> int:
+        # the whole page of cursor pagination is read at first for building the next_cursor header
+        if kwargs.get('cursor_keys', None) and kwargs.get('limit', None):
+            return max(kwargs['limit'], self.stream_chunk_size)
+        return self.stream_chunk_size
+
+    def _stream_chunk_encoder(self, response_model, rows, join_aggregator, first, last=False):
+        """
+        validate and encode a chunk of rows,
+        in join mode the rows are merged by the join aggregator which holds back the last record
+        until the next chunk since its rows may continue there
+        """
+        if rows:
+            row_mapper = self._row_mapper(rows[0]._fields)
+            rows = [row_mapper(row) for row in rows]
+        if join_aggregator is not None:
+            join_aggregator.feed(rows)
+            rows = join_aggregator.pop(keep_last=not last)
+        if not rows:
+            return None
+        items = [json.dumps(item, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+                 for item in jsonable_encoder(parse_obj_as(response_model, rows))]
+        if self.stream_format == StreamFormat.ndjson:
+            return "".join(item + "\n" for item in items)
+        return ("[" if first else ",") + ",".join(items)
+
+    def _stream_end(self, first) -> str:
+        if self.stream_format == StreamFormat.ndjson:
+            return ""
+        return "[]" if first else "]"
+
+    def stream_find_many(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        session = kwargs.get('session')
+        join = self._join_rows(kwargs.get('join_mode', None))
+        join_aggregator = JoinAggregator(kwargs.get('primary_key', None)) if join else None
+        first_chunk = sql_execute_result.fetchmany(self._stream_first_chunk_size(**kwargs))
+        if not first_chunk:
+            sql_execute_result.close()
+            self.commit(session)
+            return Response(status_code=HTTPStatus.NO_CONTENT)
+
+        def content():
+            try:
+                first = True
+                for rows in chain([first_chunk], sql_execute_result.partitions(self.stream_chunk_size)):
+                    chunk = self._stream_chunk_encoder(response_model, rows, join_aggregator, first)
+                    if chunk:
+                        first = False
+                        yield chunk
+                if join_aggregator is not None:
+                    chunk = self._stream_chunk_encoder(response_model, [], join_aggregator, first, last=True)
+                    if chunk:
+                        first = False
+                        yield chunk
+                yield self._stream_end(first)
+            finally:
+                sql_execute_result.close()
+            self.commit(session)
+
+        return self._stream_find_many_response(first_chunk, fastapi_response, content(), **kwargs)
+
+    async def async_stream_find_many(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        session = kwargs.get('session')
+        join = self._join_rows(kwargs.get('join_mode', None))
+        join_aggregator = JoinAggregator(kwargs.get('primary_key', None)) if join else None
+        first_chunk = await sql_execute_result.fetchmany(self._stream_first_chunk_size(**kwargs))
+        if not first_chunk:
+            await sql_execute_result.close()
+            await self.async_commit(session)
+            return Response(status_code=HTTPStatus.NO_CONTENT)
+
+        async def content():
+            try:
+                chunk = self._stream_chunk_encoder(response_model, first_chunk, join_aggregator, True)
+                first = not chunk
+                if chunk:
+                    yield chunk
+                async for rows in sql_execute_result.partitions(self.stream_chunk_size):
+                    chunk = self._stream_chunk_encoder(response_model, rows, join_aggregator, first)
+                    if chunk:
+                        first = False
+                        yield chunk
+                if join_aggregator is not None:
+                    chunk = self._stream_chunk_encoder(response_model, [], join_aggregator, first, last=True)
+                    if chunk:
+                        first = False
+                        yield chunk
+                yield self._stream_end(first)
+            finally:
+                await sql_execute_result.close()
+            await self.async_commit(session)
+
+        return self._stream_find_many_response(first_chunk, fastapi_response, content(), **kwargs)
+
     # @staticmethod
     # def update_one_sub_func(response_model, sql_execute_result, fastapi_response):
     #     result = parse_obj_as(response_model, sql_execute_result)
@@ -281,6 +466,23 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         self.commit(kwargs.get('session'))
         return result
 
+    @staticmethod
+    def bulk_load_sub_func(response_model, sql_execute_result, fastapi_response):
+        # the result of bulk load is the number of loaded rows
+        result = parse_obj_as(response_model, {'row_count': sql_execute_result})
+        fastapi_response.headers["x-total-count"] = str(sql_execute_result)
+        return result
+
+    async def async_bulk_load(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        result = self.bulk_load_sub_func(response_model, sql_execute_result, fastapi_response)
+        await self.async_commit(kwargs.get('session'))
+        return result
+
+    def bulk_load(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        result = self.bulk_load_sub_func(response_model, sql_execute_result, fastapi_response)
+        self.commit(kwargs.get('session'))
+        return result
+
     def delete_one_sub_func(self, response_model, sql_execute_result, fastapi_response, **kwargs):
         if not sql_execute_result:
             return Response(status_code=HTTPStatus.NOT_FOUND)
@@ -330,6 +532,20 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         await self.async_commit(session)
         return result
 
+    def delete_returning(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        session = kwargs.get('session')
+        delete_one = kwargs.get('delete_one')
+        result = self.returning_sub_func(response_model, sql_execute_result, fastapi_response, delete_one)
+        self.commit(session)
+        return result
+
+    async def async_delete_returning(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        session = kwargs.get('session')
+        delete_one = kwargs.get('delete_one')
+        result = self.returning_sub_func(response_model, sql_execute_result, fastapi_response, delete_one)
+        await self.async_commit(session)
+        return result
+
     def has_end_point(self, fastapi_request) -> bool:
         redirect_end_point = fastapi_request.url.path + "/{" + self.primary_name + "}"
         redirect_url_exist = False
@@ -340,6 +556,14 @@ class SQLAlchemyGeneralSQLeResultParse(object):
                     redirect_url_exist = True
         return redirect_url_exist
 
+    @staticmethod
+    def _redirect_response(redirect_url, fastapi_response) -> RedirectResponse:
+        response = RedirectResponse(redirect_url, status_code=HTTPStatus.SEE_OTHER)
+        # the headers and cookies set by the dependencies, e.g. the read your writes mark
+        if fastapi_response is not None:
+            response.headers.raw.extend(fastapi_response.headers.raw)
+        return response
+
     def post_redirect_get_sub_func(self, response_model, sql_execute_result, fastapi_request):
         result = parse_obj_as(response_model, sql_execute_result)
         primary_key_field = result.__dict__.pop(self.primary_name, None)
@@ -362,9 +586,7 @@ class SQLAlchemyGeneralSQLeResultParse(object):
                                         f' with GET method not found')
         redirect_url = self.get_post_redirect_get_url(response_model, sql_execute_result, fastapi_request)
         await self.async_commit(session)
-        return RedirectResponse(redirect_url,
-                                status_code=HTTPStatus.SEE_OTHER
-                                )
+        return self._redirect_response(redirect_url, kwargs.get('fastapi_response'))
 
     def post_redirect_get(self, *, response_model, sql_execute_result, fastapi_request, **kwargs):
         session = kwargs['session']
@@ -375,6 +597,4 @@ class SQLAlchemyGeneralSQLeResultParse(object):
                                         f' with GET method not found')
         redirect_url = self.get_post_redirect_get_url(response_model, sql_execute_result, fastapi_request)
         self.commit(session)
-        return RedirectResponse(redirect_url,
-                                status_code=HTTPStatus.SEE_OTHER
-                                )
+        return self._redirect_response(redirect_url, kwargs.get('fastapi_response'))
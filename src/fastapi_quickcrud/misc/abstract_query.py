@@ -1,96 +1,490 @@
+import sqlite3
+import uuid
 from abc import ABC
-from typing import List, Union
+from itertools import groupby
+from typing import Any, Callable, Hashable, List, NamedTuple, Union, Tuple, Optional
 
-from sqlalchemy import and_, select, text
+from sqlalchemy import and_, select, text, Column, func, inspect, table, column, bindparam, Integer, JSON, \
+    literal_column
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.dialects.sqlite.dml import Insert as SQLiteInsert, OnConflictDoNothing, OnConflictDoUpdate
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable, _generative
+from sqlalchemy.orm import interfaces
+from sqlalchemy.sql.dml import Update, Delete, Insert
+from sqlalchemy.sql.elements import BinaryExpression, ClauseElement
 from sqlalchemy.sql.schema import Table
+from sqlalchemy.sql.visitors import ExtendedInternalTraversal
 
-from .exceptions import UnknownOrderType, UnknownColumn, UpdateColumnEmptyException
-from .type import Ordering
-from .utils import clean_input_fields, path_query_builder
-from .utils import find_query_builder
+from .cache import LRUCache
+from .exceptions import UnknownOrderType, UnknownColumn, UpdateColumnEmptyException, \
+    RelationLoadingNotSupportedException, InvalidCursor
+from .type import Ordering, PaginationMode, CountStrategy, WriteMode, BulkLoadFormat, RelationLoading, \
+    WINDOW_TOTAL_COUNT_KEYWORD, FOREIGN_PATH_PARAM_KEYWORD, RELATION_KEY_KEYWORD
+from .utils import clean_input_fields, path_query_builder, decode_cursor, cursor_query_builder
+from .utils import find_query_builder, get_filter_plan, query_param_shape, query_param_values, \
+    query_param_placeholder
+
+
+PAGINATION_PARAM = ('limit', 'offset', 'cursor', 'order_by_columns')
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN a statement, used to read the row estimate of the query planner
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _compile_postgresql_explain(element, compiler, **kw):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+# the ordering of order_by_columns -> descending, the ordering is optional
+ORDERING_DESCENDING = {'': False, Ordering.ASC.upper(): False, Ordering.DESC.upper(): True}
+
+
+class BoundStatement(NamedTuple):
+    """
+    a parameterized statement and the values of its bind parameters,
+    the statement is shared by the requests with the same shape
+    """
+    statement: Executable
+    params: dict
+
+
+class RelationStatement(NamedTuple):
+    """
+    a relation of RelationLoading.select_in, the statement selects the related rows of the parent rows whose key is
+    in the expanding parameter parent_keys, the key of the parent of a related row is labeled RELATION_KEY_KEYWORD
+    """
+    # <foreign_table>_foreign of the response item
+    name: str
+    # the key of the parent column in the parent rows
+    parent_key: str
+    statement: Executable
+    # the max number of the parent keys bound to the statement at a time
+    chunk_size: int
+
+
+class ReturningUpdate(Update):
+    """
+    UPDATE ... RETURNING, the RETURNING clause is also rendered for SQLite
+    """
+    inherit_cache = True
+
+
+class ReturningDelete(Delete):
+    """
+    DELETE ... RETURNING, the RETURNING clause is also rendered for SQLite
+    """
+    inherit_cache = True
+
+
+class ReturningInsert(Insert):
+    """
+    INSERT ... RETURNING, the RETURNING clause is also rendered for SQLite
+    """
+    inherit_cache = True
+
+
+class CachedOnConflictDoNothing(OnConflictDoNothing):
+    """
+    ON CONFLICT DO NOTHING of SQLite with the cache key, the clause of SQLAlchemy 1.4 has none, so the statements
+    with the clause are compiled by each execution
+    """
+    inherit_cache = True
+    _traverse_internals = [('constraint_target', ExtendedInternalTraversal.dp_string),
+                           ('inferred_target_elements', ExtendedInternalTraversal.dp_multi_list),
+                           ('inferred_target_whereclause', ExtendedInternalTraversal.dp_clauseelement)]
+
+
+class CachedOnConflictDoUpdate(OnConflictDoUpdate):
+    """
+    ON CONFLICT DO UPDATE of SQLite with the cache key, the values to set are clause elements, e.g. the columns of
+    excluded
+    """
+    inherit_cache = True
+    _traverse_internals = CachedOnConflictDoNothing._traverse_internals + [
+        ('update_values_to_set', ExtendedInternalTraversal.dp_dml_ordered_values),
+        ('update_whereclause', ExtendedInternalTraversal.dp_clauseelement)]
+
+
+class ReturningSQLiteInsert(SQLiteInsert):
+    """
+    INSERT ... ON CONFLICT ... RETURNING of SQLite, the statement and its ON CONFLICT clause are cached
+    """
+    inherit_cache = True
+
+    @_generative
+    def on_conflict_do_update(self, index_elements=None, index_where=None, set_=None, where=None):
+        self._post_values_clause = CachedOnConflictDoUpdate(index_elements, index_where, set_, where)
+
+    @_generative
+    def on_conflict_do_nothing(self, index_elements=None, index_where=None):
+        self._post_values_clause = CachedOnConflictDoNothing(index_elements, index_where)
+
+
+@compiles(ReturningUpdate, 'sqlite')
+@compiles(ReturningDelete, 'sqlite')
+@compiles(ReturningInsert, 'sqlite')
+@compiles(ReturningSQLiteInsert, 'sqlite')
+def _compile_sqlite_returning(element, compiler, **kw):
+    # SQLite supports RETURNING since 3.35 but the dialect of SQLAlchemy 1.4 does not render it
+    returning = element._returning
+    element = element._generate()
+    element._returning = ()
+    statement = getattr(compiler, 'visit_' + element.__visit_name__)(element, **kw)
+    if not returning:
+        return statement
+    return statement + ' RETURNING ' + ', '.join(compiler.process(column, within_columns_clause=True)
+                                                 for column in returning)
+
+
+def returning_rows(result) -> List[dict]:
+    """
+    the rows of INSERT/UPDATE/DELETE ... RETURNING, the RETURNING of SQLite is rendered as text by
+    _compile_sqlite_returning, so its values are converted by the result processors of the returned columns
+    """
+    rows = [dict(i._mapping) for i in result.fetchall()]
+    dialect = result.context.dialect
+    statement = result.context.compiled.statement
+    if dialect.name != 'sqlite' or not rows or not isinstance(statement, (ReturningUpdate, ReturningDelete,
+                                                                          ReturningInsert, ReturningSQLiteInsert)):
+        return rows
+    processors = {}
+    for returned_column in statement.exported_columns:
+        processor = returned_column.type.dialect_impl(dialect).result_processor(dialect, None)
+        if processor is not None:
+            processors[returned_column.name] = processor
+    for row in rows:
+        for key, processor in processors.items():
+            if key in row:
+                row[key] = processor(row[key])
+    return rows
 
 
 class SQLAlchemyGeneralSQLQueryService(ABC):
+    # whether the dialect can compare row values, e.g. (a, b) > (1, 2)
+    support_row_value = False
+    # whether the dialect can return the affected rows by INSERT/UPDATE/DELETE ... RETURNING
+    support_returning = False
+    # the max number of bind parameters of a statement
+    max_bind_params = 999
+    # whether the dialect can aggregate the related rows into a json array, see json_array_agg
+    support_json_agg = False
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, pagination_mode=PaginationMode.offset,
+                 count_strategy=None, write_mode=WriteMode.orm, statement_cache_size=512, etag_column=None,
+                 default_fields=None, relation_loading=RelationLoading.join):
 
         """
         :param model: declarative_base model
         :param async_mode: bool
+        :param pagination_mode: offset or cursor
+        :param count_strategy: how to count the total of get_many, None means the count of the page
+        :param write_mode: orm or core, core writes by set based statements with RETURNING if the dialect supports
+        :param statement_cache_size: the max number of the shapes of get_one/get_many to cache the statement, 0 means
+                                     the statement is built for each request
+        :param etag_column: the version column, e.g. updated_at, which the ETag of get_one/get_many is built from
+        :param default_fields: the columns selected by get_many if the fields of the request is not given
+        :param relation_loading: how to load the tables of join_mode, join them into the rows of the select,
+                                 load them by a query of the keys of the parent rows, or aggregate them into a json
+                                 array per parent row
         """
 
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
         self.foreign_table_mapping = foreign_table_mapping
+        self.pagination_mode = pagination_mode
+        self.count_strategy = count_strategy
+        self.write_mode = write_mode
+        self._delete_need_orm_cache = None
+        self.statement_cache = LRUCache(maxsize=statement_cache_size) if statement_cache_size else None
+        self.filter_plan = get_filter_plan(model)
+        self.order_by_column_map = {column_name: getattr(self.model_columns, column_name)
+                                    for column_name in self.model_columns.__table__.c.keys()
+                                    if hasattr(self.model_columns, column_name)}
+        if etag_column is not None and etag_column not in self.model.__table__.c:
+            raise UnknownColumn(f'column {etag_column} is not exited')
+        self.etag_column = etag_column
+        for field in default_fields or []:
+            if '.' not in field and field not in self.model.__table__.c:
+                raise UnknownColumn(f'column {field} is not exited')
+        self.default_fields = default_fields
+        if relation_loading == RelationLoading.json_agg and not self.support_json_agg:
+            raise RelationLoadingNotSupportedException(
+                f'{relation_loading} is not supported by {self.__class__.__name__}')
+        self.relation_loading = relation_loading
+
+    def _cached_statement(self, key: Hashable, build: Callable[[], Executable]) -> Executable:
+        """
+        the statement of the shape of the request, it is built by the first request of the shape
+        """
+        if self.statement_cache is None:
+            return build()
+        stmt = self.statement_cache.get(key)
+        if stmt is None:
+            stmt = build()
+            self.statement_cache.set(key, stmt)
+        return stmt
+
+    def _path_param_type(self, param_name: str) -> Any:
+        table_name, column_name = param_name.split(FOREIGN_PATH_PARAM_KEYWORD)
+        return getattr(self.foreign_table_mapping[table_name], column_name).type
+
+    def _order_by_builder(self, order_by_columns) -> List[Tuple[Column, bool]]:
+        order_by_list = []
+        if not order_by_columns:
+            return order_by_list
+        for order_by_column in order_by_columns:
+            if not order_by_column:
+                continue
+            sort_column, _, order_by = order_by_column.replace(' ', '').partition(':')
+            column = self.order_by_column_map.get(sort_column, None)
+            if column is None:
+                raise UnknownColumn(f'column {sort_column} is not exited')
+            descending = ORDERING_DESCENDING.get(order_by.upper(), None)
+            if descending is None:
+                raise UnknownOrderType(f"Unknown order type {order_by}, only accept DESC or ASC")
+            order_by_list.append((column, descending))
+        return order_by_list
+
+    def _cursor_order_by_builder(self, order_by_columns) -> List[Tuple[Column, bool]]:
+        """
+        the primary key is always the last sort key, so that the cursor position is unique
+        """
+        order_by_list = self._order_by_builder(order_by_columns)
+        sort_keys = [column.expression.key for column, _ in order_by_list]
+        for primary_key_column in self.model.__table__.primary_key.columns:
+            if primary_key_column.key not in sort_keys:
+                order_by_list.append((primary_key_column, False))
+        return order_by_list
+
+    def get_cursor_keys(self, *, query: dict) -> Optional[List[str]]:
+        """
+        the column names of the row which used to build the next cursor, None if not in cursor pagination mode
+        """
+        if self.pagination_mode != PaginationMode.cursor:
+            return None
+        order_by_list = self._cursor_order_by_builder(query.get('order_by_columns', None))
+        return [column.expression.key for column, _ in order_by_list]
+
+    def _select_fields(self, fields, join_mode, required_columns=()) -> list:
+        """
+        the columns of the sparse fieldsets, all the columns if no field is given,
+        the primary key and the required columns are always selected
+        """
+        table = self.model.__table__
+        if not fields:
+            return [table] + self.get_join_select_fields(join_mode)
+        column_names = [column.key for column in table.primary_key.columns] + list(required_columns)
+        if self.relation_loading == RelationLoading.select_in:
+            column_names += [self._relation_parent_column(data).key for data in (join_mode or {}).values()]
+        column_names += [str(field) for field in fields if '.' not in str(field)]
+        return [table.c[column_name] for column_name in dict.fromkeys(column_names)] + \
+               self.get_join_select_fields(join_mode, fields)
 
     def get_many(self, *,
                  join_mode,
                  query,
                  target_model=None,
-                 abstract_param=None
-                 ) -> BinaryExpression:
+                 abstract_param=None,
+                 fields=None,
+                 stream=False
+                 ) -> BoundStatement:
+        """
+        :param stream: the rows are streamed, the joined rows of a parent are sorted to be adjacent
+        """
         filter_args = query
         limit = filter_args.pop('limit', None)
         offset = filter_args.pop('offset', None)
+        cursor = filter_args.pop('cursor', None)
         order_by_columns = filter_args.pop('order_by_columns', None)
+        abstract_param = abstract_param or {}
         model = self.model
         if target_model:
             model = self.foreign_table_mapping[target_model]
-        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
-                                                                 model=model)
-        path_filter_list: List[BinaryExpression] = path_query_builder(params=abstract_param,
-                                                                      model=self.foreign_table_mapping)
-        join_table_instance_list: list = self.get_join_select_fields(join_mode)
 
+        if self.pagination_mode == PaginationMode.cursor and not target_model:
+            if join_mode and limit is not None and self.relation_loading == RelationLoading.join:
+                # the limit counts the joined rows, the rest of the joined rows of the last parent would be skipped
+                raise InvalidCursor(400, f'the cursor pagination of join_foreign_table requires relation_loading '
+                                         f'{RelationLoading.select_in} or {RelationLoading.json_agg}')
+            order_by_list = self._cursor_order_by_builder(order_by_columns)
+        else:
+            order_by_list = self._order_by_builder(order_by_columns)
+            if stream and join_mode:
+                # the streaming merges the joined rows of the parent at the end of a chunk with the next chunk only,
+                # the parent is the last sort key, as in the cursor pagination
+                table = model if isinstance(model, Table) else model.__table__
+                sort_keys = [column.expression.key for column, _ in order_by_list]
+                for column in list(table.primary_key.columns) or list(table.columns):
+                    if column.key not in sort_keys:
+                        order_by_list.append((column, False))
+        cursor_values = None
+        if cursor and self.pagination_mode == PaginationMode.cursor and not target_model:
+            cursor_values = decode_cursor(cursor,
+                                          keys=[column.expression.key for column, _ in order_by_list],
+                                          columns=[column.expression for column, _ in order_by_list])
+
+        fields = None if target_model else fields or self.default_fields
+        params = query_param_values(filter_args, 'filter_')
+        params.update(query_param_values(abstract_param, 'path_'))
+        if cursor_values is not None:
+            params.update({f'cursor_{index}': value for index, value in enumerate(cursor_values)})
+        if limit is not None:
+            params['limit'] = limit
+        if offset is not None:
+            params['offset'] = offset
 
+        filter_plan = get_filter_plan(model)
+
+        def build() -> Executable:
+            filter_list: List[BinaryExpression] = find_query_builder(
+                param=query_param_placeholder(filter_args, 'filter_', lambda i: filter_plan[i].column.type),
+                model=model)
+            path_filter_list: List[BinaryExpression] = path_query_builder(
+                params=query_param_placeholder(abstract_param, 'path_', self._path_param_type),
+                model=self.foreign_table_mapping)
+            if fields:
+                select_fields = self._select_fields(fields, join_mode, required_columns=[
+                    column.expression.key for column, _ in order_by_list
+                    if self.pagination_mode == PaginationMode.cursor])
+            else:
+                select_fields = [model if isinstance(model, Table) else model.__table__] + \
+                                self.get_join_select_fields(join_mode)
+            if self.count_strategy == CountStrategy.window:
+                select_fields.append(func.count().over().label(WINDOW_TOTAL_COUNT_KEYWORD))
+            if cursor_values is not None:
+                filter_list.append(cursor_query_builder(order_by_list,
+                                                        [bindparam(f'cursor_{index}', type_=column.type)
+                                                         for index, (column, _) in enumerate(order_by_list)],
+                                                        row_value=self.support_row_value))
+
+            stmt = select(*select_fields).filter(and_(*filter_list + path_filter_list))
+            if order_by_list:
+                stmt = stmt.order_by(*[column.desc() if descending else column.asc()
+                                       for column, descending in order_by_list])
+            if limit is not None:
+                stmt = stmt.limit(bindparam('limit', type_=Integer))
+            if offset is not None:
+                stmt = stmt.offset(bindparam('offset', type_=Integer))
+            return self.get_join_by_excpression(stmt, join_mode=join_mode)
+
+        # the order_by_columns is resolved to the columns, the equivalent spelling shares the statement
+        key = ('get_many', target_model, query_param_shape(filter_args), tuple(abstract_param),
+               tuple((column.expression.key, descending) for column, descending in order_by_list),
+               cursor_values is not None, tuple(join_mode or ()), limit is not None, offset is not None,
+               tuple(map(str, fields or ())), stream)
+        return BoundStatement(self._cached_statement(key, build), params)
+
+    def get_count(self, *,
+                  join_mode,
+                  query,
+                  target_model=None,
+                  abstract_param=None
+                  ) -> List[BinaryExpression]:
+        """
+        the statements to count the total of get_many, sorted by preference,
+        the first statement with a not null result is used
+        """
+        if self.count_strategy is None or self.count_strategy == CountStrategy.window:
+            return []
+        filter_args = {key: value for key, value in query.items() if key not in PAGINATION_PARAM}
+        model = self.model
+        if target_model:
+            model = self.foreign_table_mapping[target_model]
+        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
+                                                                 model=model)
+        filter_list += path_query_builder(params=abstract_param,
+                                          model=self.foreign_table_mapping)
         if not isinstance(self.model, Table):
             model = model.__table__
 
-        stmt = select(*[model] + join_table_instance_list).filter(and_(*filter_list+path_filter_list))
-        if order_by_columns:
-            order_by_query_list = []
+        stmt = select(func.count()).select_from(model).filter(and_(*filter_list))
+        count_stmt_list = [self.get_join_by_excpression(stmt, join_mode=join_mode)]
+        if self.count_strategy == CountStrategy.estimated:
+            stmt = select(model).filter(and_(*filter_list))
+            # the inner join filters the parent rows without the related rows
+            join_filtered = bool(join_mode) and self.relation_loading == RelationLoading.join
+            estimated_count_stmt = self.get_estimated_count(table=model,
+                                                            stmt=self.get_join_by_excpression(stmt,
+                                                                                              join_mode=join_mode),
+                                                            filtered=bool(filter_list) or join_filtered)
+            if estimated_count_stmt is not None:
+                count_stmt_list.insert(0, estimated_count_stmt)
+        return count_stmt_list
 
-            for order_by_column in order_by_columns:
-                if not order_by_column:
-                    continue
-                sort_column, order_by = (order_by_column.replace(' ', '').split(':') + [None])[:2]
-                if not hasattr(self.model_columns, sort_column):
-                    raise UnknownColumn(f'column {sort_column} is not exited')
-                if not order_by:
-                    order_by_query_list.append(getattr(self.model_columns, sort_column).asc())
-                elif order_by.upper() == Ordering.DESC.upper():
-                    order_by_query_list.append(getattr(self.model_columns, sort_column).desc())
-                elif order_by.upper() == Ordering.ASC.upper():
-                    order_by_query_list.append(getattr(self.model_columns, sort_column).asc())
-                else:
-                    raise UnknownOrderType(f"Unknown order type {order_by}, only accept DESC or ASC")
-            if order_by_query_list:
-                stmt = stmt.order_by(*order_by_query_list)
-        stmt = stmt.limit(limit).offset(offset)
-        stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
-        return stmt
+    def get_estimated_count(self, *, table: Table, stmt, filtered: bool) -> Optional[Executable]:
+        """
+        the statement to read an estimated row count of the statement, None if the dialect can not estimate
+        """
+        return None
+
+    def get_version(self, *,
+                    join_mode,
+                    query,
+                    extra_args=None
+                    ) -> Optional[Executable]:
+        """
+        the statement of the max of the etag column and the count of the rows matched by the filters of
+        get_one/get_many, the rows are changed if either of them is changed, None if there is no etag column
+        """
+        if self.etag_column is None:
+            return None
+        filter_args = {key: value for key, value in query.items() if key not in PAGINATION_PARAM}
+        table = self.model.__table__
+        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args, model=self.model)
+        filter_list += find_query_builder(param=extra_args or {}, model=self.model)
+        stmt = select(func.max(table.c[self.etag_column]), func.count()).select_from(table).filter(
+            and_(*filter_list))
+        return self.get_join_by_excpression(stmt, join_mode=join_mode)
 
     def get_one(self, *,
                 extra_args: dict,
                 filter_args: dict,
-                join_mode=None
-                ) -> BinaryExpression:
-        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
-                                                                 model=self.model_columns)
+                join_mode=None,
+                fields=None
+                ) -> BoundStatement:
+        params = query_param_values(filter_args, 'filter_')
+        params.update(query_param_values(extra_args, 'extra_'))
 
-        extra_query_expression: List[BinaryExpression] = find_query_builder(param=extra_args,
-                                                                            model=self.model)
-        join_table_instance_list: list = self.get_join_select_fields(join_mode)
-        model = self.model
-        if not isinstance(self.model, Table):
-            model = model.__table__
-        stmt = select(*[model] + join_table_instance_list).where(and_(*filter_list + extra_query_expression))
-        # stmt = session.query(*[model] + join_table_instance_list).filter(and_(*filter_list + extra_query_expression))
-        stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
-        return stmt
+        def build() -> Executable:
+            filter_list: List[BinaryExpression] = find_query_builder(
+                param=query_param_placeholder(filter_args, 'filter_', lambda i: self.filter_plan[i].column.type),
+                model=self.model_columns)
+
+            extra_query_expression: List[BinaryExpression] = find_query_builder(
+                param=query_param_placeholder(extra_args, 'extra_', lambda i: self.filter_plan[i].column.type),
+                model=self.model)
+            stmt = select(*self._select_fields(fields, join_mode)).where(and_(*filter_list + extra_query_expression))
+            # stmt = session.query(*[model] + join_table_instance_list).filter(and_(*filter_list + extra_query_expression))
+            stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
+            return stmt
+
+        key = ('get_one', query_param_shape(filter_args), query_param_shape(extra_args), tuple(join_mode or ()),
+               tuple(map(str, fields or ())))
+        return BoundStatement(self._cached_statement(key, build), params)
+
+    def get_by_primary_keys(self, *, primary_keys: list, fields=None) -> BoundStatement:
+        """
+        the rows of get_one of the primary keys in one WHERE pk IN (...) query, see FindOneCoalescer
+        """
+
+        def build() -> Executable:
+            primary_key_column, = self.model.__table__.primary_key.columns
+            return select(*self._select_fields(fields, None)).where(
+                primary_key_column.in_(bindparam('primary_keys', expanding=True)))
+
+        key = ('get_by_primary_keys', tuple(map(str, fields or ())))
+        return BoundStatement(self._cached_statement(key, build), {'primary_keys': primary_keys})
 
     def create(self, *,
                insert_arg,
@@ -105,7 +499,7 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
         if not isinstance(insert_arg_dict, list):
             insert_arg_dict = [insert_arg_dict]
 
-        insert_arg_dict: list[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
+        insert_arg_dict: List[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
                                        for insert_arg in insert_arg_dict]
         if isinstance(insert_arg_dict, list):
             new_data = []
@@ -120,6 +514,74 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
                ) -> BinaryExpression:
         raise NotImplementedError
 
+    def _upsert_args(self, insert_arg, upsert_one=True) -> Tuple[List[dict], Optional[List[str]]]:
+        """
+        the rows of the upsert request, and the columns to update when the unique columns got conflict,
+        None if the request has no on_conflict
+        """
+        insert_arg_dict: Union[list, dict] = insert_arg
+
+        insert_with_conflict_handle = insert_arg_dict.pop('on_conflict', None)
+        if not upsert_one:
+            insert_arg_list: list = insert_arg_dict.pop('insert', None)
+            insert_arg_dict = []
+            for i in insert_arg_list:
+                insert_arg_dict.append(i.__dict__)
+
+        if not isinstance(insert_arg_dict, list):
+            insert_arg_dict: List[dict] = [insert_arg_dict]
+        insert_arg_dict: List[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
+                                       for insert_arg in insert_arg_dict]
+        if not insert_with_conflict_handle:
+            return insert_arg_dict, None
+        update_columns = clean_input_fields(insert_with_conflict_handle.__dict__.get('update_columns', None),
+                                            self.model_columns)
+        if not update_columns:
+            raise UpdateColumnEmptyException('update_columns parameter must be a non-empty list ')
+        return insert_arg_dict, update_columns
+
+    def bulk_insert(self, *,
+                    columns: List[str],
+                    unique_fields: List[str],
+                    merge=False) -> Executable:
+        """
+        INSERT statement of a batch of the bulk load, executed with the list of rows (executemany)
+        """
+        raise NotImplementedError
+
+    def insert(self, *,
+               insert_arg,
+               create_one=True,
+               ) -> Optional[List[Executable]]:
+        """
+        multi rows INSERT ... VALUES ... RETURNING in batches, the bind parameters of a batch are less than
+        max_bind_params, None if the ORM should be used, since it is not in core write mode
+        or the dialect does not support RETURNING
+        """
+        if self.write_mode != WriteMode.core or not self.support_returning:
+            return None
+        insert_arg_dict: Union[list, dict] = insert_arg
+        if not create_one:
+            insert_arg_dict = [i.__dict__ for i in insert_arg_dict.pop('insert', None)]
+        if not isinstance(insert_arg_dict, list):
+            insert_arg_dict = [insert_arg_dict]
+        insert_arg_dict: List[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
+                                       for insert_arg in insert_arg_dict]
+        table = self.model.__table__
+        insert_stmt_list = []
+        # the rows of a multi rows VALUES must have the same columns
+        for _, group in groupby(insert_arg_dict, key=lambda i: tuple(i.keys())):
+            group = list(group)
+            if not group[0]:
+                # INSERT ... DEFAULT VALUES
+                insert_stmt_list += [ReturningInsert(table).returning(*table.c) for _ in group]
+                continue
+            batch_size = max(1, self.max_bind_params // len(group[0]))
+            for index in range(0, len(group), batch_size):
+                insert_stmt_list.append(ReturningInsert(table).values(group[index:index + batch_size])
+                                        .returning(*table.c))
+        return insert_stmt_list
+
     def insert_one(self, *,
                    insert_args) -> BinaryExpression:
         insert_args = insert_args
@@ -128,22 +590,135 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
         inserted_instance = self.model(**update_columns)
         return inserted_instance
 
-    def get_join_select_fields(self, join_mode=None):
+    def get_primary_key_names(self, target_model=None) -> List[str]:
+        """
+        the keys of the primary key columns in the select of get_one/get_many, which identify the parent row
+        of the joined rows
+        """
+        model = self.foreign_table_mapping[target_model] if target_model else self.model
+        table = model if isinstance(model, Table) else model.__table__
+        return [column.key for column in table.primary_key.columns]
+
+    @staticmethod
+    def _join_fields(fields) -> dict:
+        join_fields = {}
+        for field in fields or []:
+            table_name, _, column_name = str(field).partition('.')
+            if column_name:
+                join_fields.setdefault(table_name, set()).add(column_name)
+        return join_fields
+
+    @staticmethod
+    def _relation_columns(local_reference_pairs, join_fields) -> List[Tuple[str, str, Column]]:
+        """
+        (foreign table name, column name, column) of the joined table of a relation
+        """
+        relation_columns = []
+        for local_reference in local_reference_pairs:
+            if 'exclude' in local_reference and local_reference['exclude']:
+                continue
+            for column in local_reference['reference_table_columns']:
+                foreign_table_name = local_reference['reference']['reference_table']
+                column_name = str(column).split('.')[1]
+                if foreign_table_name in join_fields and column_name not in join_fields[foreign_table_name]:
+                    continue
+                relation_columns.append((foreign_table_name, column_name, column))
+        return relation_columns
+
+    @staticmethod
+    def _relation_parent_column(table_instance) -> Column:
+        local_reference = table_instance['local_reference_pairs_set'][0]
+        return getattr(local_reference['local_table_columns'], local_reference['local']['local_column'])
+
+    @staticmethod
+    def _relation_name(table_instance) -> str:
+        foreign_table_name, = {local_reference['reference']['reference_table']
+                               for local_reference in table_instance['local_reference_pairs_set']
+                               if not local_reference.get('exclude', False)}
+        return foreign_table_name + '_foreign'
+
+    @staticmethod
+    def _relation_select(table_instance, select_fields) -> Tuple[Executable, Column]:
+        """
+        select from the table referenced by the parent and join the rest of the relation, e.g. the secondary table
+        of many to many, and the column of the first table which references the parent
+        """
+        local_reference_pairs = table_instance['local_reference_pairs_set']
+        first_reference = local_reference_pairs[0]
+        key_column = getattr(first_reference['reference_table_columns'],
+                             first_reference['reference']['reference_column'])
+        stmt = select(*select_fields).select_from(first_reference['reference_table'])
+        for local_reference in local_reference_pairs[1:]:
+            local_column = getattr(local_reference['local_table_columns'], local_reference['local']['local_column'])
+            reference_column = getattr(local_reference['reference_table_columns'],
+                                       local_reference['reference']['reference_column'])
+            stmt = stmt.join(local_reference['reference_table'], local_column == reference_column)
+        return stmt, key_column
+
+    def json_array_agg(self, columns: List[Tuple[str, Column]]) -> ClauseElement:
+        """
+        the aggregate of the related rows into a json array of objects, [] if there is no related row
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _json_object_args(columns: List[Tuple[str, Column]]) -> list:
+        # the keys are the column names of the model, rendered as literals instead of bind parameters so that
+        # the type of them does not need to be inferred
+        args = []
+        for column_name, column in columns:
+            args += [literal_column("'" + column_name.replace("'", "''") + "'"), column]
+        return args
+
+    def get_join_select_fields(self, join_mode=None, fields=None):
+        """
+        :param fields: the sparse fieldsets, the columns of a joined table are <table>.<column>, all the columns of
+                       the joined table are selected if none of them is given
+        """
         join_table_instance_list = []
-        if not join_mode:
+        if not join_mode or self.relation_loading == RelationLoading.select_in:
             return join_table_instance_list
+        join_fields = self._join_fields(fields)
         for _, table_instance in join_mode.items():
-            for local_reference in table_instance['local_reference_pairs_set']:
-                if 'exclude' in local_reference and local_reference['exclude']:
-                    continue
-                for column in local_reference['reference_table_columns']:
-                    foreign_table_name = local_reference['reference']['reference_table']
-                    join_table_instance_list.append(
-                        column.label(foreign_table_name + '_foreign_____' + str(column).split('.')[1]))
+            relation_columns = self._relation_columns(table_instance['local_reference_pairs_set'], join_fields)
+            if self.relation_loading == RelationLoading.json_agg:
+                # a correlated subquery per relation, the parent row is not repeated by the related rows
+                stmt, key_column = self._relation_select(table_instance, [self.json_array_agg(
+                    [(column_name, column) for _, column_name, column in relation_columns])])
+                stmt = stmt.where(key_column == self._relation_parent_column(table_instance))
+                join_table_instance_list.append(stmt.scalar_subquery().label(self._relation_name(table_instance)))
+                continue
+            for foreign_table_name, column_name, column in relation_columns:
+                join_table_instance_list.append(column.label(foreign_table_name + '_foreign_____' + column_name))
         return join_table_instance_list
 
+    def get_relations(self, join_mode=None, fields=None) -> List[RelationStatement]:
+        """
+        the statements of the related rows of RelationLoading.select_in, they are executed after the parent rows
+        with the keys of the parent rows, [] in the other relation loading
+        """
+        if not join_mode or self.relation_loading != RelationLoading.select_in:
+            return []
+
+        def build() -> List[RelationStatement]:
+            join_fields = self._join_fields(fields)
+            relation_list = []
+            for _, table_instance in join_mode.items():
+                select_fields = [column.label(column_name) for _, column_name, column in
+                                 self._relation_columns(table_instance['local_reference_pairs_set'], join_fields)]
+                stmt, key_column = self._relation_select(table_instance, select_fields)
+                stmt = stmt.add_columns(key_column.label(RELATION_KEY_KEYWORD)).where(
+                    key_column.in_(bindparam('parent_keys', expanding=True)))
+                relation_list.append(RelationStatement(name=self._relation_name(table_instance),
+                                                       parent_key=self._relation_parent_column(table_instance).key,
+                                                       statement=stmt,
+                                                       chunk_size=self.max_bind_params))
+            return relation_list
+
+        return self._cached_statement(('get_relations', tuple(join_mode), tuple(map(str, fields or ()))), build)
+
     def get_join_by_excpression(self, stmt: BinaryExpression, join_mode=None) -> BinaryExpression:
-        if not join_mode:
+        if not join_mode or self.relation_loading != RelationLoading.join:
             return stmt
         for join_table, data in join_mode.items():
             for local_reference in data['local_reference_pairs_set']:
@@ -155,20 +730,41 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
                 stmt = stmt.join(table, local_column == reference_column)
         return stmt
 
-    # def delete(self,
-    #            *,
-    #            delete_args: dict,
-    #            session,
-    #            primary_key: dict = None,
-    #            ) -> BinaryExpression:
-    #     filter_list: List[BinaryExpression] = find_query_builder(param=delete_args,
-    #                                                              model=self.model_columns)
-    #     if primary_key:
-    #         filter_list += find_query_builder(param=primary_key,
-    #                                           model=self.model_columns)
-    #
-    #     delete_instance = session.query(self.model).where(and_(*filter_list))
-    #     return delete_instance
+    def _delete_need_orm(self) -> bool:
+        """
+        whether deleting a row needs the unit of work, which cascades the delete or nullifies the foreign key
+        of the related rows, a relationship with passive_deletes leaves it to ON DELETE of the database
+        """
+        if self._delete_need_orm_cache is None:
+            need_orm = False
+            for relationship in inspect(self.model).relationships:
+                if relationship.passive_deletes:
+                    continue
+                if relationship.direction in (interfaces.ONETOMANY, interfaces.MANYTOMANY) \
+                        or relationship.cascade.delete:
+                    need_orm = True
+                    break
+            self._delete_need_orm_cache = need_orm
+        return self._delete_need_orm_cache
+
+    def delete(self, *,
+               filter_args: dict,
+               extra_args: dict = None
+               ) -> Optional[Executable]:
+        """
+        a set based DELETE ... RETURNING of the matched rows,
+        None if the ORM should be used, since it is not in core write mode, the dialect does not support RETURNING
+        or the delete should be cascaded by the ORM
+        """
+        if self.write_mode != WriteMode.core or not self.support_returning or self._delete_need_orm():
+            return None
+        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
+                                                                 model=self.model_columns)
+        if extra_args:
+            filter_list += find_query_builder(param=extra_args,
+                                              model=self.model_columns)
+        table = self.model.__table__
+        return ReturningDelete(table).where(and_(*filter_list)).returning(*table.c)
 
     def model_query(self,
                     *,
@@ -211,27 +807,37 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
         return stmt
 
 
-    # def update(self, *,
-    #            update_args,
-    #            extra_query,
-    #            session,
-    #            primary_key=None,
-    #            ) -> BinaryExpression:
-    #
-    #
-    #     filter_list: List[BinaryExpression] = find_query_builder(param=extra_query,
-    #                                                              model=self.model_columns)
-    #     if primary_key:
-    #         primary_key = primary_key
-    #         filter_list += find_query_builder(param=primary_key, model=self.model_columns)
-    #     update_stmt = update(self.model).where(and_(*filter_list)).values(update_args)
-    #     update_stmt = update_stmt.execution_options(synchronize_session=False)
-    #     return update_stmt
+    def update(self, *,
+               update_args,
+               filter_args: dict,
+               extra_args: dict = None
+               ) -> Optional[Executable]:
+        """
+        a set based UPDATE ... RETURNING of the matched rows,
+        None if the ORM should be used, since it is not in core write mode, the dialect does not support RETURNING
+        or there is nothing to update
+        """
+        if self.write_mode != WriteMode.core or not self.support_returning:
+            return None
+        update_args = clean_input_fields(update_args, self.model_columns)
+        if not update_args:
+            return None
+        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
+                                                                 model=self.model_columns)
+        if extra_args:
+            filter_list += find_query_builder(param=extra_args,
+                                              model=self.model_columns)
+        table = self.model.__table__
+        return ReturningUpdate(table).where(and_(*filter_list)).values(update_args).returning(*table.c)
 
 
 class SQLAlchemyPGSQLQueryService(SQLAlchemyGeneralSQLQueryService):
+    support_row_value = True
+    support_returning = True
+    max_bind_params = 32767
+    support_json_agg = True
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
 
         """
         :param model: declarative_base model
@@ -240,7 +846,8 @@ class SQLAlchemyPGSQLQueryService(SQLAlchemyGeneralSQLQueryService):
         super(SQLAlchemyPGSQLQueryService,
               self).__init__(model=model,
                              async_mode=async_mode,
-                             foreign_table_mapping=foreign_table_mapping)
+                             foreign_table_mapping=foreign_table_mapping,
+                             **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -250,26 +857,10 @@ class SQLAlchemyPGSQLQueryService(SQLAlchemyGeneralSQLQueryService):
                unique_fields: List[str],
                upsert_one=True,
                ) -> BinaryExpression:
-        insert_arg_dict: Union[list, dict] = insert_arg
-
-        insert_with_conflict_handle = insert_arg_dict.pop('on_conflict', None)
-        if not upsert_one:
-            insert_arg_list: list = insert_arg_dict.pop('insert', None)
-            insert_arg_dict = []
-            for i in insert_arg_list:
-                insert_arg_dict.append(i.__dict__)
-
-        if not isinstance(insert_arg_dict, list):
-            insert_arg_dict: list[dict] = [insert_arg_dict]
-        insert_arg_dict: list[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
-                                       for insert_arg in insert_arg_dict]
+        insert_arg_dict, update_columns = self._upsert_args(insert_arg, upsert_one)
         insert_stmt = insert(self.model).values(insert_arg_dict)
 
-        if unique_fields and insert_with_conflict_handle:
-            update_columns = clean_input_fields(insert_with_conflict_handle.__dict__.get('update_columns', None),
-                                                self.model_columns)
-            if not update_columns:
-                raise UpdateColumnEmptyException('update_columns parameter must be a non-empty list ')
+        if unique_fields and update_columns:
             conflict_update_dict = {}
             for columns in update_columns:
                 conflict_update_dict[columns] = getattr(insert_stmt.excluded, columns)
@@ -282,17 +873,77 @@ class SQLAlchemyPGSQLQueryService(SQLAlchemyGeneralSQLQueryService):
         insert_stmt = insert_stmt.returning(text('*'))
         return insert_stmt
 
+    def copy_from_stdin(self, *,
+                        columns: List[str],
+                        bulk_format: BulkLoadFormat,
+                        header=False,
+                        table_name: Optional[str] = None) -> str:
+        """
+        COPY ... FROM STDIN into the table of the model, or into the staging table if table_name is given
+        """
+        preparer = postgresql.dialect().identifier_preparer
+        target = preparer.quote(table_name) if table_name else preparer.format_table(self.model.__table__)
+        if bulk_format == BulkLoadFormat.binary:
+            options = 'FORMAT binary'
+        else:
+            options = f'FORMAT csv, HEADER {str(bool(header)).lower()}'
+        return f'COPY {target} ({", ".join(preparer.quote(i) for i in columns)}) FROM STDIN WITH ({options})'
+
+    def bulk_load_staging(self, *,
+                          columns: List[str],
+                          unique_fields: List[str]) -> Tuple[str, Executable, Executable]:
+        """
+        the temporary staging table of the bulk load, and INSERT ... SELECT ... ON CONFLICT to merge it into the table,
+        the loaded columns except the unique columns are updated when the unique columns got conflict,
+        the client side default of the other columns is applied by the INSERT
+        """
+        model_table = self.model.__table__
+        staging_table_name = f'_bulk_load_{uuid.uuid4().hex}'
+        preparer = postgresql.dialect().identifier_preparer
+        # the staging table only has the loaded columns without the constraints of the table
+        create_stmt = text(f'CREATE TEMPORARY TABLE {preparer.quote(staging_table_name)} ON COMMIT DROP AS '
+                           f'SELECT {", ".join(preparer.quote(i) for i in columns)} '
+                           f'FROM {preparer.format_table(model_table)} WITH NO DATA')
+        staging_table = table(staging_table_name, *[column(i) for i in columns])
+        merge_stmt = insert(model_table).from_select(columns, select(*staging_table.c))
+        update_columns = [i for i in columns if i not in unique_fields]
+        if update_columns:
+            merge_stmt = merge_stmt.on_conflict_do_update(index_elements=unique_fields,
+                                                          set_={i: getattr(merge_stmt.excluded, i)
+                                                                for i in update_columns})
+        else:
+            merge_stmt = merge_stmt.on_conflict_do_nothing(index_elements=unique_fields)
+        return staging_table_name, create_stmt, merge_stmt
+
+    def json_array_agg(self, columns: List[Tuple[str, Column]]) -> ClauseElement:
+        # json_agg of no row is NULL
+        return func.coalesce(func.json_agg(func.json_build_object(*self._json_object_args(columns))),
+                             literal_column("'[]'::json"), type_=JSON)
+
+    def get_estimated_count(self, *, table: Table, stmt, filtered: bool) -> Optional[Executable]:
+        if filtered:
+            return Explain(stmt)
+        # reltuples is -1 (or 0 before PostgreSQL 14) if the table never be analyzed
+        return text("SELECT CASE WHEN c.reltuples < 0 OR c.relpages = 0 THEN NULL ELSE c.reltuples::bigint END "
+                    "FROM pg_class c WHERE c.oid = CAST(:table_name AS regclass)").bindparams(
+            table_name=postgresql.dialect().identifier_preparer.format_table(table))
+
 
 class SQLAlchemySQLITEQueryService(SQLAlchemyGeneralSQLQueryService):
+    support_row_value = True
+    support_returning = sqlite3.sqlite_version_info >= (3, 35)
+    max_bind_params = 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999
+    support_json_agg = sqlite3.sqlite_version_info >= (3, 9)
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -301,20 +952,70 @@ class SQLAlchemySQLITEQueryService(SQLAlchemyGeneralSQLQueryService):
                insert_arg,
                unique_fields: List[str],
                upsert_one=True,
-               ) -> BinaryExpression:
-        raise NotImplementedError
+               ) -> List[Executable]:
+        """
+        multi rows INSERT ... VALUES ... ON CONFLICT DO UPDATE ... RETURNING in batches, the bind parameters of
+        a batch are less than max_bind_params, the rows returned by the batches are the rows of the upsert
+        """
+        if not self.support_returning:
+            raise NotImplementedError('the upsert of SQLite needs RETURNING of SQLite 3.35')
+        insert_arg_dict, update_columns = self._upsert_args(insert_arg, upsert_one)
+        table = self.model.__table__
+        conflict_list = clean_input_fields(model=self.model_columns, param=unique_fields) if unique_fields else []
+
+        def upsert_stmt(rows) -> Executable:
+            insert_stmt = ReturningSQLiteInsert(table).values(rows)
+            if conflict_list and update_columns:
+                insert_stmt = insert_stmt.on_conflict_do_update(
+                    index_elements=conflict_list,
+                    set_={i: getattr(insert_stmt.excluded, i) for i in update_columns})
+            return insert_stmt.returning(*table.c)
+
+        upsert_stmt_list = []
+        # the rows of a multi rows VALUES must have the same columns
+        for _, group in groupby(insert_arg_dict, key=lambda i: tuple(i.keys())):
+            group = list(group)
+            batch_size = max(1, self.max_bind_params // max(1, len(group[0])))
+            for index in range(0, len(group), batch_size):
+                upsert_stmt_list.append(upsert_stmt(group[index:index + batch_size]))
+        return upsert_stmt_list
+
+    def bulk_insert(self, *,
+                    columns: List[str],
+                    unique_fields: List[str],
+                    merge=False) -> Executable:
+        insert_stmt = ReturningSQLiteInsert(self.model.__table__)
+        if not merge:
+            return insert_stmt
+        update_columns = [i for i in columns if i not in unique_fields]
+        if not update_columns:
+            return insert_stmt.on_conflict_do_nothing(index_elements=unique_fields)
+        return insert_stmt.on_conflict_do_update(index_elements=unique_fields,
+                                                 set_={i: getattr(insert_stmt.excluded, i) for i in update_columns})
+
+    def json_array_agg(self, columns: List[Tuple[str, Column]]) -> ClauseElement:
+        # the BLOB columns can not be in a json object of SQLite
+        return func.json_group_array(func.json_object(*self._json_object_args(columns)), type_=JSON)
+
+    def get_estimated_count(self, *, table: Table, stmt, filtered: bool) -> Optional[Executable]:
+        if filtered:
+            return None
+        # sqlite_stat1 is created by ANALYZE, the first integer of stat is the row count of the table
+        return text("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = :table_name LIMIT 1").bindparams(
+            table_name=table.name)
 
 
 class SQLAlchemyMySQLQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -329,14 +1030,15 @@ class SQLAlchemyMySQLQueryService(SQLAlchemyGeneralSQLQueryService):
 
 class SQLAlchemyMariaDBQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -351,14 +1053,15 @@ class SQLAlchemyMariaDBQueryService(SQLAlchemyGeneralSQLQueryService):
 
 class SQLAlchemyOracleQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -373,14 +1076,15 @@ class SQLAlchemyOracleQueryService(SQLAlchemyGeneralSQLQueryService):
 
 class SQLAlchemyMSSqlQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -395,14 +1099,15 @@ class SQLAlchemyMSSqlQueryService(SQLAlchemyGeneralSQLQueryService):
 
 class SQLAlchemyNotSupportQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, **kwargs):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         **kwargs)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -3,11 +3,29 @@ from http import HTTPStatus
 from typing import Union
 
 from fastapi import \
+    BackgroundTasks, \
     Depends, \
     Response
 from sqlalchemy.exc import IntegrityError
 from starlette.requests import Request
 
+from .batch import in_batch
+from .bulk_load import BlockingStreamReader, csv_batches, event_loop, iter_blocking, iter_csv_batches
+from .etag import conditional_response, if_none_match, not_modified, version_etag
+from .type import BulkLoadFormat
+from .utils import query_param_values
+
+
+def conflict_response(e: IntegrityError) -> Response:
+    """
+    409 with the message of the database if the write violates a unique constraint, the other integrity errors
+    are raised
+    """
+    err_msg = str(e.orig)
+    if 'unique constraint' not in err_msg.lower():
+        raise e
+    return Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
+
 
 class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
     """ This route will support the SQL SQLAlchemy dialects. """
@@ -24,47 +42,120 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                  dependencies,
                  request_url_param_model,
                  request_query_model,
-                 db_session):
+                 db_session,
+                 response_cache=None,
+                 coalescer=None):
 
         if not async_mode:
             @api.get(path, status_code=200, response_model=response_model, dependencies=dependencies)
             def get_one_by_primary_key(response: Response,
                                        request: Request,
+                                       background_tasks: BackgroundTasks,
                                        url_param=Depends(request_url_param_model),
                                        query=Depends(request_query_model),
                                        session=Depends(db_session)):
 
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_one(filter_args=query.__dict__,
-                                             extra_args=url_param.__dict__,
-                                             join_mode=join)
-                query_result = execute_service.execute(session, stmt)
-                response_result = parsing_service.find_one(response_model=response_model,
-                                                           sql_execute_result=query_result,
-                                                           fastapi_response=response,
-                                                           session=session,
-                                                           join_mode=join)
-                return response_result
+                fields = query.__dict__.pop('fields', None)
+
+                def find_one(fastapi_response):
+                    primary_key = query_service.get_primary_key_names()
+                    stmt = query_service.get_one(filter_args=query.__dict__,
+                                                 extra_args=url_param.__dict__,
+                                                 join_mode=join,
+                                                 fields=fields)
+                    query_result = execute_service.execute(session, stmt)
+                    query_result, relations = execute_service.load_relations(
+                        session, query_result, query_service.get_relations(join_mode=join, fields=fields))
+                    return parsing_service.find_one(response_model=response_model,
+                                                    sql_execute_result=query_result,
+                                                    fastapi_response=fastapi_response,
+                                                    session=session,
+                                                    join_mode=join,
+                                                    relations=relations,
+                                                    primary_key=primary_key)
+
+                params = (request.url.path, sorted(query.__dict__.items()), join, fields)
+                version_stmt = query_service.get_version(query=query.__dict__,
+                                                         extra_args=url_param.__dict__,
+                                                         join_mode=join)
+                if version_stmt is not None:
+                    version_row = execute_service.execute(session, version_stmt).one()
+                    etag = version_etag(version_row, params)
+                    # the count of the version, the row does not exist if it is 0
+                    if if_none_match(request, etag, exists=bool(version_row[1])):
+                        return not_modified(etag, response)
+                    response.headers['etag'] = etag
+                    # the cached response of another version is not returned with this etag
+                    params += (etag,)
+
+                if response_cache is None:
+                    result = find_one(response)
+                else:
+                    result = response_cache.cached(find_one, response, background_tasks,
+                                                   params=params,
+                                                   path_params=url_param.__dict__)
+                return conditional_response(request, result, response)
         else:
             @api.get(path, status_code=200, response_model=response_model, dependencies=dependencies)
             async def async_get_one_by_primary_key(response: Response,
                                                    request: Request,
+                                                   background_tasks: BackgroundTasks,
                                                    url_param=Depends(request_url_param_model),
                                                    query=Depends(request_query_model),
                                                    session=Depends(db_session)):
 
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_one(filter_args=query.__dict__,
-                                             extra_args=url_param.__dict__,
-                                             join_mode=join)
-                query_result = await execute_service.async_execute(session, stmt)
-
-                response_result = await parsing_service.async_find_one(response_model=response_model,
-                                                                       sql_execute_result=query_result,
-                                                                       fastapi_response=response,
-                                                                       session=session,
-                                                                       join_mode=join)
-                return response_result
+                fields = query.__dict__.pop('fields', None)
+
+                async def query_one():
+                    stmt = query_service.get_one(filter_args=query.__dict__,
+                                                 extra_args=url_param.__dict__,
+                                                 join_mode=join,
+                                                 fields=fields)
+                    return await execute_service.async_execute(session, stmt)
+
+                async def find_one(fastapi_response):
+                    primary_key = query_service.get_primary_key_names()
+                    # the lookups of the primary key only, out of a batch which reads its own writes, are coalesced
+                    if coalescer is not None and not join and not in_batch(session) and \
+                            all(value is None for value in query_param_values(query.__dict__, '').values()):
+                        query_result = await coalescer.find_one(session, url_param.__dict__[primary_key[0]],
+                                                                query_one, fields=fields)
+                    else:
+                        query_result = await query_one()
+                    query_result, relations = await execute_service.async_load_relations(
+                        session, query_result, query_service.get_relations(join_mode=join, fields=fields))
+
+                    return await parsing_service.async_find_one(response_model=response_model,
+                                                                sql_execute_result=query_result,
+                                                                fastapi_response=fastapi_response,
+                                                                session=session,
+                                                                join_mode=join,
+                                                                relations=relations,
+                                                                primary_key=primary_key)
+
+                params = (request.url.path, sorted(query.__dict__.items()), join, fields)
+                version_stmt = query_service.get_version(query=query.__dict__,
+                                                         extra_args=url_param.__dict__,
+                                                         join_mode=join)
+                if version_stmt is not None:
+                    version_row = (await execute_service.async_execute(session, version_stmt)).one()
+                    etag = version_etag(version_row, params)
+                    # the count of the version, the row does not exist if it is 0
+                    if if_none_match(request, etag, exists=bool(version_row[1])):
+                        return not_modified(etag, response)
+                    response.headers['etag'] = etag
+                    # the cached response of another version is not returned with this etag
+                    params += (etag,)
+
+                if response_cache is None:
+                    result = await find_one(response)
+                else:
+                    result = await response_cache.async_cached(find_one, response, background_tasks,
+                                                               params=params,
+                                                               path_params=url_param.__dict__)
+                return conditional_response(request, result, response)
 
     @classmethod
     def find_many(cls, api, *,
@@ -76,45 +167,137 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                   response_model,
                   dependencies,
                   request_query_model,
-                  db_session):
+                  db_session,
+                  response_cache=None):
 
         if async_mode:
             @api.get(path, dependencies=dependencies, response_model=response_model)
             async def async_get_many(response: Response,
                                      request: Request,
+                                     background_tasks: BackgroundTasks,
                                      query=Depends(request_query_model),
                                      session=Depends(
                                          db_session)
                                      ):
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_many(query=query.__dict__, join_mode=join)
-
-                query_result = await execute_service.async_execute(session, stmt)
-
-                parsed_response = await parsing_service.async_find_many(response_model=response_model,
-                                                                        sql_execute_result=query_result,
-                                                                        fastapi_response=response,
-                                                                        join_mode=join,
-                                                                        session=session)
-                return parsed_response
+                fields = query.__dict__.pop('fields', None)
+
+                async def find_many(fastapi_response):
+                    primary_key = query_service.get_primary_key_names()
+                    cursor_keys = query_service.get_cursor_keys(query=query.__dict__)
+                    limit = query.__dict__.get('limit', None)
+                    stmt = query_service.get_many(query=query.__dict__, join_mode=join, fields=fields,
+                                                  stream=bool(parsing_service.stream_format))
+                    count_stmt = query_service.get_count(query=query.__dict__, join_mode=join)
+
+                    if parsing_service.stream_format:
+                        total_count = await execute_service.async_count(session, count_stmt)
+                        query_result = await execute_service.async_stream(session, stmt)
+                        return await parsing_service.async_stream_find_many(response_model=response_model,
+                                                                            sql_execute_result=query_result,
+                                                                            fastapi_response=fastapi_response,
+                                                                            join_mode=join,
+                                                                            primary_key=primary_key,
+                                                                            cursor_keys=cursor_keys,
+                                                                            limit=limit,
+                                                                            total_count=total_count,
+                                                                            session=session)
+
+                    query_result, total_count = await execute_service.async_execute_with_count(session, stmt,
+                                                                                               count_stmt)
+                    query_result, relations = await execute_service.async_load_relations(
+                        session, query_result, query_service.get_relations(join_mode=join, fields=fields))
+
+                    return await parsing_service.async_find_many(response_model=response_model,
+                                                                 sql_execute_result=query_result,
+                                                                 fastapi_response=fastapi_response,
+                                                                 join_mode=join,
+                                                                 relations=relations,
+                                                                 primary_key=primary_key,
+                                                                 cursor_keys=cursor_keys,
+                                                                 limit=limit,
+                                                                 total_count=total_count,
+                                                                 session=session)
+
+                params = (request.url.path, sorted(query.__dict__.items()), join, fields)
+                version_stmt = query_service.get_version(query=query.__dict__, join_mode=join)
+                if version_stmt is not None:
+                    etag = version_etag((await execute_service.async_execute(session, version_stmt)).one(), params)
+                    if if_none_match(request, etag):
+                        return not_modified(etag, response)
+                    response.headers['etag'] = etag
+                    # the cached response of another version is not returned with this etag
+                    params += (etag,)
+
+                if response_cache is None:
+                    result = await find_many(response)
+                else:
+                    result = await response_cache.async_cached(find_many, response, background_tasks, params=params)
+                return conditional_response(request, result, response)
         else:
             @api.get(path, dependencies=dependencies, response_model=response_model)
             def get_many(response: Response,
                          request: Request,
+                         background_tasks: BackgroundTasks,
                          query=Depends(request_query_model),
                          session=Depends(
                              db_session)
                          ):
                 join = query.__dict__.pop('join_foreign_table', None)
+                fields = query.__dict__.pop('fields', None)
+
+                def find_many(fastapi_response):
+                    primary_key = query_service.get_primary_key_names()
+                    cursor_keys = query_service.get_cursor_keys(query=query.__dict__)
+                    limit = query.__dict__.get('limit', None)
+
+                    stmt = query_service.get_many(query=query.__dict__, join_mode=join, fields=fields,
+                                                  stream=bool(parsing_service.stream_format))
+                    count_stmt = query_service.get_count(query=query.__dict__, join_mode=join)
+
+                    if parsing_service.stream_format:
+                        total_count = execute_service.count(session, count_stmt)
+                        query_result = execute_service.stream(session, stmt)
+                        return parsing_service.stream_find_many(response_model=response_model,
+                                                                sql_execute_result=query_result,
+                                                                fastapi_response=fastapi_response,
+                                                                join_mode=join,
+                                                                primary_key=primary_key,
+                                                                cursor_keys=cursor_keys,
+                                                                limit=limit,
+                                                                total_count=total_count,
+                                                                session=session)
 
-                stmt = query_service.get_many(query=query.__dict__, join_mode=join)
-                query_result = execute_service.execute(session, stmt)
-                parsed_response = parsing_service.find_many(response_model=response_model,
-                                                            sql_execute_result=query_result,
-                                                            fastapi_response=response,
-                                                            join_mode=join,
-                                                            session=session)
-                return parsed_response
+                    query_result = execute_service.execute(session, stmt)
+                    query_result, relations = execute_service.load_relations(
+                        session, query_result, query_service.get_relations(join_mode=join, fields=fields))
+                    total_count = execute_service.count(session, count_stmt)
+                    return parsing_service.find_many(response_model=response_model,
+                                                     sql_execute_result=query_result,
+                                                     fastapi_response=fastapi_response,
+                                                     join_mode=join,
+                                                     relations=relations,
+                                                     primary_key=primary_key,
+                                                     cursor_keys=cursor_keys,
+                                                     limit=limit,
+                                                     total_count=total_count,
+                                                     session=session)
+
+                params = (request.url.path, sorted(query.__dict__.items()), join, fields)
+                version_stmt = query_service.get_version(query=query.__dict__, join_mode=join)
+                if version_stmt is not None:
+                    etag = version_etag(execute_service.execute(session, version_stmt).one(), params)
+                    if if_none_match(request, etag):
+                        return not_modified(etag, response)
+                    response.headers['etag'] = etag
+                    # the cached response of another version is not returned with this etag
+                    params += (etag,)
+
+                if response_cache is None:
+                    result = find_many(response)
+                else:
+                    result = response_cache.cached(find_many, response, background_tasks, params=params)
+                return conditional_response(request, result, response)
 
     @abstractmethod
     def upsert_one(cls, api, *,
@@ -145,6 +328,20 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
 
         raise NotImplementedError
 
+    @abstractmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
+
     @classmethod
     def create_one(cls, api, *,
                    path,
@@ -167,17 +364,24 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
             ):
                 # stmt = query_service.create(insert_arg=query)
 
+                insert_stmt_list = query_service.insert(insert_arg=query.__dict__)
+                if insert_stmt_list is not None:
+                    try:
+                        inserted_data = await execute_service.async_execute_returning(session, insert_stmt_list)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+                    return await parsing_service.async_create_one(response_model=response_model,
+                                                                  sql_execute_result=inserted_data,
+                                                                  fastapi_response=response,
+                                                                  session=session)
+
                 new_inserted_data = query_service.create(insert_arg=query.__dict__)
 
                 execute_service.add_all(session, new_inserted_data)
                 try:
                     await execute_service.async_flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
                 return await parsing_service.async_create_one(response_model=response_model,
                                                               sql_execute_result=new_inserted_data,
                                                               fastapi_response=response,
@@ -192,6 +396,17 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session)
             ):
 
+                insert_stmt_list = query_service.insert(insert_arg=query.__dict__)
+                if insert_stmt_list is not None:
+                    try:
+                        inserted_data = execute_service.execute_returning(session, insert_stmt_list)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+                    return parsing_service.create_one(response_model=response_model,
+                                                      sql_execute_result=inserted_data,
+                                                      fastapi_response=response,
+                                                      session=session)
+
                 new_inserted_data = query_service.create(insert_arg=query.__dict__)
 
                 execute_service.add_all(session, new_inserted_data)
@@ -199,11 +414,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     execute_service.flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
                 return parsing_service.create_one(response_model=response_model,
                                                   sql_execute_result=new_inserted_data,
                                                   fastapi_response=response,
@@ -230,6 +441,18 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     query: request_body_model = Depends(request_body_model),
                     session=Depends(db_session)
             ):
+                insert_stmt_list = query_service.insert(insert_arg=query.__dict__,
+                                                        create_one=False)
+                if insert_stmt_list is not None:
+                    try:
+                        inserted_data = await execute_service.async_execute_returning(session, insert_stmt_list)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+                    return await parsing_service.async_create_many(response_model=response_model,
+                                                                   sql_execute_result=inserted_data,
+                                                                   fastapi_response=response,
+                                                                   session=session)
+
                 inserted_data = query_service.create(insert_arg=query.__dict__,
                                                      create_one=False)
 
@@ -238,11 +461,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     await execute_service.async_flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
                 return await parsing_service.async_create_many(response_model=response_model,
                                                                sql_execute_result=inserted_data,
                                                                fastapi_response=response,
@@ -256,6 +475,18 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session)
             ):
 
+                insert_stmt_list = query_service.insert(insert_arg=query.__dict__,
+                                                        create_one=False)
+                if insert_stmt_list is not None:
+                    try:
+                        inserted_data = execute_service.execute_returning(session, insert_stmt_list)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+                    return parsing_service.create_many(response_model=response_model,
+                                                       sql_execute_result=inserted_data,
+                                                       fastapi_response=response,
+                                                       session=session)
+
                 # inserted_data = query.__dict__['insert']
                 update_list = query.__dict__
                 inserted_data = query_service.create(insert_arg=update_list,
@@ -266,11 +497,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     execute_service.flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
                 return parsing_service.create_many(response_model=response_model,
                                                    sql_execute_result=inserted_data,
                                                    fastapi_response=response,
@@ -296,6 +523,16 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                       query=Depends(request_query_model),
                                                       request_url_param_model=Depends(request_url_model),
                                                       session=Depends(db_session)):
+                delete_stmt = query_service.delete(filter_args=request_url_param_model.__dict__,
+                                                   extra_args=query.__dict__)
+                if delete_stmt is not None:
+                    query_result = await execute_service.async_execute(session, delete_stmt)
+                    return await parsing_service.async_delete_returning(response_model=response_model,
+                                                                        sql_execute_result=query_result,
+                                                                        fastapi_response=response,
+                                                                        session=session,
+                                                                        delete_one=True)
+
                 # delete_instance = query_service.model_query(
                 #     filter_args=request_url_param_model.__dict__,
                 #     extra_args=query.__dict__,
@@ -319,6 +556,16 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                           query=Depends(request_query_model),
                                           request_url_param_model=Depends(request_url_model),
                                           session=Depends(db_session)):
+                delete_stmt = query_service.delete(filter_args=request_url_param_model.__dict__,
+                                                   extra_args=query.__dict__)
+                if delete_stmt is not None:
+                    query_result = execute_service.execute(session, delete_stmt)
+                    return parsing_service.delete_returning(response_model=response_model,
+                                                            sql_execute_result=query_result,
+                                                            fastapi_response=response,
+                                                            session=session,
+                                                            delete_one=True)
+
                 filter_stmt = query_service.model_query(filter_args=request_url_param_model.__dict__,
                                                         extra_args=query.__dict__,
                                                         session=session)
@@ -346,6 +593,15 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                  request: Request,
                                                  query=Depends(request_query_model),
                                                  session=Depends(db_session)):
+                delete_stmt = query_service.delete(filter_args=query.__dict__)
+                if delete_stmt is not None:
+                    query_result = await execute_service.async_execute(session, delete_stmt)
+                    return await parsing_service.async_delete_returning(response_model=response_model,
+                                                                        sql_execute_result=query_result,
+                                                                        fastapi_response=response,
+                                                                        session=session,
+                                                                        delete_one=False)
+
                 filter_stmt = query_service.model_query(filter_args=query.__dict__,
                                                         session=session)
 
@@ -362,6 +618,15 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                      request: Request,
                                      query=Depends(request_query_model),
                                      session=Depends(db_session)):
+                delete_stmt = query_service.delete(filter_args=query.__dict__)
+                if delete_stmt is not None:
+                    query_result = execute_service.execute(session, delete_stmt)
+                    return parsing_service.delete_returning(response_model=response_model,
+                                                            sql_execute_result=query_result,
+                                                            fastapi_response=response,
+                                                            session=session,
+                                                            delete_one=False)
+
                 filter_stmt = query_service.model_query(filter_args=query.__dict__,
                                                         session=session)
 
@@ -386,6 +651,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
             @api.post("", status_code=303, response_class=Response, dependencies=dependencies)
             async def async_create_one_and_redirect_to_get_one_api_with_primary_key(
                     request: Request,
+                    response: Response,
                     insert_args: request_body_model = Depends(),
                     session=Depends(db_session),
             ):
@@ -395,19 +661,17 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     await execute_service.async_flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
                 return await result_parser.async_post_redirect_get(response_model=response_model,
                                                                    sql_execute_result=new_inserted_data,
                                                                    fastapi_request=request,
+                                                                   fastapi_response=response,
                                                                    session=session)
         else:
             @api.post("", status_code=303, response_class=Response, dependencies=dependencies)
             def create_one_and_redirect_to_get_one_api_with_primary_key(
                     request: Request,
+                    response: Response,
                     insert_args: request_body_model = Depends(),
                     session=Depends(db_session),
             ):
@@ -418,15 +682,12 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     execute_service.flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
 
                 return result_parser.post_redirect_get(response_model=response_model,
                                                        sql_execute_result=new_inserted_data,
                                                        fastapi_request=request,
+                                                       fastapi_response=response,
                                                        session=session)
 
     @classmethod
@@ -455,6 +716,20 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
+                update_stmt = crud_service.update(update_args=patch_data.__dict__,
+                                                  filter_args=primary_key.__dict__,
+                                                  extra_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = await execute_service.async_execute(session, update_stmt)
+                        return await result_parser.async_update_returning(response_model=response_model,
+                                                                          sql_execute_result=query_result,
+                                                                          fastapi_response=response,
+                                                                          session=session,
+                                                                          update_one=True)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
                                                        extra_args=extra_query.__dict__,
                                                        session=session)
@@ -470,11 +745,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
         else:
             @api.patch(path,
                        status_code=200,
@@ -487,6 +758,20 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
+                update_stmt = crud_service.update(update_args=patch_data.__dict__,
+                                                  filter_args=primary_key.__dict__,
+                                                  extra_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = execute_service.execute(session, update_stmt)
+                        return result_parser.update_returning(response_model=response_model,
+                                                              sql_execute_result=query_result,
+                                                              fastapi_response=response,
+                                                              session=session,
+                                                              update_one=True)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
                                                        extra_args=extra_query.__dict__,
                                                        session=session)
@@ -501,11 +786,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
 
     @classmethod
     def patch_many(cls, api, *,
@@ -531,6 +812,19 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session)
             ):
 
+                update_stmt = crud_service.update(update_args=patch_data.__dict__,
+                                                  filter_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = await execute_service.async_execute(session, update_stmt)
+                        return await result_parser.async_update_returning(response_model=response_model,
+                                                                          sql_execute_result=query_result,
+                                                                          fastapi_response=response,
+                                                                          session=session,
+                                                                          update_one=False)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
                                                        session=session)
 
@@ -547,11 +841,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
         else:
             @api.patch(path,
                        status_code=200,
@@ -563,6 +853,19 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session)
             ):
+                update_stmt = crud_service.update(update_args=patch_data.__dict__,
+                                                  filter_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = execute_service.execute(session, update_stmt)
+                        return result_parser.update_returning(response_model=response_model,
+                                                              sql_execute_result=query_result,
+                                                              fastapi_response=response,
+                                                              session=session,
+                                                              update_one=False)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
                                                        session=session)
 
@@ -578,11 +881,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
 
     @classmethod
     def put_one(cls, api, *,
@@ -606,6 +905,20 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
+                update_stmt = crud_service.update(update_args=update_data.__dict__,
+                                                  filter_args=primary_key.__dict__,
+                                                  extra_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = await execute_service.async_execute(session, update_stmt)
+                        return await result_parser.async_update_returning(response_model=response_model,
+                                                                          sql_execute_result=query_result,
+                                                                          fastapi_response=response,
+                                                                          session=session,
+                                                                          update_one=True)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
                                                        extra_args=extra_query.__dict__,
                                                        session=session)
@@ -623,11 +936,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
         else:
             @api.put(path, status_code=200, response_model=response_model, dependencies=dependencies)
             def entire_update_by_primary_key(
@@ -637,6 +946,20 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
+                update_stmt = crud_service.update(update_args=update_data.__dict__,
+                                                  filter_args=primary_key.__dict__,
+                                                  extra_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = execute_service.execute(session, update_stmt)
+                        return result_parser.update_returning(response_model=response_model,
+                                                              sql_execute_result=query_result,
+                                                              fastapi_response=response,
+                                                              session=session,
+                                                              update_one=True)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
                                                        extra_args=extra_query.__dict__,
                                                        session=session)
@@ -653,11 +976,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
 
     @classmethod
     def put_many(cls, api, *,
@@ -679,6 +998,19 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
+                update_stmt = crud_service.update(update_args=update_data.__dict__,
+                                                  filter_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = await execute_service.async_execute(session, update_stmt)
+                        return await result_parser.async_update_returning(response_model=response_model,
+                                                                          sql_execute_result=query_result,
+                                                                          fastapi_response=response,
+                                                                          session=session,
+                                                                          update_one=False)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
                                                        session=session)
                 tmp = await session.execute(filter_stmt)
@@ -694,11 +1026,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
 
         else:
             @api.put(path, status_code=200, response_model=response_model, dependencies=dependencies)
@@ -709,6 +1037,19 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session),
             ):
 
+                update_stmt = crud_service.update(update_args=update_data.__dict__,
+                                                  filter_args=extra_query.__dict__)
+                if update_stmt is not None:
+                    try:
+                        query_result = execute_service.execute(session, update_stmt)
+                        return result_parser.update_returning(response_model=response_model,
+                                                              sql_execute_result=query_result,
+                                                              fastapi_response=response,
+                                                              session=session,
+                                                              update_one=False)
+                    except IntegrityError as e:
+                        return conflict_response(e)
+
                 filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
                                                        session=session)
 
@@ -724,11 +1065,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return conflict_response(e)
 
                 # return result_parser.update_many(response_model=response_model,
                 #                                  sql_execute_result=query_result,
@@ -760,17 +1097,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                       ):
                 target_model = request.url.path.split("/")[-2]
                 join = query.__dict__.pop('join_foreign_table', None)
+                primary_key = query_service.get_primary_key_names(target_model=target_model)
                 stmt = query_service.get_one_with_foreign_pk(query=query.__dict__,
                                                              join_mode=join,
                                                              abstract_param=url_param.__dict__,
                                                              target_model=target_model)
 
                 query_result = await execute_service.async_execute(session, stmt)
+                query_result, relations = await execute_service.async_load_relations(
+                    session, query_result, query_service.get_relations(join_mode=join))
 
                 parsed_response = await parsing_service.async_find_one(response_model=response_model,
                                                                        sql_execute_result=query_result,
                                                                        fastapi_response=response,
                                                                        join_mode=join,
+                                                                       relations=relations,
+                                                                       primary_key=primary_key,
                                                                        session=session)
                 return parsed_response
         else:
@@ -784,16 +1126,21 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                           ):
                 target_model = request.url.path.split("/")[-2]
                 join = query.__dict__.pop('join_foreign_table', None)
+                primary_key = query_service.get_primary_key_names(target_model=target_model)
 
                 stmt = query_service.get_one_with_foreign_pk(query=query.__dict__,
                                                              join_mode=join,
                                                              abstract_param=url_param.__dict__,
                                                              target_model=target_model)
                 query_result = execute_service.execute(session, stmt)
+                query_result, relations = execute_service.load_relations(
+                    session, query_result, query_service.get_relations(join_mode=join))
                 parsed_response = parsing_service.find_one(response_model=response_model,
                                                            sql_execute_result=query_result,
                                                            fastapi_response=response,
                                                            join_mode=join,
+                                                           relations=relations,
+                                                           primary_key=primary_key,
                                                            session=session)
                 return parsed_response
 
@@ -822,15 +1169,34 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                        ):
                 target_model = request.url.path.split("/")[-1]
                 join = query.__dict__.pop('join_foreign_table', None)
+                primary_key = query_service.get_primary_key_names(target_model=target_model)
                 stmt = query_service.get_many(query=query.__dict__, join_mode=join, abstract_param=url_param.__dict__,
-                                              target_model=target_model)
+                                              target_model=target_model, stream=bool(parsing_service.stream_format))
+                count_stmt = query_service.get_count(query=query.__dict__, join_mode=join,
+                                                     abstract_param=url_param.__dict__, target_model=target_model)
+
+                if parsing_service.stream_format:
+                    total_count = await execute_service.async_count(session, count_stmt)
+                    query_result = await execute_service.async_stream(session, stmt)
+                    return await parsing_service.async_stream_find_many(response_model=response_model,
+                                                                        sql_execute_result=query_result,
+                                                                        fastapi_response=response,
+                                                                        join_mode=join,
+                                                                        primary_key=primary_key,
+                                                                        total_count=total_count,
+                                                                        session=session)
 
-                query_result = await execute_service.async_execute(session, stmt)
+                query_result, total_count = await execute_service.async_execute_with_count(session, stmt, count_stmt)
+                query_result, relations = await execute_service.async_load_relations(
+                    session, query_result, query_service.get_relations(join_mode=join))
 
                 parsed_response = await parsing_service.async_find_many(response_model=response_model,
                                                                         sql_execute_result=query_result,
                                                                         fastapi_response=response,
                                                                         join_mode=join,
+                                                                        relations=relations,
+                                                                        primary_key=primary_key,
+                                                                        total_count=total_count,
                                                                         session=session)
                 return parsed_response
         else:
@@ -844,13 +1210,34 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                            ):
                 target_model = request.url.path.split("/")[-1]
                 join = query.__dict__.pop('join_foreign_table', None)
+                primary_key = query_service.get_primary_key_names(target_model=target_model)
                 stmt = query_service.get_many(query=query.__dict__, join_mode=join, abstract_param=url_param.__dict__,
-                                              target_model=target_model)
+                                              target_model=target_model, stream=bool(parsing_service.stream_format))
+                count_stmt = query_service.get_count(query=query.__dict__, join_mode=join,
+                                                     abstract_param=url_param.__dict__, target_model=target_model)
+
+                if parsing_service.stream_format:
+                    total_count = execute_service.count(session, count_stmt)
+                    query_result = execute_service.stream(session, stmt)
+                    return parsing_service.stream_find_many(response_model=response_model,
+                                                            sql_execute_result=query_result,
+                                                            fastapi_response=response,
+                                                            join_mode=join,
+                                                            primary_key=primary_key,
+                                                            total_count=total_count,
+                                                            session=session)
+
                 query_result = execute_service.execute(session, stmt)
+                query_result, relations = execute_service.load_relations(
+                    session, query_result, query_service.get_relations(join_mode=join))
+                total_count = execute_service.count(session, count_stmt)
                 parsed_response = parsing_service.find_many(response_model=response_model,
                                                             sql_execute_result=query_result,
                                                             fastapi_response=response,
                                                             join_mode=join,
+                                                            relations=relations,
+                                                            primary_key=primary_key,
+                                                            total_count=total_count,
                                                             session=session)
 
                 return parsed_response
@@ -888,11 +1275,7 @@ class SQLAlchemyPGSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                 try:
                     query_result = await execute_service.async_execute(session, stmt)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
+                    return conflict_response(e)
                 return await parsing_service.async_upsert_one(response_model=response_model,
                                                               sql_execute_result=query_result,
                                                               fastapi_response=response,
@@ -912,11 +1295,7 @@ class SQLAlchemyPGSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                 try:
                     query_result = execute_service.execute(session, stmt)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
+                    return conflict_response(e)
                 return parsing_service.upsert_one(response_model=response_model,
                                                   sql_execute_result=query_result,
                                                   fastapi_response=response,
@@ -949,11 +1328,7 @@ class SQLAlchemyPGSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                 try:
                     query_result = await execute_service.async_execute(session, stmt)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
+                    return conflict_response(e)
                 return await parsing_service.async_upsert_many(response_model=response_model,
                                                                sql_execute_result=query_result,
                                                                fastapi_response=response,
@@ -972,16 +1347,86 @@ class SQLAlchemyPGSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                 try:
                     query_result = execute_service.execute(session, stmt)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
+                    return conflict_response(e)
                 return parsing_service.upsert_many(response_model=response_model,
                                                    sql_execute_result=query_result,
                                                    fastapi_response=response,
                                                    session=session)
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        if async_mode:
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            async def async_bulk_load_by_copy(
+                    response: Response,
+                    request: Request,
+                    query=Depends(request_query_model),
+                    session=Depends(db_session)
+            ):
+                table = query_service.model.__table__
+                table_name, schema_name = table.name, table.schema
+                if query.merge:
+                    table_name, create_stmt, merge_stmt = query_service.bulk_load_staging(columns=query.columns,
+                                                                                          unique_fields=unique_list)
+                    schema_name = None
+                    await execute_service.async_execute(session, create_stmt)
+                try:
+                    row_count = await execute_service.async_copy_to_table(session,
+                                                                          table_name=table_name,
+                                                                          schema_name=schema_name,
+                                                                          columns=query.columns,
+                                                                          source=request.stream(),
+                                                                          bulk_format=query.format,
+                                                                          header=query.header)
+                    if query.merge:
+                        await execute_service.async_execute(session, merge_stmt)
+                except IntegrityError as e:
+                    return conflict_response(e)
+                return await parsing_service.async_bulk_load(response_model=response_model,
+                                                             sql_execute_result=row_count,
+                                                             fastapi_response=response,
+                                                             session=session)
+        else:
+            # the blocking COPY reads the body from the event loop in the thread of the endpoint
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            def bulk_load_by_copy(
+                    response: Response,
+                    request: Request,
+                    query=Depends(request_query_model),
+                    loop=Depends(event_loop),
+                    session=Depends(db_session)
+            ):
+                table_name = None
+                if query.merge:
+                    table_name, create_stmt, merge_stmt = query_service.bulk_load_staging(columns=query.columns,
+                                                                                          unique_fields=unique_list)
+                    execute_service.execute(session, create_stmt)
+                copy_sql = query_service.copy_from_stdin(columns=query.columns,
+                                                         bulk_format=query.format,
+                                                         header=query.header,
+                                                         table_name=table_name)
+                try:
+                    row_count = execute_service.copy_expert(session, copy_sql,
+                                                            BlockingStreamReader(iter_blocking(request.stream(), loop)))
+                    if query.merge:
+                        execute_service.execute(session, merge_stmt)
+                except IntegrityError as e:
+                    return conflict_response(e)
+                return parsing_service.bulk_load(response_model=response_model,
+                                                 sql_execute_result=row_count,
+                                                 fastapi_response=response,
+                                                 session=session)
+
 
 class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
@@ -1009,19 +1454,16 @@ class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     query: request_body_model = Depends(request_body_model),
                     session=Depends(db_session)
             ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list)
+                upsert_stmt_list = query_service.upsert(insert_arg=query.__dict__,
+                                                        unique_fields=unique_list)
 
                 try:
-                    query_result = await execute_service.async_execute(session, stmt)
+                    upserted_data = await execute_service.async_execute_returning(session, upsert_stmt_list)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return await parsing_service.async_upsert_one(response_model=response_model,
-                                                              sql_execute_result=query_result,
+                    return conflict_response(e)
+                # the rows returned by the upsert are parsed as the rows of create
+                return await parsing_service.async_create_one(response_model=response_model,
+                                                              sql_execute_result=upserted_data,
                                                               fastapi_response=response,
                                                               session=session)
         else:
@@ -1034,18 +1476,14 @@ class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     session=Depends(db_session)
             ):
 
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list)
+                upsert_stmt_list = query_service.upsert(insert_arg=query.__dict__,
+                                                        unique_fields=unique_list)
                 try:
-                    query_result = execute_service.execute(session, stmt)
+                    upserted_data = execute_service.execute_returning(session, upsert_stmt_list)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return parsing_service.upsert_one(response_model=response_model,
-                                                  sql_execute_result=query_result,
+                    return conflict_response(e)
+                return parsing_service.create_one(response_model=response_model,
+                                                  sql_execute_result=upserted_data,
                                                   fastapi_response=response,
                                                   session=session)
 
@@ -1070,19 +1508,16 @@ class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     query: request_body_model = Depends(request_body_model),
                     session=Depends(db_session)
             ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list,
-                                            upsert_one=False)
+                upsert_stmt_list = query_service.upsert(insert_arg=query.__dict__,
+                                                        unique_fields=unique_list,
+                                                        upsert_one=False)
                 try:
-                    query_result = await execute_service.async_execute(session, stmt)
+                    upserted_data = await execute_service.async_execute_returning(session, upsert_stmt_list)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return await parsing_service.async_upsert_many(response_model=response_model,
-                                                               sql_execute_result=query_result,
+                    return conflict_response(e)
+                # the rows returned by the batches of the upsert are parsed as the rows of create
+                return await parsing_service.async_create_many(response_model=response_model,
+                                                               sql_execute_result=upserted_data,
                                                                fastapi_response=response,
                                                                session=session)
         else:
@@ -1094,22 +1529,85 @@ class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     session=Depends(db_session)
             ):
 
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list,
-                                            upsert_one=False)
+                upsert_stmt_list = query_service.upsert(insert_arg=query.__dict__,
+                                                        unique_fields=unique_list,
+                                                        upsert_one=False)
                 try:
-                    query_result = execute_service.execute(session, stmt)
+                    upserted_data = execute_service.execute_returning(session, upsert_stmt_list)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return parsing_service.upsert_many(response_model=response_model,
-                                                   sql_execute_result=query_result,
+                    return conflict_response(e)
+                return parsing_service.create_many(response_model=response_model,
+                                                   sql_execute_result=upserted_data,
                                                    fastapi_response=response,
                                                    session=session)
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        if async_mode:
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            async def async_bulk_load_by_executemany(
+                    response: Response,
+                    request: Request,
+                    query=Depends(request_query_model),
+                    session=Depends(db_session)
+            ):
+                if query.format != BulkLoadFormat.csv:
+                    return Response(status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+                stmt = query_service.bulk_insert(columns=query.columns,
+                                                 unique_fields=unique_list,
+                                                 merge=query.merge)
+                row_count = 0
+                try:
+                    async for rows in iter_csv_batches(request.stream(),
+                                                       table=query_service.model.__table__,
+                                                       columns=query.columns,
+                                                       header=query.header):
+                        row_count += await execute_service.async_execute_many(session, stmt, rows)
+                except IntegrityError as e:
+                    return conflict_response(e)
+                return await parsing_service.async_bulk_load(response_model=response_model,
+                                                             sql_execute_result=row_count,
+                                                             fastapi_response=response,
+                                                             session=session)
+        else:
+            # the blocking executemany reads the body from the event loop in the thread of the endpoint
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            def bulk_load_by_executemany(
+                    response: Response,
+                    request: Request,
+                    query=Depends(request_query_model),
+                    loop=Depends(event_loop),
+                    session=Depends(db_session)
+            ):
+                if query.format != BulkLoadFormat.csv:
+                    return Response(status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+                stmt = query_service.bulk_insert(columns=query.columns,
+                                                 unique_fields=unique_list,
+                                                 merge=query.merge)
+                row_count = 0
+                try:
+                    for rows in csv_batches(iter_blocking(request.stream(), loop),
+                                            table=query_service.model.__table__,
+                                            columns=query.columns,
+                                            header=query.header):
+                        row_count += execute_service.execute_many(session, stmt, rows)
+                except IntegrityError as e:
+                    return conflict_response(e)
+                return parsing_service.bulk_load(response_model=response_model,
+                                                 sql_execute_result=row_count,
+                                                 fastapi_response=response,
+                                                 session=session)
+
 
 class SQLAlchemyMySQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
@@ -1144,6 +1642,20 @@ class SQLAlchemyMySQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     execute_service):
         raise NotImplementedError
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
+
 
 class SQLAlchemyMariadbRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
@@ -1178,6 +1690,20 @@ class SQLAlchemyMariadbRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     execute_service):
         raise NotImplementedError
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
+
 
 class SQLAlchemyOracleRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
@@ -1212,6 +1738,20 @@ class SQLAlchemyOracleRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     execute_service):
         raise NotImplementedError
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
+
 
 class SQLAlchemyMSSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
@@ -1246,6 +1786,20 @@ class SQLAlchemyMSSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     execute_service):
         raise NotImplementedError
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
+
 
 class SQLAlchemyNotSupportRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
@@ -1279,3 +1833,17 @@ class SQLAlchemyNotSupportRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     unique_list,
                     execute_service):
         raise NotImplementedError
+
+    @classmethod
+    def bulk_load(cls, api, *,
+                  path,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  response_model,
+                  request_query_model,
+                  dependencies,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
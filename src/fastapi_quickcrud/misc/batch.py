@@ -0,0 +1,305 @@
+import copy
+import inspect
+import json
+import re
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Router, request_response
+
+from .exceptions import InvalidBatchReference
+from .lazy_route import LazyAPIRoute
+from .type import RequestMethods
+
+# the scope key of the session shared by the operations of a batch
+BATCH_SESSION_SCOPE_KEY = 'quickcrud.batch_session'
+# the info key of the session which tells the parser not to commit since the batch commits once at the end,
+# the depth of the batches running on the session
+BATCH_SESSION_INFO_KEY = 'quickcrud_batch'
+# the attribute of the session dependencies which the operations of a batch resolve to the session of the batch
+BATCH_SESSION_DEPENDENCY_ATTRIBUTE = '__quickcrud_batch_session__'
+# the attribute of the endpoint of a batch route, a batch route is not an operation of a batch
+BATCH_ENDPOINT_ATTRIBUTE = '__quickcrud_batch__'
+
+# ${<id or index of an earlier operation>.<key>.<key>...}
+REFERENCE_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+
+class BatchOperation(BaseModel):
+    """
+    a request to a route of the batch, the values of path, query and body can reference the response bodies of
+    the earlier operations by ${<id>.<key>...}, e.g. ${parent.id}, or ${0.0.id} for the first item of the list
+    returned by the first operation, a value which is a reference only keeps the type of the referenced value
+    """
+    id: Optional[str] = None
+    method: RequestMethods
+    path: str
+    query: Optional[Dict[str, Any]] = None
+    body: Any = None
+
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status_code: int
+    headers: Dict[str, str]
+    body: Any = None
+
+
+def in_batch(session) -> bool:
+    return session.info.get(BATCH_SESSION_INFO_KEY, 0) > 0
+
+
+def batch_session(db_session: Callable) -> Callable:
+    """
+    the session dependency of the routes of crud_router_builder, the operations of a batch resolve it to the
+    session of the batch instead, without resolving db_session
+    """
+
+    async def session_of_batch(session=Depends(db_session)):
+        return session
+
+    setattr(session_of_batch, BATCH_SESSION_DEPENDENCY_ATTRIBUTE, True)
+    return session_of_batch
+
+
+def session_of_batch_scope(request: Request):
+    return request.scope[BATCH_SESSION_SCOPE_KEY]
+
+
+class BatchDependencyOverrides(object):
+    """
+    the dependency_overrides_provider of the routes of a batch, the session dependencies are overridden by the
+    session of the batch, the others by the dependency_overrides of the provider of the route
+    """
+
+    def __init__(self, provider: Optional[Any]):
+        self.provider = provider
+
+    @property
+    def dependency_overrides(self) -> 'BatchDependencyOverrides':
+        return self
+
+    def __bool__(self) -> bool:
+        return True
+
+    def get(self, call: Callable, default: Optional[Callable] = None) -> Optional[Callable]:
+        if getattr(call, BATCH_SESSION_DEPENDENCY_ATTRIBUTE, False):
+            return session_of_batch_scope
+        return (getattr(self.provider, 'dependency_overrides', None) or {}).get(call, default)
+
+
+class BatchRoute(BaseRoute):
+    """
+    a route as an operation of a batch, the app of which is built from a copy of the route with the
+    BatchDependencyOverrides on the first operation
+    """
+
+    def __init__(self, route: BaseRoute):
+        self.route = route
+        self._app = None
+
+    def matches(self, scope) -> tuple:
+        return self.route.matches(scope)
+
+    async def handle(self, scope, receive, send) -> None:
+        if not isinstance(self.route, APIRoute) or scope['method'] not in self.route.methods:
+            await self.route.handle(scope, receive, send)
+            return
+        if self._app is None:
+            if isinstance(self.route, LazyAPIRoute):
+                self.route.materialize()
+            route = copy.copy(self.route)
+            route.dependency_overrides_provider = BatchDependencyOverrides(self.route.dependency_overrides_provider)
+            self._app = request_response(route.get_route_handler())
+        await self._app(scope, receive, send)
+
+
+def _reference_value(reference: str, results: Dict[str, Any]) -> Any:
+    name, *keys = reference.split('.')
+    if name not in results:
+        raise InvalidBatchReference(HTTPStatus.BAD_REQUEST, f'{reference} does not reference an earlier operation')
+    value = results[name]
+    for key in keys:
+        try:
+            value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise InvalidBatchReference(HTTPStatus.BAD_REQUEST, f'{reference} is not found in the result of {name}')
+    return value
+
+
+def resolve_references(value: Any, results: Dict[str, Any]) -> Any:
+    """
+    :param results: the id and the index of the earlier operations -> their response bodies
+    """
+    if isinstance(value, str):
+        match = REFERENCE_PATTERN.fullmatch(value)
+        if match:
+            return _reference_value(match.group(1), results)
+        return REFERENCE_PATTERN.sub(lambda i: str(_reference_value(i.group(1), results)), value)
+    if isinstance(value, list):
+        return [resolve_references(i, results) for i in value]
+    if isinstance(value, dict):
+        return {key: resolve_references(i, results) for key, i in value.items()}
+    return value
+
+
+class BatchDispatcher(object):
+    """
+    run the operations of a batch by the routes in order, on one session and one transaction,
+    the batch stops at the first operation responding an error status and rolls back
+    """
+
+    def __init__(self, routes: List[BaseRoute], async_mode: bool, autocommit: bool = True):
+        """
+        :param routes: the routes which the paths of the operations are matched against
+        :param autocommit: commit at the end of the batch, set False if the db_session commits
+        """
+        self.router = Router(routes=[BatchRoute(route) for route in routes
+                                     if not getattr(getattr(route, 'endpoint', None), BATCH_ENDPOINT_ATTRIBUTE, False)])
+        self.async_mode = async_mode
+        self.autocommit = autocommit
+
+    async def _call(self, method: Callable) -> None:
+        if self.async_mode:
+            await method()
+        else:
+            await run_in_threadpool(method)
+
+    @staticmethod
+    def _scope(request: Request, operation: BatchOperation, results: Dict[str, Any], session) -> tuple:
+        path = resolve_references(operation.path, results)
+        query = resolve_references(operation.query or {}, results)
+        body = b'' if operation.body is None else \
+            json.dumps(jsonable_encoder(resolve_references(operation.body, results))).encode()
+        headers = [(key, value) for key, value in request.scope['headers']
+                   if key not in (b'content-length', b'content-type')]
+        headers += [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        # the scope of the batch request is copied for the client, the server and the exit stack of the dependencies
+        scope = {key: value for key, value in request.scope.items()
+                 if key not in ('router', 'endpoint', 'route', 'path_params')}
+        scope.update({'method': operation.method.value,
+                      'path': path,
+                      'raw_path': path.encode(),
+                      'query_string': urlencode(query, doseq=True).encode(),
+                      'headers': headers,
+                      BATCH_SESSION_SCOPE_KEY: session})
+        return scope, body
+
+    async def _dispatch(self, scope: dict, body: bytes) -> tuple:
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        await self.router(scope, receive, send)
+        start, = [message for message in messages if message['type'] == 'http.response.start']
+        content = b''.join(message.get('body', b'') for message in messages
+                           if message['type'] == 'http.response.body')
+        return start['status'], start.get('headers', []), content
+
+    @staticmethod
+    def _result(operation: BatchOperation, status_code: int, raw_headers: list, content: bytes) -> dict:
+        headers = {key.decode('latin-1'): value.decode('latin-1') for key, value in raw_headers
+                   if key not in (b'content-length', b'set-cookie')}
+        body = None
+        if content:
+            body = content.decode()
+            if headers.get('content-type', '').startswith('application/json'):
+                body = json.loads(body)
+        return {'id': operation.id, 'status_code': status_code, 'headers': headers, 'body': body}
+
+    async def run(self, request: Request, operations: List[BatchOperation], session) -> JSONResponse:
+        session.info[BATCH_SESSION_INFO_KEY] = session.info.get(BATCH_SESSION_INFO_KEY, 0) + 1
+        results = []
+        # the id and the index of the operations -> the response bodies
+        bodies = {}
+        cookies = []
+        status_code = HTTPStatus.OK
+        try:
+            for index, operation in enumerate(operations):
+                try:
+                    scope, body = self._scope(request, operation, bodies, session)
+                    operation_status_code, raw_headers, content = await self._dispatch(scope, body)
+                except RequestValidationError as e:
+                    operation_status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+                    content = json.dumps({'detail': jsonable_encoder(e.errors())}).encode()
+                    raw_headers = [(b'content-type', b'application/json')]
+                except HTTPException as e:
+                    operation_status_code = e.status_code
+                    content = json.dumps({'detail': e.detail}).encode()
+                    raw_headers = [(b'content-type', b'application/json')]
+                result = self._result(operation, operation_status_code, raw_headers, content)
+                results.append(result)
+                cookies += [(key, value) for key, value in raw_headers if key == b'set-cookie']
+                if operation_status_code >= HTTPStatus.BAD_REQUEST:
+                    status_code = operation_status_code
+                    break
+                bodies[str(index)] = result['body']
+                if operation.id is not None:
+                    bodies[operation.id] = result['body']
+        except BaseException:
+            await self._call(session.rollback)
+            raise
+        finally:
+            session.info[BATCH_SESSION_INFO_KEY] -= 1
+        if status_code != HTTPStatus.OK:
+            await self._call(session.rollback)
+        elif self.autocommit and not in_batch(session):
+            await self._call(session.commit)
+        response = JSONResponse(content=results, status_code=int(status_code))
+        response.raw_headers.extend(cookies)
+        return response
+
+
+def add_batch_route(api: APIRouter, *,
+                    path: str,
+                    routes: List[BaseRoute],
+                    db_session: Callable,
+                    async_mode: bool,
+                    autocommit: bool = True,
+                    dependencies: Optional[list] = None) -> None:
+    dispatcher = BatchDispatcher(routes, async_mode=async_mode, autocommit=autocommit)
+
+    @api.post(path, response_model=List[BatchResult], dependencies=dependencies)
+    async def batch(request: Request, operations: List[BatchOperation], session=Depends(db_session)):
+        return await dispatcher.run(request, operations, session)
+
+    setattr(batch, BATCH_ENDPOINT_ATTRIBUTE, True)
+
+
+def batch_router_builder(*,
+                         routers: List[APIRouter],
+                         db_session: Callable,
+                         autocommit: bool = True,
+                         path: str = '/batch',
+                         dependencies: Optional[List[Callable]] = None,
+                         **router_kwargs: Any) -> APIRouter:
+    """
+    a router of the batch route across the routers built by crud_router_builder with the same database
+
+    :param routers: the paths of the operations are the paths of the routes of them
+    :param db_session: the session of the batch, which the operations share
+    :param autocommit: commit at the end of the batch, set False if you handle commit in your db_session
+    :param dependencies: the dependencies of the batch route, the operations run the dependencies of their routes
+    """
+    api = APIRouter(**router_kwargs)
+    add_batch_route(api,
+                    path=path,
+                    routes=[route for router in routers for route in router.routes],
+                    db_session=db_session,
+                    async_mode=inspect.isasyncgenfunction(db_session),
+                    autocommit=autocommit,
+                    dependencies=[Depends(dep) for dep in dependencies or []])
+    return api
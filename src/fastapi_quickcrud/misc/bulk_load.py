@@ -0,0 +1,221 @@
+import asyncio
+import codecs
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List
+
+from sqlalchemy import Column, Table
+
+from .exceptions import InvalidBulkLoadRequest
+
+TRUE_VALUES = ('t', 'true', 'y', 'yes', 'on', '1')
+# the number of rows of an executemany
+BULK_LOAD_BATCH_SIZE = 1000
+
+
+def _to_bool(value: str) -> bool:
+    return value.strip().lower() in TRUE_VALUES
+
+
+def _to_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _to_time(value: str) -> time:
+    return time.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _to_bytes(value: str) -> bytes:
+    # the hex format of bytea, e.g. \x0a0b
+    return bytes.fromhex(value[2:] if value.startswith('\\x') else value)
+
+
+_CONVERTER_OF_PYTHON_TYPE = {
+    bool: _to_bool,
+    int: int,
+    float: float,
+    Decimal: Decimal,
+    datetime: _to_datetime,
+    date: date.fromisoformat,
+    time: _to_time,
+    bytes: _to_bytes,
+    dict: json.loads,
+    list: json.loads,
+}
+
+
+def csv_value_converter(column: Column) -> Callable[[str], Any]:
+    """
+    convert the text of a csv field to the python type of the column, an empty field is NULL as the COPY of postgresql
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = str
+    converter = _CONVERTER_OF_PYTHON_TYPE.get(python_type, None)
+
+    def convert(value: str) -> Any:
+        if value == '':
+            return None
+        if converter is None:
+            return value
+        try:
+            return converter(value)
+        except ValueError:
+            raise InvalidBulkLoadRequest(400, f'{value!r} is not a valid value of {column.key}')
+
+    return convert
+
+
+class CSVStreamParser(object):
+    """
+    parse the csv records from the chunks of a stream, a record may be split into more than one chunk
+    """
+
+    def __init__(self, header: bool = False, encoding: str = 'utf-8'):
+        """
+        :param header: skip the first record
+        :param encoding: the encoding of the stream
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ''
+        self._skip_header = header
+
+    def _parse(self, text: str) -> List[List[str]]:
+        try:
+            records = [record for record in csv.reader(io.StringIO(text, newline='')) if record]
+        except csv.Error as e:
+            raise InvalidBulkLoadRequest(400, f'csv is not valid: {e}')
+        if records and self._skip_header:
+            self._skip_header = False
+            records = records[1:]
+        return records
+
+    def _decode(self, chunk: bytes, final=False) -> str:
+        try:
+            return self._decoder.decode(chunk, final=final)
+        except UnicodeDecodeError as e:
+            raise InvalidBulkLoadRequest(400, f'csv is not valid: {e}')
+
+    def feed(self, chunk: bytes) -> List[List[str]]:
+        self._buffer += self._decode(chunk)
+        # a line break inside the quotes is a part of the field, the record ends at a line with even quotes
+        end = 0
+        quotes = 0
+        start = 0
+        while True:
+            line_end = self._buffer.find('\n', start)
+            if line_end == -1:
+                break
+            quotes += self._buffer.count('"', start, line_end)
+            start = line_end + 1
+            if quotes % 2 == 0:
+                end = start
+        text, self._buffer = self._buffer[:end], self._buffer[end:]
+        return self._parse(text)
+
+    def close(self) -> List[List[str]]:
+        text = self._buffer + self._decode(b'', final=True)
+        self._buffer = ''
+        return self._parse(text)
+
+
+def _record_converter(table: Table, columns: List[str]) -> Callable[[List[str]], dict]:
+    converters = [csv_value_converter(table.c[column]) for column in columns]
+
+    def to_row(record):
+        if len(record) != len(columns):
+            raise InvalidBulkLoadRequest(400, f'the record has {len(record)} fields but {len(columns)} columns')
+        return {column: convert(value) for column, convert, value in zip(columns, converters, record)}
+
+    return to_row
+
+
+async def iter_csv_batches(stream: AsyncIterator[bytes], *, table: Table, columns: List[str], header: bool = False,
+                           batch_size: int = BULK_LOAD_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """
+    the rows of the csv stream in batches, the fields of a record are converted to the python type of the columns
+    """
+    parser = CSVStreamParser(header=header)
+    to_row = _record_converter(table, columns)
+
+    batch = []
+    async for chunk in stream:
+        for record in parser.feed(chunk):
+            batch.append(to_row(record))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    batch += [to_row(record) for record in parser.close()]
+    if batch:
+        yield batch
+
+
+def csv_batches(chunks: Iterable[bytes], *, table: Table, columns: List[str], header: bool = False,
+                batch_size: int = BULK_LOAD_BATCH_SIZE) -> Iterator[List[dict]]:
+    """
+    iter_csv_batches of the blocking chunks, e.g. iter_blocking
+    """
+    parser = CSVStreamParser(header=header)
+    to_row = _record_converter(table, columns)
+
+    batch = []
+    for chunk in chunks:
+        for record in parser.feed(chunk):
+            batch.append(to_row(record))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    batch += [to_row(record) for record in parser.close()]
+    if batch:
+        yield batch
+
+
+async def event_loop() -> asyncio.AbstractEventLoop:
+    """
+    the dependency of the event loop of the request, which the sync endpoint reads the stream of the request from
+    """
+    return asyncio.get_event_loop()
+
+
+def iter_blocking(stream: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop) -> Iterator[bytes]:
+    """
+    the chunks of the stream of the request, read from the event loop by the thread of a sync endpoint
+    """
+
+    async def next_chunk():
+        return await stream.__anext__()
+
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(next_chunk(), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+class BlockingStreamReader(object):
+    """
+    file-like object for the blocking api of the driver, e.g. copy_expert of psycopg2,
+    the chunks are read as the driver reads, the body is never buffered as a whole
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+        self._eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size is None or size < 0 or len(self._buffer) < size):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer += chunk
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
@@ -0,0 +1,174 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class CoalescedResult(object):
+    """
+    the rows of one primary key of a coalesced query, read by the parser as the result of the query of FIND_ONE
+    """
+
+    def __init__(self, keys: List[str], rows: list):
+        self._keys = keys
+        self._rows = rows
+
+    def keys(self) -> List[str]:
+        return self._keys
+
+    def fetchall(self) -> list:
+        return list(self._rows)
+
+
+class _LeaderCancelled(Exception):
+    """
+    the request which runs the query of the batch is cancelled, the other requests query by themselves
+    """
+
+
+class _Batch(object):
+
+    def __init__(self):
+        # the primary key -> the future of its rows
+        self.futures: Dict[Any, asyncio.Future] = {}
+        self.full = asyncio.Event()
+
+
+class FindOneCoalescer(object):
+    """
+    Coalesce the FIND_ONE requests of the primary keys arriving in the same window into one WHERE pk IN (...) query
+    on the session of the first request of the window, the others of the same bind wait for their rows without
+    using a connection.
+    The requests of a primary key which is already being queried wait for the rows of that query (single flight)
+    """
+
+    def __init__(self, *, query_service, execute_service, window: float = 0.002, max_keys: int = 100):
+        """
+        :param window: seconds, how long the first request of a window waits for the others
+        :param max_keys: the query runs once the window has this number of primary keys, at most the max bind
+                         parameters of the dialect
+        """
+        self.query_service = query_service
+        self.execute_service = execute_service
+        self.window = window
+        self.max_keys = min(max_keys, query_service.max_bind_params)
+        primary_key_column, = query_service.model.__table__.primary_key.columns
+        try:
+            self._primary_key_type = primary_key_column.type.python_type
+        except NotImplementedError:
+            self._primary_key_type = uuid.UUID if str(primary_key_column.type) == 'UUID' else None
+        # the shape of the select -> the window collecting the primary keys
+        self._pending: Dict[Hashable, _Batch] = {}
+        # the shape of the select -> the primary key -> the future of the rows being queried
+        self._in_flight: Dict[Hashable, Dict[Any, asyncio.Future]] = defaultdict(dict)
+        self.requests = 0
+        self.queries = 0
+        self.deduplicated = 0
+
+    @property
+    def stats(self) -> dict:
+        return {'requests': self.requests,
+                'queries': self.queries,
+                'deduplicated': self.deduplicated}
+
+    def _key(self, primary_key: Any) -> Any:
+        """
+        the primary key of the url and of the rows in the type of the column, e.g. the url gives the str of a UUID
+        while the rows give a uuid.UUID or a str by the dialect
+        """
+        if primary_key is None or self._primary_key_type is None or isinstance(primary_key, self._primary_key_type):
+            return primary_key
+        try:
+            return self._primary_key_type(primary_key)
+        except (TypeError, ValueError):
+            return primary_key
+
+    async def _query(self, session, fields, primary_keys: list) -> Dict[Any, CoalescedResult]:
+        self.queries += 1
+        primary_key_name, = self.query_service.get_primary_key_names()
+        query_result = await self.execute_service.async_execute(
+            session, self.query_service.get_by_primary_keys(primary_keys=primary_keys, fields=fields))
+        keys = list(query_result.keys())
+        rows = defaultdict(list)
+        for row in query_result.fetchall():
+            rows[self._key(row._mapping[primary_key_name])].append(row)
+        return {primary_key: CoalescedResult(keys, rows.get(primary_key, [])) for primary_key in primary_keys}
+
+    async def _wait(self, future: asyncio.Future) -> Optional[CoalescedResult]:
+        # the future is shared by the requests of the primary key, a cancelled request does not cancel the others
+        try:
+            return await asyncio.shield(future)
+        except _LeaderCancelled:
+            return None
+
+    async def _run(self, group: Hashable, batch: _Batch, session, fields) -> None:
+        try:
+            await asyncio.wait_for(batch.full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if self._pending.get(group) is batch:
+                del self._pending[group]
+        in_flight = self._in_flight[group]
+        in_flight.update(batch.futures)
+        try:
+            results = await self._query(session, fields, list(batch.futures))
+        except asyncio.CancelledError:
+            self._set_exception(batch, _LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._set_exception(batch, e)
+            raise
+        else:
+            for primary_key, future in batch.futures.items():
+                future.set_result(results[primary_key])
+        finally:
+            for primary_key, future in batch.futures.items():
+                if in_flight.get(primary_key) is future:
+                    del in_flight[primary_key]
+
+    @staticmethod
+    def _set_exception(batch: _Batch, exception: BaseException) -> None:
+        for future in batch.futures.values():
+            if not future.done():
+                future.set_exception(exception)
+                # retrieved, so that the future of a primary key without waiting requests is not logged
+                future.exception()
+
+    async def find_one(self, session, primary_key: Any, query: Callable[[], Awaitable[Any]], fields=None) -> Any:
+        """
+        the result of the rows of the primary key
+
+        :param session: the session of the request, the query of the window runs on it if it is the first request,
+                        the requests are coalesced with the requests of the sessions of the same bind only, e.g. a
+                        request reading its own writes on the primary is not served by the session of a replica
+        :param query: the query of the request itself, run if the request running the query of the window is
+                      cancelled before the query finishes
+        """
+        self.requests += 1
+        primary_key = self._key(primary_key)
+        # the sessions without a bind, e.g. bound by the mappers, are not coalesced with the others
+        group = (getattr(session, 'bind', None) or session, tuple(map(str, fields or ())))
+        future = self._in_flight[group].get(primary_key)
+        if future is not None:
+            self.deduplicated += 1
+            return await self._wait(future) or await query()
+        batch = self._pending.get(group)
+        if batch is None:
+            batch = self._pending[group] = _Batch()
+            future = batch.futures[primary_key] = asyncio.get_event_loop().create_future()
+            try:
+                await self._run(group, batch, session, fields)
+            except asyncio.CancelledError:
+                self._set_exception(batch, _LeaderCancelled())
+                raise
+            return future.result()
+        future = batch.futures.get(primary_key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            future = batch.futures[primary_key] = asyncio.get_event_loop().create_future()
+            if len(batch.futures) >= self.max_keys:
+                del self._pending[group]
+                batch.full.set()
+        return await self._wait(future) or await query()
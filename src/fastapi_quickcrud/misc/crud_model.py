@@ -9,6 +9,9 @@ from .exceptions import (RequestMissing,
                          InvalidRequestMethod)
 from .type import CrudMethods
 
+# the order of the request methods of CRUDModel, in which the routes are registered
+REQUEST_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+
 
 class RequestResponseModel(BaseModel):
     requestUrlParamModel: Optional[ModelMetaclass]
@@ -33,7 +36,7 @@ class CRUDModel(BaseModel):
     UNIQUE_LIST: Optional[List[str]]
 
     def get_available_request_method(self):
-        return [i for i in self.dict(exclude_unset=True, ).keys() if i in ["GET", "POST", "PUT", "PATCH", "DELETE"]]
+        return [i for i in self.dict(exclude_unset=True, ).keys() if i in REQUEST_METHODS]
 
     def get_model_by_request_method(self, request_method):
         available_methods = self.dict()
@@ -0,0 +1,63 @@
+import hashlib
+from http import HTTPStatus
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def version_etag(version_row, params: Any) -> str:
+    """
+    the weak ETag of the max of the etag column and the count of the matched rows, with the query of the request
+    since the same rows are paged and shaped by it
+    """
+    digest = hashlib.sha1(repr((tuple(version_row), params)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def payload_etag(content: Any) -> str:
+    """
+    the ETag of the shaped rows, or of the body if the rows are encoded already
+    """
+    if isinstance(content, Response):
+        content = content.body
+    digest = hashlib.sha1(content if isinstance(content, bytes) else repr(content).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def if_none_match(request: Request, etag: str, exists: bool = True) -> bool:
+    """
+    the weak comparison of RFC 7232, the W/ prefix is ignored,
+    neither a tag nor * matches a row which does not exist, it is 404
+
+    :param exists: if the requested row exists, a collection always exists
+    """
+    if_none_match_header = request.headers.get('if-none-match', None)
+    if not if_none_match_header or not exists:
+        return False
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match_header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or (candidate[2:] if candidate.startswith('W/') else candidate) == opaque_tag:
+            return True
+    return False
+
+
+def not_modified(etag: str, fastapi_response: Optional[Response] = None) -> Response:
+    response = Response(status_code=HTTPStatus.NOT_MODIFIED)
+    if fastapi_response is not None:
+        response.raw_headers.extend((key, value) for key, value in fastapi_response.raw_headers
+                                    if key not in (b'content-length', b'content-type', b'etag'))
+    response.headers['etag'] = etag
+    return response
+
+
+def conditional_response(request: Request, result: Any, fastapi_response: Response) -> Any:
+    """
+    304 Not Modified instead of the result if the ETag of the result matches the If-None-Match of the request
+    """
+    headers = result.headers if isinstance(result, Response) else fastapi_response.headers
+    etag = headers.get('etag', None)
+    if etag is not None and if_none_match(request, etag):
+        return not_modified(etag, fastapi_response)
+    return result
@@ -5,6 +5,18 @@ class FindOneApiNotRegister(HTTPException):
     pass
 
 
+class InvalidCursor(HTTPException):
+    pass
+
+
+class InvalidBulkLoadRequest(HTTPException):
+    pass
+
+
+class InvalidBatchReference(HTTPException):
+    pass
+
+
 class CRUDBuilderException(BaseException):
     pass
 
@@ -65,6 +77,22 @@ class InvalidRequestMethod(CRUDBuilderException):
     pass
 
 
+class RelationLoadingNotSupportedException(CRUDBuilderException):
+    pass
+
+
+class CoalescingNotSupportedException(CRUDBuilderException):
+    pass
+
+
+class SQLiteWriteQueueNotSupportedException(CRUDBuilderException):
+    pass
+
+
+class AsyncModeMismatchException(CRUDBuilderException):
+    pass
+
+
 #
 # class NotFoundError(MongoQueryError):
 #     def __init__(self, Collection: Type[ModelType], model: BaseModel):
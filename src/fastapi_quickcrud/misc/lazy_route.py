@@ -0,0 +1,146 @@
+import inspect
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from starlette.routing import Match, compile_path
+
+from .openapi import OPENAPI_FRAGMENT_ATTRIBUTE
+
+RecordedRoute = Tuple[str, Callable, Dict[str, Any]]
+
+# the attributes of APIRoute which APIRouter.include_router reads to copy a route
+_COPIED_ATTRIBUTES = ('response_model', 'status_code', 'tags', 'dependencies', 'summary', 'description',
+                      'response_description', 'responses', 'deprecated', 'name', 'operation_id',
+                      'response_model_include', 'response_model_exclude', 'response_model_by_alias',
+                      'response_model_exclude_unset', 'response_model_exclude_defaults',
+                      'response_model_exclude_none', 'include_in_schema', 'response_class', 'callbacks',
+                      'openapi_extra')
+
+_API_ROUTE_SIGNATURE = inspect.signature(APIRoute.__init__)
+
+_materialize_lock = RLock()
+
+
+class RouteRecorder:
+    """
+    stand-in of APIRouter for the route sources, records the decorated endpoints instead of building the APIRoute
+    """
+
+    def __init__(self):
+        self.routes: List[RecordedRoute] = []
+
+    def api_route(self, path: str, **kwargs: Any) -> Callable:
+        def decorator(endpoint: Callable) -> Callable:
+            self.routes.append((path, endpoint, kwargs))
+            return endpoint
+
+        return decorator
+
+    def get(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['GET'], **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['POST'], **kwargs)
+
+    def put(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['PUT'], **kwargs)
+
+    def patch(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['PATCH'], **kwargs)
+
+    def delete(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['DELETE'], **kwargs)
+
+
+class LazyEndpoint:
+    """
+    the placeholder endpoint of a LazyAPIRoute, build the models and the endpoint of a crud method once,
+    it is shared by the copies of the route made by include_router
+
+    :param build: register the endpoint of the crud method on the RouteRecorder passed in
+    """
+
+    def __init__(self, build: Callable[[RouteRecorder], None]):
+        self._build = build
+        self._route = None
+        self._lock = Lock()
+
+    def build(self) -> RecordedRoute:
+        with self._lock:
+            if self._route is None:
+                recorder = RouteRecorder()
+                self._build(recorder)
+                self._route, = recorder.routes
+                _, endpoint, _ = self._route
+                # the openapi fragment loaded before the endpoint is built
+                if hasattr(self, OPENAPI_FRAGMENT_ATTRIBUTE):
+                    setattr(endpoint, OPENAPI_FRAGMENT_ATTRIBUTE, getattr(self, OPENAPI_FRAGMENT_ATTRIBUTE))
+            return self._route
+
+    def __call__(self, *args, **kwargs):
+        raise RuntimeError('the endpoint of a lazy route is not built yet')
+
+
+class LazyAPIRoute(APIRoute):
+    """
+    an APIRoute of which the endpoint is a LazyEndpoint, only the path, the methods and the attributes read by
+    include_router are set on registration, the request/response models, the dependant and the app of the route
+    are built on the first request or the generation of the OpenAPI schema
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        if not isinstance(endpoint, LazyEndpoint):
+            super().__init__(path, endpoint, **kwargs)
+            return
+        arguments = _API_ROUTE_SIGNATURE.bind(self, path, endpoint, **kwargs)
+        arguments.apply_defaults()
+        for attribute in _COPIED_ATTRIBUTES:
+            setattr(self, attribute, arguments.arguments[attribute])
+        self.tags = self.tags or []
+        self.dependencies = list(self.dependencies or [])
+        self.responses = self.responses or {}
+        self.path = path
+        self.endpoint = endpoint
+        self.path_regex, self.path_format, self.param_convertors = compile_path(path)
+        self.methods = {method.upper() for method in kwargs.get('methods') or ['GET']}
+        self._lazy_kwargs = kwargs
+
+    @property
+    def materialized(self) -> bool:
+        return '_lazy_kwargs' not in self.__dict__
+
+    def materialize(self) -> None:
+        with _materialize_lock:
+            if self.materialized:
+                return
+            kwargs = dict(self._lazy_kwargs)
+            _, endpoint, route_kwargs = self.endpoint.build()
+            # the dependencies of the route source are the ones of the placeholder, which may be extended by
+            # include_router, the explicit arguments of the route source take the place of the placeholder defaults
+            for key, value in route_kwargs.items():
+                if key == 'dependencies':
+                    continue
+                if key == 'response_class' or kwargs.get(key) is None \
+                        or isinstance(kwargs.get(key), DefaultPlaceholder):
+                    kwargs[key] = value
+            super().__init__(self.path, endpoint, **kwargs)
+            del self.__dict__['_lazy_kwargs']
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith('__') or self.materialized:
+            raise AttributeError(item)
+        self.materialize()
+        return getattr(self, item)
+
+    def matches(self, scope) -> Tuple[Match, dict]:
+        match, child_scope = super().matches(scope)
+        if match == Match.FULL and not self.materialized:
+            self.materialize()
+            match, child_scope = super().matches(scope)
+        return match, child_scope
+
+    def url_path_for(self, name: str, **path_params: Any):
+        self.materialize()
+        return super().url_path_for(name, **path_params)
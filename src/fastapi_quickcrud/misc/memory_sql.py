@@ -1,45 +1,165 @@
 import asyncio
+import sqlite3
 import string
 import random
-from typing import Generator
+from typing import Callable, Dict, Generator, Optional, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
 
 class MemorySql():
-    def __init__(self, async_mode: bool = False):
+    def __init__(self, async_mode: bool = False,
+                 *,
+                 database: Optional[str] = None,
+                 shared_cache: bool = False,
+                 read_pool_size: int = 4,
+                 journal_mode: Optional[str] = 'WAL',
+                 synchronous: Optional[str] = 'NORMAL',
+                 cache_size: Optional[int] = None,
+                 mmap_size: Optional[int] = None,
+                 busy_timeout: int = 5000,
+                 pragmas: Optional[Dict[str, Union[str, int]]] = None,
+                 echo: bool = False):
         """
 
         @type async_mode: bool
         used to build sync or async memory sql connection
+
+        @param database:
+            the path of the database file, None means an in-memory database.
+            A file database has one write connection and a pool of read_pool_size read connections,
+            the writes wait for the write connection and the reads run at the same time in WAL mode
+
+        @param shared_cache:
+            the in-memory database is shared by one write connection and a pool of read connections by the memdb VFS
+            of SQLite 3.36+ instead of one connection, a read waits for the open write transaction by busy_timeout
+            and reads the committed rows, not applied to a file database
+
+        @param read_pool_size:
+            the number of the read connections of a file or shared cache database
+
+        @param journal_mode:
+            PRAGMA journal_mode of a file database, e.g. WAL (default), DELETE, None means the default of SQLite
+
+        @param synchronous:
+            PRAGMA synchronous of a file database, e.g. NORMAL (default, durable at the checkpoint in WAL mode), FULL
+
+        @param cache_size:
+            PRAGMA cache_size of each connection, pages, or KiB if negative
+
+        @param mmap_size:
+            PRAGMA mmap_size of each connection, bytes of the database file read by memory mapped I/O
+
+        @param busy_timeout:
+            PRAGMA busy_timeout, milliseconds, how long a connection waits for the lock of a file database held by
+            another process
+
+        @param pragmas:
+            the other pragmas of each connection, e.g. {'foreign_keys': 'ON'}
+
+        @param echo:
+            log the statements
         """
         self.async_mode = async_mode
-        SQLALCHEMY_DATABASE_URL = f"sqlite{'+aiosqlite' if async_mode else ''}://"
-        if not async_mode:
-            self.engine = create_engine(SQLALCHEMY_DATABASE_URL,
-                                        future=True,
-                                        echo=True,
-                                        pool_pre_ping=True,
-                                        pool_recycle=7200,
-                                        connect_args={"check_same_thread": False},
-                                        poolclass=StaticPool)
-            self.sync_session = sessionmaker(bind=self.engine,
-                                             autocommit=False, )
+        self.database = database
+        self.read_pool_size = read_pool_size
+        self.read_engine = None
+        self.read_session = None
+        # the shared in-memory database is dropped when its last connection is closed
+        self._keep_alive_connection = None
+        driver = f"sqlite{'+aiosqlite' if async_mode else ''}"
+        connect_args = {"check_same_thread": False}
+        pool_class = AsyncAdaptedQueuePool if async_mode else QueuePool
+        engine_builder = create_async_engine if async_mode else create_engine
+
+        common_pragmas = {'busy_timeout': busy_timeout}
+        if cache_size is not None:
+            common_pragmas['cache_size'] = cache_size
+        if mmap_size is not None:
+            common_pragmas['mmap_size'] = mmap_size
+        common_pragmas.update(pragmas or {})
+        write_pragmas = dict(common_pragmas)
+        read_pragmas = dict(common_pragmas, query_only='ON')
+
+        if database is not None:
+            SQLALCHEMY_DATABASE_URL = f"{driver}:///{database}"
+            if journal_mode is not None:
+                write_pragmas = dict({'journal_mode': journal_mode}, **write_pragmas)
+            if synchronous is not None:
+                write_pragmas['synchronous'] = synchronous
+                read_pragmas['synchronous'] = synchronous
+        elif shared_cache:
+            name = 'quickcrud_' + ''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
+            # the memdb database of a name starting with / is shared by the connections of the process, unlike the
+            # shared cache, whose table locks are not waited for by busy_timeout
+            uri = f"file:/{name}?vfs=memdb"
+            SQLALCHEMY_DATABASE_URL = f"{driver}:///{uri}&uri=true"
+            self._keep_alive_connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
         else:
-            self.engine = create_async_engine(SQLALCHEMY_DATABASE_URL,
+            SQLALCHEMY_DATABASE_URL = f"{driver}://"
+
+        if database is None and not shared_cache:
+            # an in-memory database is a connection
+            self.engine = engine_builder(SQLALCHEMY_DATABASE_URL,
+                                         future=True,
+                                         echo=echo,
+                                         connect_args=connect_args,
+                                         poolclass=StaticPool)
+        else:
+            # the writes of SQLite are serialized, the sessions wait for the write connection in the pool
+            self.engine = engine_builder(SQLALCHEMY_DATABASE_URL,
+                                         future=True,
+                                         echo=echo,
+                                         pool_pre_ping=True,
+                                         pool_recycle=7200,
+                                         connect_args=connect_args,
+                                         poolclass=pool_class,
+                                         pool_size=1,
+                                         max_overflow=0)
+            self.read_engine = engine_builder(SQLALCHEMY_DATABASE_URL,
                                               future=True,
-                                              echo=True,
+                                              echo=echo,
                                               pool_pre_ping=True,
                                               pool_recycle=7200,
-                                              connect_args={"check_same_thread": False},
-                                              poolclass=StaticPool)
+                                              connect_args=connect_args,
+                                              poolclass=pool_class,
+                                              pool_size=read_pool_size,
+                                              max_overflow=0)
+            self._set_pragmas(self.read_engine, read_pragmas)
+        self._set_pragmas(self.engine, write_pragmas)
+
+        if not async_mode:
+            self.sync_session = sessionmaker(bind=self.engine,
+                                             autocommit=False, )
+            if self.read_engine is not None:
+                self.read_session = sessionmaker(bind=self.read_engine,
+                                                 autocommit=False, )
+        else:
             self.sync_session = sessionmaker(autocommit=False,
                                              autoflush=False,
                                              bind=self.engine,
                                              class_=AsyncSession)
+            if self.read_engine is not None:
+                self.read_session = sessionmaker(autocommit=False,
+                                                 autoflush=False,
+                                                 bind=self.read_engine,
+                                                 class_=AsyncSession)
+
+    @staticmethod
+    def _set_pragmas(engine, pragmas: Dict[str, Union[str, int]]) -> None:
+        if not pragmas:
+            return
+        sync_engine = getattr(engine, 'sync_engine', engine)
+
+        @event.listens_for(sync_engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for key, value in pragmas.items():
+                cursor.execute(f'PRAGMA {key} = {value}')
+            cursor.close()
 
     def create_memory_table(self, Mode: 'declarative_base()'):
         if not self.async_mode:
@@ -66,5 +186,30 @@ class MemorySql():
         async with self.sync_session() as session:
             yield session
 
+    def get_memory_db_read_session(self) -> Generator:
+        try:
+            db = self.read_session()
+            yield db
+        finally:
+            db.close()
+
+    async def async_get_memory_db_read_session(self):
+        async with self.read_session() as session:
+            yield session
+
+    def get_db_session(self) -> Callable:
+        """
+        the session generator of the write connection
+        """
+        return self.async_get_memory_db_session if self.async_mode else self.get_memory_db_session
+
+    def get_read_db_session(self) -> Optional[Callable]:
+        """
+        the session generator of the read connections, None if the database is a connection
+        """
+        if self.read_session is None:
+            return None
+        return self.async_get_memory_db_read_session if self.async_mode else self.get_memory_db_read_session
+
 async_memory_db = MemorySql(True)
-sync_memory_db = MemorySql()
\ No newline at end of file
+sync_memory_db = MemorySql()
@@ -0,0 +1,97 @@
+import json
+import os
+from typing import Any, Callable, Dict, NamedTuple, Sequence
+
+from fastapi import FastAPI
+from fastapi.openapi.utils import get_openapi
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+
+OPENAPI_FRAGMENT_ATTRIBUTE = '__quickcrud_openapi_fragment__'
+
+
+class OpenAPIFragment(NamedTuple):
+    path: str
+    operations: Dict[str, Any]
+    components: Dict[str, Any]
+
+
+def render_openapi_fragment(routes: Sequence[BaseRoute]) -> Dict[str, Any]:
+    openapi = get_openapi(title='', version='', routes=routes)
+    return {'paths': openapi.get('paths', {}), 'components': openapi.get('components', {})}
+
+
+def load_openapi_fragment(file_path: str, render: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    load the openapi fragment from the file, or render and save it if the file does not exist
+
+    :param file_path: the cache file, its name contains the hash of the schema of the router
+    """
+    if os.path.exists(file_path):
+        with open(file_path) as f:
+            return json.load(f)
+    fragment = render()
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    # the workers may render the same fragment at the same time, the file is replaced as a whole
+    temp_file_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(temp_file_path, 'w') as f:
+        json.dump(fragment, f)
+    os.replace(temp_file_path, file_path)
+    return fragment
+
+
+def attach_openapi_fragment(routes: Sequence[BaseRoute], fragment: Dict[str, Any]) -> None:
+    """
+    attach the operations of each route in the fragment to the endpoint of the route, the endpoint is shared by
+    the copies of the route made by include_router
+    """
+    for route in routes:
+        if not isinstance(route, APIRoute) or route.path_format not in fragment['paths']:
+            continue
+        operations = {method: operation for method, operation in fragment['paths'][route.path_format].items()
+                      if method.upper() in route.methods}
+        setattr(route.endpoint, OPENAPI_FRAGMENT_ATTRIBUTE,
+                OpenAPIFragment(route.path_format, operations, fragment['components']))
+
+
+def openapi_with_fragments(app: FastAPI) -> Callable[[], Dict[str, Any]]:
+    """
+    the openapi method of the app which merges the pre-rendered openapi fragments of the routers instead of
+    generating them, only the other routes of the app are generated, e.g. app.openapi = openapi_with_fragments(app)
+    """
+
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema:
+            return app.openapi_schema
+        routes = []
+        paths: Dict[str, Dict[str, Any]] = {}
+        components: Dict[str, Dict[str, Any]] = {}
+        for route in app.routes:
+            fragment = getattr(route.endpoint, OPENAPI_FRAGMENT_ATTRIBUTE, None) \
+                if isinstance(route, APIRoute) else None
+            if fragment is None:
+                routes.append(route)
+                continue
+            # the prefix of include_router
+            prefix = route.path_format[:len(route.path_format) - len(fragment.path)]
+            paths.setdefault(prefix + fragment.path, {}).update(fragment.operations)
+            for key, value in fragment.components.items():
+                components.setdefault(key, {}).update(value)
+        openapi_schema = get_openapi(title=app.title,
+                                     version=app.version,
+                                     openapi_version=app.openapi_version,
+                                     description=app.description,
+                                     terms_of_service=app.terms_of_service,
+                                     contact=app.contact,
+                                     license_info=app.license_info,
+                                     routes=routes,
+                                     tags=app.openapi_tags,
+                                     servers=app.servers)
+        for path, operations in paths.items():
+            openapi_schema['paths'].setdefault(path, {}).update(operations)
+        for key, value in components.items():
+            openapi_schema.setdefault('components', {}).setdefault(key, {}).update(value)
+        app.openapi_schema = openapi_schema
+        return openapi_schema
+
+    return openapi
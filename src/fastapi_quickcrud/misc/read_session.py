@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+import inspect
+import itertools
+import math
+import random
+import secrets
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, List, Optional, Union
+
+from fastapi import Request, Response
+
+from .type import ReadSessionPolicy
+
+# the secret of the marks of the routers of the process if they are given no secret
+_PROCESS_SECRET = secrets.token_bytes(32)
+
+
+class ReadSessionRouter:
+    """
+    route the sessions of the read APIs (FIND_ONE, FIND_MANY and the foreign tree) to the read replicas,
+    the client which wrote through the router within the read your writes window sticks to the primary,
+    the client is marked by a cookie, or by the header of the same name for the client without cookies,
+    the mark is the expiry signed by HMAC
+    """
+
+    def __init__(self,
+                 db_session: Callable,
+                 read_db_session: Union[Callable, List[Callable]],
+                 policy: ReadSessionPolicy = ReadSessionPolicy.round_robin,
+                 read_your_writes_seconds: float = 0,
+                 read_your_writes_key: str = 'quickcrud-read-your-writes',
+                 read_your_writes_secret: Optional[Union[str, bytes]] = None):
+        """
+        :param db_session: the session generator of the primary
+        :param read_db_session: the session generators of the read replicas, they take no dependency
+        :param read_your_writes_seconds: the window after a write, 0 to route the reads to the replicas always
+        :param read_your_writes_key: the name of the cookie and the header which marks the client
+        :param read_your_writes_secret: the key of the HMAC of the mark, a random key of the process if None,
+            the processes behind a load balancer should share one
+        """
+        self.db_session = db_session
+        self.read_db_sessions = read_db_session if isinstance(read_db_session, list) else [read_db_session]
+        assert self.read_db_sessions, 'read_db_session is empty'
+        self.policy = policy
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.read_your_writes_key = read_your_writes_key
+        if isinstance(read_your_writes_secret, str):
+            read_your_writes_secret = read_your_writes_secret.encode()
+        self._secret = read_your_writes_secret or _PROCESS_SECRET
+        self._counter = itertools.count()
+
+    def _signature(self, expire_at: str) -> str:
+        return hmac.new(self._secret, expire_at.encode(), hashlib.sha256).hexdigest()
+
+    def sticky(self, request: Request) -> bool:
+        value = request.cookies.get(self.read_your_writes_key) or request.headers.get(self.read_your_writes_key)
+        expire_at, _, signature = (value or '').partition(':')
+        if not hmac.compare_digest(signature, self._signature(expire_at)):
+            return False
+        try:
+            expire_at = float(expire_at)
+        except ValueError:
+            return False
+        # the mark of a longer window than the router's is not trusted, e.g. signed before the window is shortened
+        return time.time() < expire_at <= time.time() + self.read_your_writes_seconds
+
+    def select(self, request: Request) -> Callable:
+        if self.read_your_writes_seconds and self.sticky(request):
+            return self.db_session
+        if self.policy == ReadSessionPolicy.random:
+            return random.choice(self.read_db_sessions)
+        return self.read_db_sessions[next(self._counter) % len(self.read_db_sessions)]
+
+    def mark(self, response: Response) -> None:
+        """
+        the dependency of the write APIs, mark the client to read from the primary in the window
+        """
+        if not self.read_your_writes_seconds:
+            return
+        expire_at = f'{time.time() + self.read_your_writes_seconds:.3f}'
+        mark = f'{expire_at}:{self._signature(expire_at)}'
+        response.set_cookie(self.read_your_writes_key, mark,
+                            max_age=math.ceil(self.read_your_writes_seconds))
+        response.headers[self.read_your_writes_key] = mark
+
+    def read_db_session(self) -> Callable:
+        """
+        the session generator of the read APIs, as the db_session of crud_router_builder
+        """
+        if inspect.isasyncgenfunction(self.db_session):
+            async def async_read_db_session(request: Request):
+                async with asynccontextmanager(self.select(request))() as session:
+                    yield session
+
+            return async_read_db_session
+
+        def read_db_session(request: Request):
+            with contextmanager(self.select(request))() as session:
+                yield session
+
+        return read_db_session
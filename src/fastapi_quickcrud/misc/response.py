@@ -0,0 +1,85 @@
+import base64
+from datetime import timedelta
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Optional, Type
+
+from pydantic import BaseModel
+from pydantic.fields import ModelField, SHAPE_SINGLETON
+from pydantic.utils import lenient_issubclass
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: nocover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # the types which orjson does not serialize natively, encoded as jsonable_encoder of fastapi
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, bytes):
+        # the binary columns are not text, e.g. bytea
+        return base64.b64encode(value).decode()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def orjson_dumps(content: Any) -> bytes:
+    if orjson is None:
+        raise ImportError('ORJSONResponse needs orjson, install it by pip install fastapi-quickcrud[orjson]')
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    the response_class of crud_router_builder, FIND_ONE and FIND_MANY return the shaped rows in this response
+    directly, they are encoded by orjson instead of validated by the response_model and encoded by jsonable_encoder
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson_dumps(content)
+
+
+def _field_projector(field: ModelField) -> Optional[Callable[[Any], Any]]:
+    if field.sub_fields and field.shape == SHAPE_SINGLETON:
+        # Union, the first model in the Union
+        for sub_field in field.sub_fields:
+            projector = _field_projector(sub_field)
+            if projector is not None:
+                return projector
+        return None
+    if lenient_issubclass(field.type_, BaseModel):
+        return model_projector(field.type_)
+    return None
+
+
+@lru_cache(maxsize=None)
+def model_projector(model: Type[BaseModel]) -> Callable[[Any], Any]:
+    """
+    keep the fields of the model in the response content, the other selected columns are dropped as the validation
+    of the response_model does, e.g. the exclude_columns of crud_router_builder, the fields not in the content
+    are omitted as the exclude unset of the generated response models
+    """
+    if '__root__' in model.__fields__:
+        return _field_projector(model.__fields__['__root__']) or (lambda value: value)
+    fields = [(name, _field_projector(field)) for name, field in model.__fields__.items()]
+
+    def project(value):
+        if isinstance(value, list):
+            return [project(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        return {name: value[name] if projector is None else projector(value[name])
+                for name, projector in fields if name in value}
+
+    return project
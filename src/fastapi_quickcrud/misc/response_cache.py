@@ -0,0 +1,354 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from fastapi import BackgroundTasks, Depends, Request, Response
+from sqlalchemy import event
+from starlette.responses import StreamingResponse
+
+from .cache import LRUCache
+
+RESPONSE_CACHE_HEADER = 'x-cache'
+
+
+class ResponseCacheBackend(object):
+    """
+    The storage of the response cache, the values are picklable python objects.
+    A backend of a shared store, e.g. redis, may implement the async methods only and set blocking to False,
+    it is supported in async mode only
+    """
+    blocking = True
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        :param ttl: seconds, None means the value never expire
+        """
+        raise NotImplementedError
+
+    async def async_get(self, key: str) -> Any:
+        return self.get(key)
+
+    async def async_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """
+    The in-process LRU backend with the time to live of each value
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: the max number of the cached responses and the versions of the cache keys
+        """
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl)
+
+
+class CachedResponse(NamedTuple):
+    created_at: float
+    # the return value of the parser, or the status/body of the response returned by the parser
+    content: Any
+    status_code: Optional[int]
+    body: Optional[bytes]
+    headers: List[tuple]
+
+
+class ResponseCache(object):
+    """
+    Cache the responses of FIND_ONE and FIND_MANY by the path and the normalized query of the request.
+
+    The cache keys contain the versions of the table, the rows of FIND_ONE and the primary key of FIND_ONE,
+    a write bumps the versions instead of deleting the keys, so that it does not need to know the cached queries:
+    a write of a primary key (UPDATE_ONE/PATCH_ONE/DELETE_ONE) bumps the table and the primary key, and the new
+    primary key if the body changes it, the other writes bump the table and all the rows
+    """
+
+    def __init__(self,
+                 backend: ResponseCacheBackend,
+                 *,
+                 namespace: str,
+                 primary_key_name: Optional[str],
+                 ttl: float = 60,
+                 stale_ttl: float = 0,
+                 refresh_ahead: Optional[float] = None):
+        """
+        :param namespace: the prefix of the keys, the routers of the same table in the same namespace invalidate
+                          the responses of each other
+        :param ttl: seconds, the response is fresh in this time
+        :param stale_ttl: seconds, the stale response is returned in this time after the ttl while it is refreshed
+                          in the background (stale-while-revalidate)
+        :param refresh_ahead: 0 - 1, the fresh response is refreshed in the background when it is requested after
+                              this fraction of the ttl
+        """
+        assert ttl > 0, 'the ttl of the response cache should be positive'
+        assert refresh_ahead is None or 0 < refresh_ahead < 1, 'refresh_ahead should be in (0, 1)'
+        self.backend = backend
+        self.namespace = namespace
+        self.primary_key_name = primary_key_name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_ahead = refresh_ahead
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        # the keys being refreshed in the background
+        self._refreshing = set()
+        # the sync APIs run in the threads of the thread pool
+        self._lock = Lock()
+
+    @property
+    def stats(self) -> dict:
+        return {'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes}
+
+    def _version_keys(self, path_params: Optional[Dict[str, Any]]) -> List[str]:
+        if path_params is None:
+            return [f'{self.namespace}:version']
+        return [f'{self.namespace}:version:rows',
+                f'{self.namespace}:version:rows:{path_params.get(self.primary_key_name)}']
+
+    def _invalidation_keys(self, primary_keys: tuple) -> List[str]:
+        if not primary_keys:
+            return [f'{self.namespace}:version', f'{self.namespace}:version:rows']
+        return [f'{self.namespace}:version'] + [f'{self.namespace}:version:rows:{i}' for i in primary_keys]
+
+    @staticmethod
+    def _new_version() -> str:
+        # a missing version, e.g. evicted, is replaced by a new one instead of restarting a counter,
+        # so that the responses cached with an old version are never hit again
+        return uuid.uuid4().hex[:12]
+
+    def _key(self, versions: List[str], params: tuple) -> str:
+        digest = hashlib.sha1(repr(params).encode()).hexdigest()
+        return f'{self.namespace}:{":".join(versions)}:{digest}'
+
+    def _state(self, entry: Optional[CachedResponse]) -> Optional[str]:
+        if entry is None:
+            return None
+        age = time.time() - entry.created_at
+        if age < self.ttl:
+            return 'refresh' if self.refresh_ahead and age >= self.ttl * self.refresh_ahead else 'fresh'
+        if age < self.ttl + self.stale_ttl:
+            return 'stale'
+        return None
+
+    @staticmethod
+    def _entry(result, response: Response) -> Optional[CachedResponse]:
+        if isinstance(result, StreamingResponse):
+            return None
+        if isinstance(result, Response):
+            return CachedResponse(time.time(), None, result.status_code, result.body, list(result.raw_headers))
+        return CachedResponse(time.time(), result, None, None, list(response.raw_headers))
+
+    @staticmethod
+    def _load(entry: CachedResponse, fastapi_response: Response, cache_status: str):
+        """
+        return the cached response with the headers set by the parser, and the headers set by the dependencies of
+        this request
+        """
+        if entry.status_code is None:
+            fastapi_response.headers.raw.extend(entry.headers)
+            fastapi_response.headers[RESPONSE_CACHE_HEADER] = cache_status
+            return entry.content
+        response = Response(status_code=entry.status_code)
+        response.body = entry.body
+        response.raw_headers = list(entry.headers) + [(key, value) for key, value in fastapi_response.raw_headers
+                                                      if key not in (b'content-length', b'content-type')]
+        response.headers[RESPONSE_CACHE_HEADER] = cache_status
+        return response
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _hit(self, state: str) -> str:
+        with self._lock:
+            if state == 'stale':
+                self.stale_hits += 1
+                return 'STALE'
+            self.hits += 1
+            return 'HIT'
+
+    def _should_refresh(self, state: str, key: str) -> bool:
+        with self._lock:
+            if state == 'fresh' or key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _versions(self, path_params: Optional[Dict[str, Any]]) -> List[str]:
+        versions = []
+        for version_key in self._version_keys(path_params):
+            # the missing version is set once, the responses of the requests missing it at the same time share it
+            with self._lock:
+                version = self.backend.get(version_key)
+                if version is None:
+                    version = self._new_version()
+                    self.backend.set(version_key, version)
+            versions.append(version)
+        return versions
+
+    def _fetch(self, call: Callable[[Response], Any], key: str):
+        response = Response()
+        result = call(response)
+        entry = self._entry(result, response)
+        if entry is not None:
+            self.backend.set(key, entry, self.ttl + self.stale_ttl)
+        return result, entry
+
+    def _refresh(self, call: Callable[[Response], Any], key: str) -> None:
+        try:
+            self._fetch(call, key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def cached(self,
+               call: Callable[[Response], Any],
+               fastapi_response: Response,
+               background_tasks: BackgroundTasks,
+               params: tuple,
+               path_params: Optional[Dict[str, Any]] = None):
+        """
+        :param call: query and parse the response, the headers are set on the response passed to it
+        :param params: the path and the normalized query of the request
+        :param path_params: the primary key of FIND_ONE
+        """
+        key = self._key(self._versions(path_params), params)
+        entry = self.backend.get(key)
+        state = self._state(entry)
+        if state is None:
+            self._miss()
+            result, entry = self._fetch(call, key)
+            if entry is None:
+                return result
+            return self._load(entry, fastapi_response, 'MISS')
+        if self._should_refresh(state, key):
+            # the session of the request is closed after the background tasks
+            background_tasks.add_task(self._refresh, call, key)
+        return self._load(entry, fastapi_response, self._hit(state))
+
+    async def _async_versions(self, path_params: Optional[Dict[str, Any]]) -> List[str]:
+        versions = []
+        for version_key in self._version_keys(path_params):
+            version = await self.backend.async_get(version_key)
+            if version is None:
+                version = self._new_version()
+                await self.backend.async_set(version_key, version)
+            versions.append(version)
+        return versions
+
+    async def _async_fetch(self, call: Callable[[Response], Awaitable[Any]], key: str):
+        response = Response()
+        result = await call(response)
+        entry = self._entry(result, response)
+        if entry is not None:
+            await self.backend.async_set(key, entry, self.ttl + self.stale_ttl)
+        return result, entry
+
+    async def _async_refresh(self, call: Callable[[Response], Awaitable[Any]], key: str) -> None:
+        try:
+            await self._async_fetch(call, key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def async_cached(self,
+                           call: Callable[[Response], Awaitable[Any]],
+                           fastapi_response: Response,
+                           background_tasks: BackgroundTasks,
+                           params: tuple,
+                           path_params: Optional[Dict[str, Any]] = None):
+        key = self._key(await self._async_versions(path_params), params)
+        entry = await self.backend.async_get(key)
+        state = self._state(entry)
+        if state is None:
+            self._miss()
+            result, entry = await self._async_fetch(call, key)
+            if entry is None:
+                return result
+            return self._load(entry, fastapi_response, 'MISS')
+        if self._should_refresh(state, key):
+            background_tasks.add_task(self._async_refresh, call, key)
+        return self._load(entry, fastapi_response, self._hit(state))
+
+    def invalidate(self, *primary_keys: Any) -> None:
+        """
+        :param primary_keys: the written primary keys, none to invalidate all the responses of the table
+        """
+        for version_key in self._invalidation_keys(primary_keys):
+            self.backend.set(version_key, self._new_version())
+
+    async def async_invalidate(self, *primary_keys: Any) -> None:
+        for version_key in self._invalidation_keys(primary_keys):
+            await self.backend.async_set(version_key, self._new_version())
+
+    async def _written_primary_keys(self, request: Request) -> tuple:
+        """
+        the primary key of the path of UPDATE_ONE/PATCH_ONE/DELETE_ONE, and the primary key of the body if the
+        update changes it, e.g. the request body model of crud_models has the primary key
+        """
+        primary_key = request.path_params.get(self.primary_key_name)
+        if primary_key is None:
+            return ()
+        if request.method not in ('PUT', 'PATCH'):
+            return primary_key,
+        try:
+            # the body is parsed by fastapi already
+            body = await request.json()
+        except ValueError:
+            return primary_key,
+        if not isinstance(body, dict) or body.get(self.primary_key_name) is None:
+            return primary_key,
+        return primary_key, body[self.primary_key_name]
+
+    def invalidate_dependency(self, db_session: Callable, async_mode: bool) -> Callable:
+        """
+        the dependency of the write APIs, it shares the session with the API and invalidates the responses
+        once the session commits, which is before the response of the write if autocommit
+        """
+        if async_mode:
+            async def async_invalidate_response_cache(request: Request, session=Depends(db_session)):
+                primary_keys = await self._written_primary_keys(request)
+                pending = []
+
+                def after_commit(_):
+                    if self.backend.blocking:
+                        self.invalidate(*primary_keys)
+                    else:
+                        pending.append(asyncio.ensure_future(self.async_invalidate(*primary_keys)))
+
+                event.listen(session.sync_session, 'after_commit', after_commit, once=True)
+                try:
+                    yield
+                finally:
+                    if pending:
+                        await asyncio.gather(*pending)
+
+            return async_invalidate_response_cache
+
+        assert self.backend.blocking, 'the response cache backend without the blocking methods requires async mode'
+
+        # async to read the body, the session is committed in the thread of the sync API
+        async def invalidate_response_cache(request: Request, session=Depends(db_session)):
+            primary_keys = await self._written_primary_keys(request)
+            event.listen(session, 'after_commit', lambda _: self.invalidate(*primary_keys), once=True)
+            yield
+
+        return invalidate_response_cache
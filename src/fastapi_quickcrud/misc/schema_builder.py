@@ -1,12 +1,14 @@
+import hashlib
 import uuid
 import warnings
 from copy import deepcopy
 from dataclasses import (make_dataclass,
                          field)
-from enum import auto
+from enum import auto, Enum
 from typing import (Optional,
                     Any)
 from typing import (Type,
+                    Callable,
                     Dict,
                     List,
                     Tuple,
@@ -25,18 +27,21 @@ from sqlalchemy import UniqueConstraint, Table, Column
 from sqlalchemy import inspect
 from sqlalchemy.orm import DeclarativeMeta
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql.elements import TextClause
 from strenum import StrEnum
 
 from .covert_model import convert_table_to_model
 from .exceptions import (SchemaException,
-                         ColumnTypeNotSupportedException)
+                         ColumnTypeNotSupportedException,
+                         InvalidBulkLoadRequest)
 from .type import (MatchingPatternInStringBase,
                    RangeFromComparisonOperators,
                    Ordering,
                    RangeToComparisonOperators,
                    ExtraFieldTypePrefix,
                    ExtraFieldType,
-                   ItemComparisonOperators, PGSQLMatchingPatternInString, SqlType, )
+                   ItemComparisonOperators, PGSQLMatchingPatternInString, SqlType, PaginationMode,
+                   BulkLoadFormat, )
 
 FOREIGN_PATH_PARAM_KEYWORD = "__pk__"
 BaseModelT = TypeVar('BaseModelT', bound=BaseModel)
@@ -108,37 +113,68 @@ def _to_require_but_default(model: Type[BaseModelT]) -> Type[BaseModelT]:
                         __config__=config)  # type: ignore[arg-type]
 
 
-def _filter_none(request_or_response_object):
-    received_request = deepcopy(request_or_response_object.__dict__)
-    if 'insert' in received_request:
-        insert_item_without_null = []
-        for received_insert in received_request['insert']:
-            received_insert_ = deepcopy(received_insert)
-            for received_insert_item, received_insert_value in received_insert_.__dict__.items():
-                if hasattr(received_insert_value, '__module__'):
-                    if received_insert_value.__module__ == 'fastapi.params' or received_insert_value is None:
-                        delattr(received_insert, received_insert_item)
-                elif received_insert_value is None:
-                    delattr(received_insert, received_insert_item)
-
-            insert_item_without_null.append(received_insert)
-        setattr(request_or_response_object, 'insert', insert_item_without_null)
-    else:
-        for name, value in received_request.items():
-            if hasattr(value, '__module__'):
-                if value.__module__ == 'fastapi.params' or value is None:
-                    delattr(request_or_response_object, name)
-            elif value is None:
-                delattr(request_or_response_object, name)
+def _stable_repr(value) -> str:
+    """
+    the repr of a value which is the same on every boot, e.g. a function is represented by its qualified name
+    instead of the default repr holding its memory address
+    """
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return repr(value)
+    if isinstance(value, Enum):
+        return _stable_repr(value.value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_stable_repr(i) for i in value]
+        return repr(sorted(items) if isinstance(value, (set, frozenset)) else items)
+    if isinstance(value, dict):
+        return repr(sorted((_stable_repr(k), _stable_repr(v)) for k, v in value.items()))
+    if isinstance(value, TextClause):
+        return repr(value.text)
+    if hasattr(value, 'dependency'):
+        # Depends() and Security()
+        return _stable_repr(value.dependency)
+    if hasattr(value, 'arg'):
+        # ColumnDefault, Sequence and DefaultClause
+        return f'{type(value).__name__}({_stable_repr(value.arg)})'
+    kls = value if isinstance(value, type) or callable(value) else type(value)
+    return f'{getattr(kls, "__module__", "")}.{getattr(kls, "__qualname__", type(kls).__qualname__)}'
+
+
+def _table_signature(table: Table) -> tuple:
+    return table.name, [(column.key, repr(column.type), column.nullable, column.primary_key,
+                         _stable_repr(column.default), _stable_repr(column.server_default), column.comment)
+                        for column in table.c]
+
+
+def schema_hash(table: Table, *, foreign_include=None, **options) -> str:
+    """
+    the hash of the tables and the options which the generated models depend on, the names of the generated models
+    are derived from it instead of a random uuid, so they are the same on every boot until the schema changes
+
+    :param foreign_include: the models/tables of the foreign tree, the signature of their tables are hashed as well
+    """
+    foreign_tables = sorted(_table_signature(convert_table_to_model(i)[0].__table__) for i in foreign_include or [])
+    unique_columns = sorted(sorted(column.name for column in constraint.columns)
+                            for constraint in table.constraints if isinstance(constraint, UniqueConstraint))
+    options = sorted((key, _stable_repr(value)) for key, value in options.items())
+    signature = repr((_table_signature(table), unique_columns, foreign_tables, options))
+    return hashlib.sha1(signature.encode()).hexdigest()[:8]
+
+
+def _not_received(value) -> bool:
+    # the field without value is None or the default value of fastapi, e.g. Query(None)
+    return value is None or type(value).__module__ == 'fastapi.params'
 
 
 class ApiParameterSchemaBuilder:
     unsupported_data_types = ["BLOB"]
     partial_supported_data_types = ["INTERVAL", "JSON", "JSONB"]
+    _builders: Dict[tuple, 'ApiParameterSchemaBuilder'] = {}
 
     def __init__(self, db_model: Type, sql_type, exclude_column=None, constraints=None, exclude_primary_key=False,
-                 foreign_include=False):
+                 foreign_include=False, pagination_mode=PaginationMode.offset, sparse_fieldsets=False):
         self.constraints = constraints
+        self.pagination_mode = pagination_mode
+        self.sparse_fieldsets = sparse_fieldsets
         self.exclude_primary_key = exclude_primary_key
         if exclude_column is None:
             self._exclude_column = []
@@ -155,6 +191,16 @@ class ApiParameterSchemaBuilder:
             self.__db_model_table: Table = db_model.__table__
             self.db_name: str = db_model.__tablename__
             self.__columns = db_model.__table__.c
+        self.schema_hash: str = schema_hash(self.__db_model_table,
+                                            foreign_include=foreign_include,
+                                            sql_type=sql_type,
+                                            exclude_column=sorted(self._exclude_column),
+                                            constraints=sorted(sorted(column.name for column in constraint.columns)
+                                                               for constraint in constraints or []
+                                                               if isinstance(constraint, UniqueConstraint)),
+                                            exclude_primary_key=exclude_primary_key,
+                                            pagination_mode=pagination_mode,
+                                            sparse_fieldsets=sparse_fieldsets)
         model = self.__db_model
         self.primary_key_str, self._primary_key_dataclass_model, self._primary_key_field_definition \
             = self._extract_primary()
@@ -168,6 +214,8 @@ class ApiParameterSchemaBuilder:
         self.json_type_columns = []
         self.array_type_columns = []
         self.foreign_table_response_model_sets: Dict[TableNameT, ResponseModelT] = {}
+        # the request/response models of the crud methods built by crud_method_to_pydantic
+        self.crud_method_models: Dict[str, Any] = {}
         self.all_field: List[dict] = self._extract_all_field()
         self.sql_type = sql_type
 
@@ -178,6 +226,23 @@ class ApiParameterSchemaBuilder:
         self.relation_level = self._extra_relation_level()
         self.table_of_foreign, self.reference_mapper = self.extra_foreign_table()
 
+    @classmethod
+    def of(cls, db_model: Type, **options) -> 'ApiParameterSchemaBuilder':
+        """
+        the builder of the model with the options, the same builder is returned for the same model and options,
+        since the openapi of fastapi requires the models of the same name to be the same model
+        """
+        builder = cls(db_model, **options)
+        return cls._builders.setdefault((db_model, builder.schema_hash), builder)
+
+    def _model_name(self, suffix: str, prefix: Optional[str] = None) -> str:
+        """
+        the deterministic name of a generated model, e.g. {table name}_{schema hash}_FindManyResponseItemModel
+
+        :param prefix: default is the table name
+        """
+        return f'{self.db_name if prefix is None else prefix}_{self.schema_hash}_{suffix}'
+
     def __foreign_mapper_builder(self):
         foreign_mapper = {}
         if self.exclude_primary_key:
@@ -273,7 +338,7 @@ class ApiParameterSchemaBuilder:
         primary_column_name = str(primary_key_column.key)
         primary_field_definitions = (primary_column_name, column_type, default)
 
-        primary_columns_model: DataClassT = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PrimaryKeyModel',
+        primary_columns_model: DataClassT = make_dataclass(self._model_name('PrimaryKeyModel'),
                                                            [(primary_field_definitions[0],
                                                              primary_field_definitions[1],
                                                              Query(primary_field_definitions[2],
@@ -457,7 +522,7 @@ class ApiParameterSchemaBuilder:
                                             i['column_type'],
                                             None))
                 response_model_dataclass = make_dataclass(
-                    f'foreign_{foreign_table_name + str(uuid.uuid4())}_FindManyResponseItemModel',
+                    self._model_name('ForeignResponseItemModel', prefix=f'foreign_{foreign_table_name}'),
                     response_fields,
                 )
                 response_item_model = _model_from_dataclass(response_model_dataclass)
@@ -467,7 +532,7 @@ class ApiParameterSchemaBuilder:
                 # response_item_model = _add_validators(response_item_model,
                 #                                            config=OrmConfig)
                 response_model = create_model(
-                    f'foreign_{foreign_table_name + str(uuid.uuid4())}_UpsertManyResponseListModel',
+                    self._model_name('ForeignResponseListModel', prefix=f'foreign_{foreign_table_name}'),
                     **{'__root__': (List[response_item_model], None)}
                 )
 
@@ -561,8 +626,9 @@ class ApiParameterSchemaBuilder:
                         exclude = True
                     else:
 
-                        reference_mapper[local_column] = {"foreign_table": foreign_table,
-                                                          "foreign_table_name": foreign_table_name}
+                        # the relationships of the same local column, e.g. the primary key, are all kept
+                        reference_mapper[foreign_table_name] = {"foreign_table": foreign_table,
+                                                                "foreign_table_name": foreign_table_name}
                         exclude = False
                     local_reference_pairs.append({'local': {"local_table": local_table,
                                                             "local_column": local_column},
@@ -593,7 +659,7 @@ class ApiParameterSchemaBuilder:
                         reference_column_ = str(column).split('.')[1]
                         reference_table_instance_ = column.table
 
-                reference_mapper[local_column_] = {"foreign_table": foreign_table,
+                reference_mapper[foreign_table_name] = {"foreign_table": foreign_table,
                                                         "foreign_table_name": foreign_table_name}
                 local_reference_pairs.append({'local': {"local_table": local_table_,
                                                         "local_column": local_column_},
@@ -612,7 +678,7 @@ class ApiParameterSchemaBuilder:
                                         i['column_type'],
                                         None))
             response_model_dataclass = make_dataclass(
-                f'foreign_{foreign_table_name + str(uuid.uuid4())}_FindManyResponseItemModel',
+                self._model_name('FindManyResponseItemModel', prefix=f'foreign_{foreign_table_name}'),
                 response_fields,
             )
             response_item_model = _model_from_dataclass(response_model_dataclass)
@@ -621,7 +687,7 @@ class ApiParameterSchemaBuilder:
                                                                             config=OrmConfig)
 
             response_model = create_model(
-                f'foreign_{foreign_table_name + str(uuid.uuid4())}_GetManyResponseForeignModel',
+                self._model_name('GetManyResponseForeignModel', prefix=f'foreign_{foreign_table_name}'),
                 **{'__root__': (Union[List[response_item_model], None], None)}
             )
             self.foreign_table_response_model_sets[foreign_table] = response_model
@@ -633,45 +699,48 @@ class ApiParameterSchemaBuilder:
 
     @staticmethod
     def _value_of_list_to_str(request_or_response_object, columns):
-        received_request = deepcopy(request_or_response_object.__dict__)
         if isinstance(columns, str):
             columns = [columns]
-        if 'insert' in request_or_response_object.__dict__:
-            insert_str_list = []
-            for insert_item in request_or_response_object.__dict__['insert']:
-                for column in columns:
-                    for insert_item_column, _ in insert_item.__dict__.items():
-                        if column in insert_item_column:
-                            value_ = insert_item.__dict__[insert_item_column]
-                            if value_ is not None:
-                                if isinstance(value_, list):
-                                    str_value_ = [str(i) for i in value_]
-                                else:
-                                    str_value_ = str(value_)
-                                setattr(insert_item, insert_item_column, str_value_)
-                insert_str_list.append(insert_item)
-            setattr(request_or_response_object, 'insert', insert_str_list)
-        else:
-            for column in columns:
-                for received_column_name, _ in received_request.items():
-                    if column in received_column_name:
-                        value_ = received_request[received_column_name]
-                        if value_ is not None:
-                            if isinstance(value_, list):
-                                str_value_ = [str(i) for i in value_]
-                            else:
-                                str_value_ = str(value_)
-                            setattr(request_or_response_object, received_column_name, str_value_)
+        received_request = request_or_response_object.__dict__
+        for received_column_name, value_ in list(received_request.items()):
+            if value_ is not None and any(column in received_column_name for column in columns):
+                received_request[received_column_name] = [str(i) for i in value_] if isinstance(value_, list) \
+                    else str(value_)
+
+    def _request_normalizer(self, fields: List[Tuple], *, insert_fields: Optional[List[Tuple]] = None,
+                            join_table_mapping: Optional[dict] = None) -> Callable[[Any], None]:
+        """
+        the __post_init__ of the request model, it removes the fields not received, converts the value of the uuid
+        fields to str and the join_foreign_table to the tables, in place
 
-    @staticmethod
-    def _assign_join_table_instance(request_or_response_object, join_table_mapping):
-        received_request = deepcopy(request_or_response_object.__dict__)
-        join_table_replace = {}
-        if 'join_foreign_table' in received_request:
-            for join_table in received_request['join_foreign_table']:
-                if join_table in join_table_mapping:
-                    join_table_replace[str(join_table)] = join_table_mapping[join_table]
-            setattr(request_or_response_object, 'join_foreign_table', join_table_replace)
+        :param fields: the fields of the request model, the uuid fields are found by the names
+        :param insert_fields: the fields of the item of insert, the items are normalized instead
+        :param join_table_mapping: the name of the foreign table -> the table of join_foreign_table
+        """
+        uuid_fields = [name for name, *_ in (insert_fields if insert_fields is not None else fields)
+                       if any(column in name for column in self.uuid_type_columns)]
+
+        def normalize(received_request: dict):
+            for name in [name for name, value in received_request.items() if _not_received(value)]:
+                del received_request[name]
+            for name in uuid_fields:
+                value = received_request.get(name, None)
+                if value is not None:
+                    received_request[name] = [str(i) for i in value] if isinstance(value, list) else str(value)
+
+        if insert_fields is not None:
+            def __post_init__(self_object):
+                for insert_item in self_object.insert:
+                    normalize(insert_item.__dict__)
+        else:
+            def __post_init__(self_object):
+                received_request = self_object.__dict__
+                normalize(received_request)
+                if join_table_mapping and 'join_foreign_table' in received_request:
+                    received_request['join_foreign_table'] = {str(join_table): join_table_mapping[join_table]
+                                                              for join_table in received_request['join_foreign_table']
+                                                              if join_table in join_table_mapping}
+        return __post_init__
 
     @staticmethod
     def _get_many_string_matching_patterns_description_builder():
@@ -782,12 +851,28 @@ class ApiParameterSchemaBuilder:
             table_of_foreign = self.table_of_foreign
         if not self.table_of_foreign:
             return result_
-        table_name_enum = StrEnum('TableName' + str(uuid.uuid4()),
+        table_name_enum = StrEnum(self._model_name('TableName'),
                                   {table_name: auto() for table_name in table_of_foreign})
 
         result_.append(('join_foreign_table', Optional[List[table_name_enum]], Query(None)))
         return result_
 
+    def _assign_fields_param(self, result_) -> List[Union[Tuple, Dict]]:
+        """
+        the fields query parameter of the sparse fieldsets, the columns of the joined tables are <table>.<column>
+        """
+        if not self.sparse_fieldsets:
+            return result_
+        field_names = [i['column_name'] for i in self.all_field]
+        for table_name, table_of_foreign in self.table_of_foreign.items():
+            field_names += [f'{table_name}.{i["column_name"]}' for i in table_of_foreign['fields']]
+        field_name_enum = StrEnum(self._model_name('FieldName'), {field_name: auto() for field_name in field_names})
+        result_.append(('fields', Optional[List[field_name_enum]], Query(
+            None,
+            description='the columns in the response, the primary key is always in it, '
+                        'all the columns of a joined table if none of them is given')))
+        return result_
+
     def _get_fizzy_query_param(self, exclude_column: List[str] = None, fields=None) -> List[dict]:
         if not fields:
             fields = self.all_field
@@ -827,9 +912,15 @@ class ApiParameterSchemaBuilder:
         regex_validation = "(?=(" + '|'.join(all_column_) + r")?\s?:?\s*?(?=(" + '|'.join(
             list(map(str, Ordering))) + r"))?)"
         columns_with_ordering = pydantic.constr(regex=regex_validation)
+        if self.pagination_mode == PaginationMode.cursor:
+            page_param = ('cursor', Optional[str], Query(
+                None,
+                description='the opaque token from the next_cursor header of the previous page'))
+        else:
+            page_param = ('offset', Optional[int], Query(None))
         for i in [
             ('limit', Optional[int], Query(None)),
-            ('offset', Optional[int], Query(None)),
+            page_param,
             ('order_by_columns', Optional[List[columns_with_ordering]], Query(
                 # [f"{self._primary_key}:ASC"],
                 None,
@@ -842,7 +933,6 @@ class ApiParameterSchemaBuilder:
         return result_
 
     def upsert_one(self) -> Tuple:
-        request_validation = [lambda self_object: _filter_none(self_object)]
         request_fields = []
         response_fields = []
 
@@ -854,7 +944,7 @@ class ApiParameterSchemaBuilder:
                                  description='update_columns should contain which columns you want to update '
                                              'when the unique columns got conflict'))
         conflict_model = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_Upsert_one_request_update_columns_when_conflict_request_body_model',
+            self._model_name('Upsert_one_request_update_columns_when_conflict_request_body_model'),
             [conflict_columns])
         on_conflict_handle = [('on_conflict', Optional[conflict_model],
                                Body(None))]
@@ -869,19 +959,14 @@ class ApiParameterSchemaBuilder:
                                     i['column_type'],
                                     Body(i['column_default'], description=i['column_description'])))
 
-        # Ready the uuid to str validator
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        #
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Upsert_one_request_model',
+        request_normalizer = self._request_normalizer(request_fields + on_conflict_handle)
+        request_body_model = make_dataclass(self._model_name('Upsert_one_request_model'),
                                             request_fields + on_conflict_handle,
                                             namespace={
-                                                '__post_init__': lambda self_object: [i(self_object)
-                                                                                      for i in request_validation]
+                                                '__post_init__': request_normalizer
                                             })
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Upsert_one_response_model',
+        response_model_dataclass = make_dataclass(self._model_name('Upsert_one_response_model'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -901,7 +986,7 @@ class ApiParameterSchemaBuilder:
                                  description='update_columns should contain which columns you want to update '
                                              'when the unique columns got conflict'))
         conflict_model = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_Upsert_many_request_update_columns_when_conflict_request_body_model',
+            self._model_name('Upsert_many_request_update_columns_when_conflict_request_body_model'),
             [conflict_columns])
         on_conflict_handle = [('on_conflict', Optional[conflict_model],
                                Body(None))]
@@ -916,29 +1001,23 @@ class ApiParameterSchemaBuilder:
                                     i['column_type'],
                                     Body(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-
         insert_item_field_model_pydantic = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_UpsertManyInsertItemRequestModel',
+            self._model_name('UpsertManyInsertItemRequestModel'),
             insert_fields
         )
 
         # Create List Model with contains item
         insert_list_field = [('insert', List[insert_item_field_model_pydantic], Body(...))]
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpsertManyRequestBody',
+        request_normalizer = self._request_normalizer(insert_list_field + on_conflict_handle,
+                                                      insert_fields=insert_fields)
+        request_body_model = make_dataclass(self._model_name('UpsertManyRequestBody'),
                                             insert_list_field + on_conflict_handle
                                             ,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]}
+                                                '__post_init__': request_normalizer}
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseItemModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpsertManyResponseItemModel'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -946,18 +1025,16 @@ class ApiParameterSchemaBuilder:
         response_item_model = _add_orm_model_config_into_pydantic_model(response_item_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseListModel',
+            self._model_name('UpsertManyResponseListModel'),
             **{'__root__': (List[response_item_model], None)}
         )
 
         return None, request_body_model, response_model
 
     def create_one(self) -> Tuple:
-        request_validation = [lambda self_object: _filter_none(self_object)]
         request_fields = []
         response_fields = []
 
-
         # Create Request and Response Model
         all_field = deepcopy(self.all_field)
         for i in all_field:
@@ -968,19 +1045,13 @@ class ApiParameterSchemaBuilder:
                                     i['column_type'],
                                     Body(i['column_default'], description=i['column_description'])))
 
-        # Ready the uuid to str validator
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        #
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Create_one_request_model',
+        request_body_model = make_dataclass(self._model_name('Create_one_request_model'),
                                             request_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [i(self_object)
-                                                                                      for i in request_validation]
+                                                '__post_init__': self._request_normalizer(request_fields)
                                             })
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Create_one_response_model',
+        response_model_dataclass = make_dataclass(self._model_name('Create_one_response_model'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -1002,29 +1073,22 @@ class ApiParameterSchemaBuilder:
                                     i['column_type'],
                                     Body(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-
         insert_item_field_model_pydantic = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_CreateManyInsertItemRequestModel',
+            self._model_name('CreateManyInsertItemRequestModel'),
             insert_fields
         )
 
         # Create List Model with contains item
         insert_list_field = [('insert', List[insert_item_field_model_pydantic], Body(...))]
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_CreateManyRequestBody',
+        request_normalizer = self._request_normalizer(insert_list_field, insert_fields=insert_fields)
+        request_body_model = make_dataclass(self._model_name('CreateManyRequestBody'),
                                             insert_list_field
                                             ,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]}
+                                                '__post_init__': request_normalizer}
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseItemModel',
+        response_model_dataclass = make_dataclass(self._model_name('CreateManyResponseItemModel'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -1032,16 +1096,50 @@ class ApiParameterSchemaBuilder:
         response_item_model = _add_orm_model_config_into_pydantic_model(response_item_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseListModel',
+            self._model_name('CreateManyResponseListModel'),
             **{'__root__': (List[response_item_model], None)}
         )
 
         return None, request_body_model, response_model
 
+    def bulk_load(self) -> Tuple:
+        all_column_ = [i['column_name'] for i in self.all_field]
+        unique_fields = self.unique_fields
+
+        def _bulk_load_validator(self_object):
+            unknown_columns = [i for i in self_object.columns if i not in all_column_]
+            if unknown_columns:
+                raise InvalidBulkLoadRequest(400, f'{", ".join(unknown_columns)} is not the column of the table')
+            if len(set(self_object.columns)) != len(self_object.columns):
+                raise InvalidBulkLoadRequest(400, 'columns should not be duplicated')
+            if self_object.merge and not unique_fields:
+                raise InvalidBulkLoadRequest(400, 'merge requires the unique constraint of the table')
+
+        request_fields = [
+            ('format', BulkLoadFormat, Query(BulkLoadFormat.csv,
+                                             description='csv, or the binary format of postgresql COPY')),
+            ('columns', List[str], Query(all_column_,
+                                         description='the columns of the fields of each record, in order')),
+            ('header', bool, Query(False, description='the first line of csv is the header and would be skipped')),
+            ('merge', bool, Query(False,
+                                  description='load into a staging table then merge by INSERT ... ON CONFLICT of '
+                                              'the unique columns, the other loaded columns would be updated '
+                                              'when the unique columns got conflict')),
+        ]
+        request_query_model = make_dataclass(self._model_name('BulkLoadRequestQuery'),
+                                             request_fields,
+                                             namespace={
+                                                 '__post_init__': _bulk_load_validator
+                                             })
+        response_model = create_model(self._model_name('BulkLoadResponseModel'),
+                                      row_count=(int, ...))
+        return request_query_model, None, response_model
+
     def find_many(self) -> Tuple:
         query_param: List[dict] = self._get_fizzy_query_param()
         query_param: List[Tuple] = self._assign_pagination_param(query_param)
         query_param: List[Union[Tuple, Dict]] = self._assign_foreign_join(query_param)
+        query_param: List[Union[Tuple, Dict]] = self._assign_fields_param(query_param)
 
         response_fields = []
         all_field = deepcopy(self.all_field)
@@ -1064,22 +1162,13 @@ class ApiParameterSchemaBuilder:
                                        i['column_type'],
                                        Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.table_of_foreign:
-            request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                           self.table_of_foreign))
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindManyRequestBody',
+        request_normalizer = self._request_normalizer(request_fields, join_table_mapping=self.table_of_foreign)
+        request_query_model = make_dataclass(self._model_name('FindManyRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]}
+                                                 '__post_init__': request_normalizer}
                                              )
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindManyResponseItemModel',
+        response_model_dataclass = make_dataclass(self._model_name('FindManyResponseItemModel'),
                                                   response_fields,
                                                   )
         response_list_item_model = _model_from_dataclass(response_model_dataclass)
@@ -1087,7 +1176,7 @@ class ApiParameterSchemaBuilder:
                                                                              config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_FindManyResponseListModel',
+            self._model_name('FindManyResponseListModel'),
             **{'__root__': (Union[List[response_list_item_model], Any], None), '__base__': ExcludeUnsetBaseModel}
         )
 
@@ -1147,7 +1236,8 @@ class ApiParameterSchemaBuilder:
                                                                                       description=description)))
 
         # TODO test foreign uuid key
-        primary_columns_model: DataClassT = make_dataclass(f'{foreign_table_name + str(uuid.uuid4())}_PrimaryKeyModel',
+        primary_columns_model_name = self._model_name('PrimaryKeyModel', prefix=foreign_table_name)
+        primary_columns_model: DataClassT = make_dataclass(primary_columns_model_name,
                                                            primary_key_columns,
                                                            namespace={
                                                                '__post_init__': lambda
@@ -1160,6 +1250,7 @@ class ApiParameterSchemaBuilder:
     def find_one(self) -> Tuple:
         query_param: List[dict] = self._get_fizzy_query_param(self.primary_key_str)
         query_param: List[Union[Tuple, Dict]] = self._assign_foreign_join(query_param)
+        query_param: List[Union[Tuple, Dict]] = self._assign_fields_param(query_param)
         response_fields = []
         all_field = deepcopy(self.all_field)
 
@@ -1169,9 +1260,10 @@ class ApiParameterSchemaBuilder:
                                     None))
 
         for i in all_field:
+            # the columns out of the sparse fieldsets are not set
             response_fields.append((i['column_name'],
                                     i['column_type'],
-                                    Body(i['column_default'])))
+                                    Body(None if self.sparse_fieldsets else i['column_default'])))
 
         request_fields = []
         for i in query_param:
@@ -1182,34 +1274,24 @@ class ApiParameterSchemaBuilder:
                 request_fields.append((i['column_name'],
                                        i['column_type'],
                                        Query(i['column_default'], description=i['column_description'])))
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        if self.table_of_foreign:
-            request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                           self.table_of_foreign))
 
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindOneRequestBody',
+        request_normalizer = self._request_normalizer(request_fields, join_table_mapping=self.table_of_foreign)
+        request_query_model = make_dataclass(self._model_name('FindOneRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_normalizer
                                              }
                                              )
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindOneResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('FindOneResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': self._request_normalizer(response_fields)}
                                                   )
         response_model = _model_from_dataclass(response_model_dataclass)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_FindOneResponseListModel',
+            self._model_name('FindOneResponseListModel'),
             **{'__root__': (response_model, None), '__base__': ExcludeUnsetBaseModel}
         )
 
@@ -1230,21 +1312,16 @@ class ApiParameterSchemaBuilder:
             request_fields.append((i['column_name'],
                                    i['column_type'],
                                    Query(i['column_default'], description=i['column_description'])))
-        request_validation = [lambda self_object: _filter_none(self_object)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
             response_validation = [lambda self_object: self._value_of_list_to_str(self_object,
                                                                                   self.uuid_type_columns)]
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteOneRequestBody',
+        request_query_model = make_dataclass(self._model_name('DeleteOneRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': self._request_normalizer(request_fields)
                                              }
                                              )
-        response_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteOneResponseModel',
+        response_model = make_dataclass(self._model_name('DeleteOneResponseModel'),
                                         response_fields,
                                         namespace={
                                             '__post_init__': lambda self_object: [validator_(self_object)
@@ -1270,28 +1347,23 @@ class ApiParameterSchemaBuilder:
             request_fields.append((i['column_name'],
                                    i['column_type'],
                                    Query(i['column_default'], description=i['column_description'])))
-        request_validation = [lambda self_object: _filter_none(self_object)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
             response_validation = [lambda self_object: self._value_of_list_to_str(self_object,
                                                                                   self.uuid_type_columns)]
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteManyRequestBody',
+        request_query_model = make_dataclass(self._model_name('DeleteManyRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': self._request_normalizer(request_fields)
                                              }
                                              )
-        # response_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteManyResponseModel',
+        # response_model = make_dataclass(self._model_name('DeleteManyResponseModel'),
         #                                 response_fields,
         #                                 namespace={
         #                                     '__post_init__': lambda self_object: [validator_(self_object)
         #                                                                           for validator_ in
         #                                                                           response_validation]}
         #                                 )
-        response_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteManyResponseModel',
+        response_model = make_dataclass(self._model_name('DeleteManyResponseModel'),
                                         response_fields,
                                         namespace={
                                             '__post_init__': lambda self_object: [validator_(self_object)
@@ -1303,7 +1375,7 @@ class ApiParameterSchemaBuilder:
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_DeleteManyResponseListModel',
+            self._model_name('DeleteManyResponseListModel'),
             **{'__root__': (List[response_model], None)}
         )
 
@@ -1332,34 +1404,24 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchOneRequestQueryBody',
+        request_query_model = make_dataclass(self._model_name('PatchOneRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': self._request_normalizer(request_query_fields)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchOneRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('PatchOneRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': self._request_normalizer(request_body_fields)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchOneResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('PatchOneResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': self._request_normalizer(response_fields)}
                                                   )
         response_model = _model_from_dataclass(response_model_dataclass)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1389,34 +1451,24 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateOneRequestQueryBody',
+        request_query_model = make_dataclass(self._model_name('UpdateOneRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': self._request_normalizer(request_query_fields)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateOneRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('UpdateOneRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': self._request_normalizer(request_body_fields)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateOneResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpdateOneResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': self._request_normalizer(response_fields)}
                                                   )
         response_model = _model_from_dataclass(response_model_dataclass)
 
@@ -1455,36 +1507,28 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateManyRequestQueryBody',
+        request_query_model = make_dataclass(self._model_name('UpdateManyRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': self._request_normalizer(request_query_fields)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateManyRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('UpdateManyRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': self._request_normalizer(request_body_fields)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateManyResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpdateManyResponseModel'),
                                                   response_fields,
                                                   )
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
         response_model_pydantic = _add_orm_model_config_into_pydantic_model(response_model_pydantic, config=OrmConfig)
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_UpdateManyResponseListModel',
+            self._model_name('UpdateManyResponseListModel'),
             **{'__root__': (List[response_model_pydantic], None)}
         )
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1523,40 +1567,30 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchManyRequestQueryBody',
+        request_query_model = make_dataclass(self._model_name('PatchManyRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': self._request_normalizer(request_query_fields)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchManyRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('PatchManyRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': self._request_normalizer(request_body_fields)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchManyResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('PatchManyResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': self._request_normalizer(response_fields)}
                                                   )
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
         response_model_pydantic = _add_orm_model_config_into_pydantic_model(response_model_pydantic, config=OrmConfig)
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_PatchManyResponseListModel',
+            self._model_name('PatchManyResponseListModel'),
             **{'__root__': (List[response_model_pydantic], None)}
         )
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1564,7 +1598,6 @@ class ApiParameterSchemaBuilder:
         return None, request_query_model, request_body_model, response_model
 
     def post_redirect_get(self) -> Tuple:
-        request_validation = [lambda self_object: _filter_none(self_object)]
         request_body_fields = []
         response_body_fields = []
 
@@ -1578,20 +1611,13 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Body(i['column_default'], description=i['column_description'])))
 
-        # Ready the uuid to str validator
-        if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        #
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PostAndRedirectRequestModel',
+        request_body_model = make_dataclass(self._model_name('PostAndRedirectRequestModel'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator(self_object)
-                                                                                      for validator in
-                                                                                      request_validation]
+                                                '__post_init__': self._request_normalizer(request_body_fields)
                                             })
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PostAndRedirectResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('PostAndRedirectResponseModel'),
                                                   response_body_fields)
         response_model = _model_from_dataclass(response_model_dataclass)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1640,39 +1666,32 @@ class ApiParameterSchemaBuilder:
                     request_fields.append((i['column_name'],
                                            i['column_type'],
                                            Query(i['column_default'], description=i['column_description'])))
-            request_validation = [lambda self_object: _filter_none(self_object)]
-
-            if table_of_foreign:
-                request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                               total_table_of_foreign))
-            if self.uuid_type_columns:
-                request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                         self.uuid_type_columns))
+
             for local_column, refer_table_info in reference_mapper.items():
                 response_fields.append((f"{refer_table_info['foreign_table_name']}_foreign",
                                         self.foreign_table_response_model_sets[refer_table_info['foreign_table']],
                                         None))
 
+            # the join_foreign_table of the level is resolved by the tables of all the levels
+            request_normalizer = self._request_normalizer(
+                request_fields, join_table_mapping=total_table_of_foreign if table_of_foreign else None)
             request_query_model = make_dataclass(
-                f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneForeignTreeRequestBody',
+                self._model_name('FindOneForeignTreeRequestBody', prefix="_".join(pk_list)),
                 request_fields,
                 namespace={
-                    '__post_init__': lambda self_object: [validator_(self_object)
-                                                          for validator_ in
-                                                          request_validation]}
+                    '__post_init__': request_normalizer}
             )
-            response_model_dataclass = make_dataclass(f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneResponseModel',
+            response_model_name = self._model_name('FindOneResponseModel', prefix="_".join(pk_list))
+            response_model_dataclass = make_dataclass(response_model_name,
                                                       response_fields,
                                                       namespace={
-                                                          '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                                for validator_ in
-                                                                                                request_validation]}
+                                                          '__post_init__': self._request_normalizer(response_fields)}
                                                       )
             response_model = _model_from_dataclass(response_model_dataclass)
             response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
             response_model = create_model(
-                f'{"_".join(pk_list) + str(uuid.uuid4())}_FindManyResponseListModel',
+                self._model_name('FindManyResponseListModel', prefix="_".join(pk_list)),
                 **{'__root__': (Union[List[response_model], Any], None), '__base__': ExcludeUnsetBaseModel}
             )
 
@@ -1732,41 +1751,33 @@ class ApiParameterSchemaBuilder:
                     request_fields.append((i['column_name'],
                                            i['column_type'],
                                            Query(i['column_default'], description=i['column_description'])))
-            request_validation = [lambda self_object: _filter_none(self_object)]
-
-            if table_of_foreign:
-                request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                               total_table_of_foreign))
-            if self.uuid_type_columns:
-                request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                         self.uuid_type_columns))
 
             for local_column, refer_table_info in reference_mapper.items():
                 response_fields.append((f"{refer_table_info['foreign_table_name']}_foreign",
                                         self.foreign_table_response_model_sets[refer_table_info['foreign_table']],
                                         None))
 
-            request_query_model = make_dataclass(f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneRequestBody',
+            # the join_foreign_table of the level is resolved by the tables of all the levels
+            request_normalizer = self._request_normalizer(
+                request_fields, join_table_mapping=total_table_of_foreign if table_of_foreign else None)
+            request_query_model = make_dataclass(self._model_name('FindOneRequestBody', prefix="_".join(pk_list)),
                                                  request_fields,
                                                  namespace={
-                                                     '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                           for validator_ in
-                                                                                           request_validation]
+                                                     '__post_init__': request_normalizer
                                                  }
                                                  )
 
-            response_model_dataclass = make_dataclass(f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneResponseModel',
+            response_model_name = self._model_name('FindOneResponseModel', prefix="_".join(pk_list))
+            response_model_dataclass = make_dataclass(response_model_name,
                                                       response_fields,
                                                       namespace={
-                                                          '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                                for validator_ in
-                                                                                                request_validation]}
+                                                          '__post_init__': self._request_normalizer(response_fields)}
                                                       )
             response_model = _model_from_dataclass(response_model_dataclass)
             response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
             response_model = create_model(
-                f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneResponseListModel',
+                self._model_name('FindOneResponseListModel', prefix="_".join(pk_list)),
                 **{'__root__': (response_model, None), '__base__': ExcludeUnsetBaseModel}
             )
             _response_model = {}
@@ -0,0 +1,259 @@
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import Any, Callable, Optional
+from weakref import WeakKeyDictionary
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from .batch import BATCH_SESSION_DEPENDENCY_ATTRIBUTE
+
+# the info key of the session of a write, the QueuedWrite of the session
+SQLITE_WRITE_INFO_KEY = 'quickcrud_sqlite_write'
+
+
+class _Group(object):
+    """
+    the writes committed by one COMMIT
+    """
+
+    def __init__(self, future):
+        self.size = 0
+        self.future = future
+
+
+class QueuedWrite(object):
+    """
+    the write of a request, returned by the session dependency of the write APIs, the endpoint runs with the session
+    of it once the write gets the writer connection, the session is in a SAVEPOINT of the transaction of the group
+    """
+
+    def __init__(self, writer: 'SQLiteWriter'):
+        self.writer = writer
+        self.session = None
+
+
+def queued_write(session) -> Optional[QueuedWrite]:
+    return session.info.get(SQLITE_WRITE_INFO_KEY)
+
+
+class SQLiteWriter(object):
+    """
+    Serialize the writes to a SQLite database through one writer connection, so that the writers of the process
+    do not fight over the lock of the database.
+
+    The write requests queue in the event loop for the writer connection, each runs with its own session in a
+    SAVEPOINT of an open BEGIN IMMEDIATE transaction. The write finishing while other writes are queued releases the
+    connection without committing, the last write of the queue, or the max_group_size-th write, commits the writes
+    of the group by one COMMIT. A request returns once its group is committed. There is one writer of an engine,
+    shared by the routers.
+
+    The writer connection runs on a thread of its own, in sync mode the endpoints of the writes run on the writer
+    thread instead of the thread pool, in async mode the writer connection is an aiosqlite connection, which runs
+    on its own thread. The queued writes and the writes waiting for their group wait in the event loop, so they do
+    not hold the threads of the thread pool
+    """
+    _writers = WeakKeyDictionary()
+
+    @classmethod
+    def of(cls, engine, *, max_group_size: int = 64) -> 'SQLiteWriter':
+        """
+        the writer of the engine, the engine should have a connection pool, since the writer connection is not
+        returned to it
+        """
+        key = getattr(engine, 'sync_engine', engine)
+        writer = cls._writers.get(key)
+        if writer is None:
+            writer = cls._writers[key] = cls(engine, max_group_size=max_group_size)
+        return writer
+
+    def __init__(self, engine, *, max_group_size: int = 64):
+        """
+        :param engine: an Engine, or an AsyncEngine in async mode
+        :param max_group_size: the max number of the writes committed by one COMMIT
+        """
+        self.engine = engine
+        self.async_mode = isinstance(engine, AsyncEngine)
+        self.max_group_size = max_group_size
+        self.connection = None
+        # the writer thread of the connection in sync mode
+        self._executor = None if self.async_mode else ThreadPoolExecutor(max_workers=1,
+                                                                         thread_name_prefix='sqlite-writer')
+        # the transaction of the group
+        self._transaction = None
+        # the number of the writes waiting for the writer connection
+        self._queued = 0
+        self._group = None
+        # the lock of the writer connection, created in the event loop of the requests
+        self._lock = None
+        self._dependency = None
+        self.writes = 0
+        self.commits = 0
+
+    @property
+    def stats(self) -> dict:
+        return {'writes': self.writes,
+                'commits': self.commits}
+
+    async def _run(self, function: Callable, *args: Any) -> Any:
+        """
+        await the function of the connection or the session in async mode, or run it on the writer thread
+        """
+        if self.async_mode:
+            return await function(*args)
+        return await asyncio.get_event_loop().run_in_executor(self._executor, partial(function, *args))
+
+    def _session(self):
+        # the session of a write is closed once the write finishes, the rows are not expired by the SAVEPOINT
+        if self.async_mode:
+            return AsyncSession(bind=self.connection, expire_on_commit=False)
+        return Session(bind=self.connection, future=True, expire_on_commit=False)
+
+    def _end_group(self) -> Optional[_Group]:
+        """
+        the group to commit, if no write is queued or the group is full
+        """
+        if self._queued and self._group.size < self.max_group_size:
+            return None
+        group = self._group
+        self._group = None
+        return group
+
+    async def async_acquire(self, write: QueuedWrite) -> QueuedWrite:
+        """
+        wait for the writer connection, then begin the SAVEPOINT and the session of the write
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        self._queued += 1
+        try:
+            await self._lock.acquire()
+        finally:
+            # a cancelled request is not queued anymore either
+            self._queued -= 1
+        try:
+            if self.connection is None:
+                self.connection = await self._run(self.engine.connect)
+            if self._group is None:
+                self._transaction = await self._run(self.connection.begin)
+                await self._run(self.connection.execute, text('BEGIN IMMEDIATE'))
+                self._group = _Group(asyncio.get_event_loop().create_future())
+            await self._run(self.connection.begin_nested)
+        except BaseException:
+            if self._group is None and self._transaction is not None and self._transaction.is_active:
+                await self._run(self._transaction.rollback)
+            self._lock.release()
+            raise
+        write.session = self._session()
+        write.session.info[SQLITE_WRITE_INFO_KEY] = write
+        self.writes += 1
+        return write
+
+    async def async_finish(self, write: QueuedWrite) -> asyncio.Future:
+        """
+        close the session of the write, which rolls back the SAVEPOINT if the write is not committed, then commit
+        the group if the write is the last of it, and release the writer connection
+
+        :return: the future of the commit of the group
+        """
+        group = self._group
+        try:
+            await self._run(write.session.close)
+        finally:
+            try:
+                group.size += 1
+                group_to_commit = self._end_group()
+                if group_to_commit is not None:
+                    try:
+                        await self._run(self._transaction.commit)
+                        self.commits += 1
+                    except BaseException as e:
+                        await self._run(self._transaction.rollback)
+                        group_to_commit.future.set_exception(e)
+                        # retrieved, so that the future of a group without waiting requests is not logged
+                        group_to_commit.future.exception()
+                    else:
+                        group_to_commit.future.set_result(None)
+            finally:
+                self._lock.release()
+        return group.future
+
+    def session_dependency(self) -> Callable:
+        """
+        the session dependency of the write APIs, it returns the QueuedWrite of the request, the endpoints
+        registered by QueuedRoutes run with the session of it, the operations of a batch resolve it to the session
+        of the batch instead
+        """
+        if self._dependency is None:
+            async def sqlite_writer_session():
+                return QueuedWrite(self)
+
+            setattr(sqlite_writer_session, BATCH_SESSION_DEPENDENCY_ATTRIBUTE, True)
+            self._dependency = sqlite_writer_session
+        return self._dependency
+
+    def queued_endpoint(self, endpoint: Callable) -> Callable:
+        """
+        the endpoint of a write API, which runs with the session of its QueuedWrite once the write gets the writer
+        connection, and returns once the group of the write is committed
+        """
+        is_coroutine = asyncio.iscoroutinefunction(endpoint)
+
+        @wraps(endpoint)
+        async def queued(**kwargs):
+            write = kwargs.get('session')
+            if not isinstance(write, QueuedWrite):
+                # an operation of a batch, on the session of the batch
+                return await endpoint(**kwargs) if is_coroutine else await run_in_threadpool(endpoint, **kwargs)
+            await self.async_acquire(write)
+            try:
+                kwargs['session'] = write.session
+                result = await self._run(partial(endpoint, **kwargs))
+            finally:
+                group = await self.async_finish(write)
+            await group
+            return result
+
+        return queued
+
+
+class QueuedRoutes(object):
+    """
+    stand-in of APIRouter for the route sources, the endpoints depending on the session dependency of the writer
+    are registered by SQLiteWriter.queued_endpoint
+    """
+
+    def __init__(self, api, writer: SQLiteWriter):
+        self.api = api
+        self.writer = writer
+
+    def _is_write(self, endpoint: Callable) -> bool:
+        return any(getattr(parameter.default, 'dependency', None) is self.writer.session_dependency()
+                   for parameter in inspect.signature(endpoint).parameters.values())
+
+    def api_route(self, path: str, **kwargs: Any) -> Callable:
+        def decorator(endpoint: Callable) -> Callable:
+            self.api.api_route(path, **kwargs)(self.writer.queued_endpoint(endpoint) if self._is_write(endpoint)
+                                               else endpoint)
+            return endpoint
+
+        return decorator
+
+    def get(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['GET'], **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['POST'], **kwargs)
+
+    def put(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['PUT'], **kwargs)
+
+    def patch(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['PATCH'], **kwargs)
+
+    def delete(self, path: str, **kwargs: Any) -> Callable:
+        return self.api_route(path, methods=['DELETE'], **kwargs)
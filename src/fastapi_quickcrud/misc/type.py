@@ -19,6 +19,44 @@ class Ordering(StrEnum):
     ASC = auto()
 
 
+class PaginationMode(StrEnum):
+    offset = auto()
+    cursor = auto()
+
+
+class CountStrategy(StrEnum):
+    exact = auto()
+    window = auto()
+    estimated = auto()
+    cached = auto()
+
+
+class StreamFormat(StrEnum):
+    ndjson = auto()
+    json_array = auto()
+
+
+class WriteMode(StrEnum):
+    orm = auto()
+    core = auto()
+
+
+class ReadSessionPolicy(StrEnum):
+    round_robin = auto()
+    random = auto()
+
+
+class RelationLoading(StrEnum):
+    join = auto()
+    select_in = auto()
+    json_agg = auto()
+
+
+class BulkLoadFormat(StrEnum):
+    csv = auto()
+    binary = auto()
+
+
 class CrudMethods(Enum):
     FIND_ONE = "FIND_ONE"
     FIND_MANY = "FIND_MANY"
@@ -35,6 +73,7 @@ class CrudMethods(Enum):
     POST_REDIRECT_GET = "POST_REDIRECT_GET"
     FIND_ONE_WITH_FOREIGN_TREE = "FIND_ONE_WITH_FOREIGN_TREE"
     FIND_MANY_WITH_FOREIGN_TREE = "FIND_MANY_WITH_FOREIGN_TREE"
+    BULK_LOAD = "BULK_LOAD"
 
     @staticmethod
     def get_table_full_crud_method():
@@ -77,6 +116,8 @@ class CRUDRequestMapping(Enum):
     UPSERT_ONE = RequestMethods.POST
     UPSERT_MANY = RequestMethods.POST
 
+    BULK_LOAD = RequestMethods.POST
+
     DELETE_ONE = RequestMethods.DELETE
     DELETE_MANY = RequestMethods.DELETE
 
@@ -159,4 +200,6 @@ class SessionObject(StrEnum):
     sqlalchemy = auto()
     databases = auto()
 
-FOREIGN_PATH_PARAM_KEYWORD = "__pk__"
\ No newline at end of file
+FOREIGN_PATH_PARAM_KEYWORD = "__pk__"
+WINDOW_TOTAL_COUNT_KEYWORD = "__total_count__"
+RELATION_KEY_KEYWORD = "__relation_key__"
\ No newline at end of file
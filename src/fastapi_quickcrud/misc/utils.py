@@ -1,8 +1,12 @@
-from itertools import groupby
-from typing import Type, List, Union, TypeVar, Optional
-
-from pydantic import BaseModel, BaseConfig
-from sqlalchemy import Column, Integer
+import base64
+import json
+from decimal import Decimal
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, NamedTuple, Type, List, Union, TypeVar, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, BaseConfig, parse_obj_as, ValidationError
+from sqlalchemy import Column, Integer, and_, tuple_, bindparam
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql.elements import \
     or_, \
@@ -12,7 +16,7 @@ from sqlalchemy.sql.schema import Table
 
 from .covert_model import convert_table_to_model
 from .crud_model import RequestResponseModel, CRUDModel
-from .exceptions import QueryOperatorNotFound, PrimaryMissing, UnknownColumn
+from .exceptions import QueryOperatorNotFound, PrimaryMissing, UnknownColumn, InvalidCursor
 from .schema_builder import ApiParameterSchemaBuilder
 from .type import \
     CrudMethods, \
@@ -22,7 +26,8 @@ from .type import \
     RangeFromComparisonOperators, \
     ExtraFieldTypePrefix, \
     RangeToComparisonOperators, \
-    ItemComparisonOperators, PGSQLMatchingPatternInString, SqlType, FOREIGN_PATH_PARAM_KEYWORD
+    ItemComparisonOperators, PGSQLMatchingPatternInString, SqlType, FOREIGN_PATH_PARAM_KEYWORD, PaginationMode, \
+    WINDOW_TOTAL_COUNT_KEYWORD, RELATION_KEY_KEYWORD
 
 Base = TypeVar("Base", bound=declarative_base)
 
@@ -64,147 +69,307 @@ def clean_input_fields(param: Union[dict, list], model: Base):
         return stmt
 
 
+class FilterPlanEntry(NamedTuple):
+    # the attribute of the model, None if the param is the operators of another param
+    column: Any
+    # None means the param is compared by equal
+    kind: Optional[ExtraFieldTypePrefix]
+    # the name of the param of the operators, e.g. int4_value____list_____comparison_operator
+    operator_param: Optional[str]
+    # operator -> the callable to build the expression of the column by the value
+    operators: Dict[Any, Callable[[Any], BinaryExpression]]
+
+
+OPERATOR_PARAM = FilterPlanEntry(column=None, kind=None, operator_param=None, operators={})
+
+
+class FilterPlan(dict):
+    """
+    param name -> FilterPlanEntry of the query params of a model, so that find_query_builder does not parse
+    the param names for each request, the params of all the columns are precomputed
+    """
+
+    def __init__(self, model: Base):
+        super().__init__()
+        self.model = model
+        table = getattr(model, '__table__', None)
+        for column_name in (table.c.keys() if table is not None else []):
+            if not hasattr(model, column_name):
+                continue
+            self[column_name] = self._entry(column_name)
+            for type_, operator_type in process_type_map.items():
+                self[column_name + type_] = self._entry(column_name + type_)
+                self[column_name + type_ + operator_type] = OPERATOR_PARAM
+
+    def _entry(self, column_name: str) -> FilterPlanEntry:
+        if ExtraFieldType.Comparison_operator in column_name or ExtraFieldType.Matching_pattern in column_name:
+            return OPERATOR_PARAM
+        for type_ in (ExtraFieldTypePrefix.List, ExtraFieldTypePrefix.From,
+                      ExtraFieldTypePrefix.To, ExtraFieldTypePrefix.Str):
+            if type_ in column_name:
+                break
+        else:
+            return FilterPlanEntry(column=getattr(self.model, column_name), kind=None, operator_param=None,
+                                   operators={})
+        column = getattr(self.model, column_name.replace(type_, ""))
+        operator_types = process_operator_type_map[type_]
+        return FilterPlanEntry(column=column,
+                               kind=type_,
+                               operator_param=column_name + process_type_map[type_],
+                               operators={operator: partial(process, column)
+                                          for operator, process in process_map.items()
+                                          if isinstance(operator, operator_types)})
+
+    def __missing__(self, column_name: str) -> FilterPlanEntry:
+        # the param is not a column of the table, e.g. a column_property
+        entry = self[column_name] = self._entry(column_name)
+        return entry
+
+
+@lru_cache(maxsize=None)
+def get_filter_plan(model: Base) -> FilterPlan:
+    return FilterPlan(model)
+
+
 def find_query_builder(param: dict, model: Base) -> List[Union[BinaryExpression]]:
     query = []
+    filter_plan = get_filter_plan(model)
     for column_name, value in param.items():
-        if ExtraFieldType.Comparison_operator in column_name or ExtraFieldType.Matching_pattern in column_name:
+        entry = filter_plan[column_name]
+        if entry is OPERATOR_PARAM:
             continue
-        if ExtraFieldTypePrefix.List in column_name:
-            type_ = ExtraFieldTypePrefix.List
-        elif ExtraFieldTypePrefix.From in column_name:
-            type_ = ExtraFieldTypePrefix.From
-        elif ExtraFieldTypePrefix.To in column_name:
-            type_ = ExtraFieldTypePrefix.To
-        elif ExtraFieldTypePrefix.Str in column_name:
-            type_ = ExtraFieldTypePrefix.Str
-        else:
-            query.append((getattr(model, column_name) == value))
-            # raise Exception('known error')
+        if entry.kind is None:
+            query.append((entry.column == value))
             continue
-        sub_query = []
-        table_column_name = column_name.replace(type_, "")
-        operator_column_name = column_name + process_type_map[type_]
-        operators = param.get(operator_column_name, None)
+        operators = param.get(entry.operator_param, None)
         if not operators:
             raise QueryOperatorNotFound(f'The query operator of {column_name} not found!')
         if not isinstance(operators, list):
             operators = [operators]
-        for operator in operators:
-            sub_query.append(process_map[operator](getattr(model, table_column_name), value))
-        query.append((or_(*sub_query)))
+        query.append((or_(*[entry.operators[operator](value) for operator in operators])))
     return query
 
 
+@lru_cache(maxsize=1024)
+def _is_operator_param(column_name: str) -> bool:
+    return ExtraFieldType.Comparison_operator in column_name or ExtraFieldType.Matching_pattern in column_name
+
+
+@lru_cache(maxsize=1024)
+def _is_multiple_values_name(column_name: str) -> bool:
+    return ExtraFieldTypePrefix.List in column_name or ExtraFieldTypePrefix.Str in column_name
+
+
+def _is_multiple_values_param(column_name: str, value) -> bool:
+    # the operator is applied to each value, the other list value is a single value, e.g. the value of ARRAY
+    return isinstance(value, (list, tuple)) and _is_multiple_values_name(column_name)
+
+
+def query_param_shape(param: dict) -> tuple:
+    """
+    the shape of the query param, it contains the operators and the number of the values but not the values
+    """
+    shape = []
+    for column_name, value in param.items():
+        if _is_operator_param(column_name):
+            shape.append((column_name, tuple(value) if isinstance(value, list) else value))
+        else:
+            shape.append((column_name, len(value) if _is_multiple_values_param(column_name, value) else None))
+    return tuple(shape)
+
+
+def query_param_values(param: dict, prefix: str) -> dict:
+    """
+    the values of the bind parameters of query_param_placeholder
+    """
+    values = {}
+    for column_name, value in param.items():
+        if _is_operator_param(column_name):
+            continue
+        if _is_multiple_values_param(column_name, value):
+            for index, item in enumerate(value):
+                values[f'{prefix}{column_name}_{index}'] = item
+        else:
+            values[f'{prefix}{column_name}'] = value
+    return values
+
+
+def query_param_placeholder(param: dict, prefix: str, type_of: Callable[[str], Any]) -> dict:
+    """
+    replace the values of the query param by the bind parameters, so that the statement built by
+    find_query_builder/path_query_builder only depends on the shape of the query param
+
+    :param type_of: the sql type of the bind parameter of the query param
+    """
+    placeholder = {}
+    for column_name, value in param.items():
+        if _is_operator_param(column_name):
+            placeholder[column_name] = value
+        elif _is_multiple_values_param(column_name, value):
+            placeholder[column_name] = [bindparam(f'{prefix}{column_name}_{index}', type_=type_of(column_name))
+                                        for index in range(len(value))]
+        else:
+            placeholder[column_name] = bindparam(f'{prefix}{column_name}', type_=type_of(column_name))
+    return placeholder
+
+
 class OrmConfig(BaseConfig):
     orm_mode = True
 
 
-def sqlalchemy_to_pydantic(
+REQUIRE_PRIMARY_KEY_CRUD_METHOD = [CrudMethods.DELETE_ONE.value,
+                                   CrudMethods.FIND_ONE.value,
+                                   CrudMethods.PATCH_ONE.value,
+                                   CrudMethods.POST_REDIRECT_GET.value,
+                                   CrudMethods.UPDATE_ONE.value]
+
+
+def api_parameter_schema_builder(
         db_model: Type, *,
-        crud_methods: List[CrudMethods],
         sql_type: str = SqlType.postgresql,
         exclude_columns: List[str] = None,
         constraints=None,
         foreign_include: Optional[any] = None,
-        exclude_primary_key=False) -> CRUDModel:
+        exclude_primary_key=False,
+        pagination_mode: PaginationMode = PaginationMode.offset,
+        sparse_fieldsets: bool = False) -> ApiParameterSchemaBuilder:
     db_model, _ = convert_table_to_model(db_model)
     if exclude_columns is None:
         exclude_columns = []
     if foreign_include is None:
         foreign_include = {}
+    return ApiParameterSchemaBuilder.of(db_model,
+                                        constraints=constraints,
+                                        exclude_column=exclude_columns,
+                                        sql_type=sql_type,
+                                        foreign_include=foreign_include,
+                                        exclude_primary_key=exclude_primary_key,
+                                        pagination_mode=pagination_mode,
+                                        sparse_fieldsets=sparse_fieldsets)
+
+
+def check_crud_method(model_builder: ApiParameterSchemaBuilder, crud_method: CrudMethods):
+    if crud_method.value in REQUIRE_PRIMARY_KEY_CRUD_METHOD and not model_builder.primary_key_str:
+        raise PrimaryMissing(f"The generation of this API [{crud_method.value}] requires a primary key")
+    if crud_method.value == CrudMethods.FIND_MANY.value and model_builder.pagination_mode == PaginationMode.cursor \
+            and not model_builder.primary_key_str:
+        raise PrimaryMissing(f"The cursor pagination of this API [{crud_method.value}] requires a primary key")
+
+
+def crud_method_to_pydantic(model_builder: ApiParameterSchemaBuilder,
+                            crud_method: CrudMethods) -> RequestResponseModel:
+    """
+    build the request/response models of one crud method
+
+    :param model_builder: the ApiParameterSchemaBuilder of the table
+    """
+    if crud_method.value in model_builder.crud_method_models:
+        return model_builder.crud_method_models[crud_method.value]
+    request_url_param_model = None
+    request_body_model = None
+    response_model = None
+    request_query_model = None
+    foreignListModel = None
+    check_crud_method(model_builder, crud_method)
+    if crud_method.value == CrudMethods.UPSERT_ONE.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.upsert_one()
+    elif crud_method.value == CrudMethods.UPSERT_MANY.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.upsert_many()
+    elif crud_method.value == CrudMethods.BULK_LOAD.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.bulk_load()
+    elif crud_method.value == CrudMethods.CREATE_ONE.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.create_one()
+    elif crud_method.value == CrudMethods.CREATE_MANY.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.create_many()
+    elif crud_method.value == CrudMethods.DELETE_ONE.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.delete_one()
+    elif crud_method.value == CrudMethods.DELETE_MANY.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.delete_many()
+    elif crud_method.value == CrudMethods.FIND_ONE.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model, \
+        relationship_list = model_builder.find_one()
+    elif crud_method.value == CrudMethods.FIND_MANY.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.find_many()
+    elif crud_method.value == CrudMethods.POST_REDIRECT_GET.value:
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.post_redirect_get()
+    elif crud_method.value == CrudMethods.PATCH_ONE.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.patch()
+    elif crud_method.value == CrudMethods.UPDATE_ONE.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.update_one()
+    elif crud_method.value == CrudMethods.UPDATE_MANY.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.update_many()
+    elif crud_method.value == CrudMethods.PATCH_MANY.value:
+        request_url_param_model, \
+        request_query_model, \
+        request_body_model, \
+        response_model = model_builder.patch_many()
+    elif crud_method.value == CrudMethods.FIND_ONE_WITH_FOREIGN_TREE.value:
+        foreignListModel = model_builder.foreign_tree_get_one()
+    elif crud_method.value == CrudMethods.FIND_MANY_WITH_FOREIGN_TREE.value:
+        foreignListModel = model_builder.foreign_tree_get_many()
+
+    request_response_models = {'requestBodyModel': request_body_model,
+                               'responseModel': response_model,
+                               'requestQueryModel': request_query_model,
+                               'requestUrlParamModel': request_url_param_model,
+                               'foreignListModel': foreignListModel}
+    model_builder.crud_method_models[crud_method.value] = RequestResponseModel(**request_response_models)
+    return model_builder.crud_method_models[crud_method.value]
+
+
+def sqlalchemy_to_pydantic(
+        db_model: Type, *,
+        crud_methods: List[CrudMethods],
+        sql_type: str = SqlType.postgresql,
+        exclude_columns: List[str] = None,
+        constraints=None,
+        foreign_include: Optional[any] = None,
+        exclude_primary_key=False,
+        pagination_mode: PaginationMode = PaginationMode.offset,
+        sparse_fieldsets: bool = False) -> CRUDModel:
     request_response_mode_set = {}
-    model_builder = ApiParameterSchemaBuilder(db_model,
-                                              constraints=constraints,
-                                              exclude_column=exclude_columns,
-                                              sql_type=sql_type,
-                                              foreign_include=foreign_include,
-                                              exclude_primary_key=exclude_primary_key)
-
-    REQUIRE_PRIMARY_KEY_CRUD_METHOD = [CrudMethods.DELETE_ONE.value,
-                                       CrudMethods.FIND_ONE.value,
-                                       CrudMethods.PATCH_ONE.value,
-                                       CrudMethods.POST_REDIRECT_GET.value,
-                                       CrudMethods.UPDATE_ONE.value]
+    model_builder = api_parameter_schema_builder(db_model,
+                                                 constraints=constraints,
+                                                 exclude_columns=exclude_columns,
+                                                 sql_type=sql_type,
+                                                 foreign_include=foreign_include,
+                                                 exclude_primary_key=exclude_primary_key,
+                                                 pagination_mode=pagination_mode,
+                                                 sparse_fieldsets=sparse_fieldsets)
     for crud_method in crud_methods:
-        request_url_param_model = None
-        request_body_model = None
-        response_model = None
-        request_query_model = None
-        foreignListModel = None
-        if crud_method.value in REQUIRE_PRIMARY_KEY_CRUD_METHOD and not model_builder.primary_key_str:
-            raise PrimaryMissing(f"The generation of this API [{crud_method.value}] requires a primary key")
-
-        if crud_method.value == CrudMethods.UPSERT_ONE.value:
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.upsert_one()
-        elif crud_method.value == CrudMethods.UPSERT_MANY.value:
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.upsert_many()
-        elif crud_method.value == CrudMethods.CREATE_ONE.value:
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.create_one()
-        elif crud_method.value == CrudMethods.CREATE_MANY.value:
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.create_many()
-        elif crud_method.value == CrudMethods.DELETE_ONE.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.delete_one()
-        elif crud_method.value == CrudMethods.DELETE_MANY.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.delete_many()
-        elif crud_method.value == CrudMethods.FIND_ONE.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model, \
-            relationship_list = model_builder.find_one()
-        elif crud_method.value == CrudMethods.FIND_MANY.value:
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.find_many()
-        elif crud_method.value == CrudMethods.POST_REDIRECT_GET.value:
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.post_redirect_get()
-        elif crud_method.value == CrudMethods.PATCH_ONE.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.patch()
-        elif crud_method.value == CrudMethods.UPDATE_ONE.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.update_one()
-        elif crud_method.value == CrudMethods.UPDATE_MANY.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.update_many()
-        elif crud_method.value == CrudMethods.PATCH_MANY.value:
-            request_url_param_model, \
-            request_query_model, \
-            request_body_model, \
-            response_model = model_builder.patch_many()
-        elif crud_method.value == CrudMethods.FIND_ONE_WITH_FOREIGN_TREE.value:
-            foreignListModel = model_builder.foreign_tree_get_one()
-        elif crud_method.value == CrudMethods.FIND_MANY_WITH_FOREIGN_TREE.value:
-            foreignListModel = model_builder.foreign_tree_get_many()
-
-        request_response_models = {'requestBodyModel': request_body_model,
-                                   'responseModel': response_model,
-                                   'requestQueryModel': request_query_model,
-                                   'requestUrlParamModel': request_url_param_model,
-                                   'foreignListModel': foreignListModel}
-        request_response_model = RequestResponseModel(**request_response_models)
+        request_response_model = crud_method_to_pydantic(model_builder, crud_method)
         request_method = CRUDRequestMapping.get_request_method_by_crud_method(crud_method.value).value
         if request_method not in request_response_mode_set:
             request_response_mode_set[request_method] = {}
@@ -242,6 +407,13 @@ process_type_map = {
     ExtraFieldTypePrefix.Str: ExtraFieldType.Matching_pattern,
 }
 
+process_operator_type_map = {
+    ExtraFieldTypePrefix.List: (ItemComparisonOperators,),
+    ExtraFieldTypePrefix.From: (RangeFromComparisonOperators,),
+    ExtraFieldTypePrefix.To: (RangeToComparisonOperators,),
+    ExtraFieldTypePrefix.Str: (MatchingPatternInStringBase, PGSQLMatchingPatternInString),
+}
+
 process_map = {
     RangeFromComparisonOperators.Greater_than:
         lambda field, value: field > value,
@@ -317,29 +489,163 @@ def table_to_declarative_base(db_model):
     return tmp
 
 
-def group_find_many_join(list_of_dict: List[dict]) -> List[dict]:
-    def group_by_foreign_key(item):
-        tmp = {}
-        for k, v in item.items():
-            if '_foreign' not in k:
-                tmp[k] = v
-        return tmp
-
-    response_list = []
-    for key, group in groupby(list_of_dict, group_by_foreign_key):
-        response = {}
-        for i in group:
-            for k, v in i.items():
-                if '_foreign' in k:
-                    if k not in response:
-                        response[k] = [v]
-                    else:
-                        response[k].append(v)
-            for response_ in response:
-                i.pop(response_, None)
-            result = {**i, **response}
-        response_list.append(result)
-    return response_list
+class RowMapper(object):
+    """
+    shape the row of a select into the response item, the layout is computed once from the keys of the result,
+    the column of a joined table is labeled as <foreign_table>_foreign_____<column> and nested
+    into <foreign_table>_foreign
+    """
+
+    def __init__(self, keys: List[str]):
+        self.total_count_index = None
+        self._columns = []
+        self._foreign_columns = {}
+        for index, key in enumerate(keys):
+            if key == WINDOW_TOTAL_COUNT_KEYWORD:
+                self.total_count_index = index
+            elif '_____' in key:
+                foreign_key, foreign_column = key.split('_____')
+                self._foreign_columns.setdefault(foreign_key, []).append((index, foreign_column))
+            else:
+                self._columns.append((index, key))
+
+    def __call__(self, row) -> dict:
+        item = {key: row[index] for index, key in self._columns}
+        for foreign_key, foreign_columns in self._foreign_columns.items():
+            item[foreign_key] = {foreign_column: row[index] for index, foreign_column in foreign_columns}
+        return item
+
+
+class JoinAggregator(object):
+    """
+    merge the rows of join_foreign_table into one item per parent row in a single pass, the <foreign_table>_foreign
+    of the rows are collected into a list. The parent is identified by the primary key (or all the columns of the
+    parent if there is no primary key) so the rows of a parent do not need to be adjacent.
+
+    It can be fed chunk by chunk, e.g. from a streaming cursor, the parent of the last row is held back
+    since its rows may continue in the next chunk
+    """
+
+    def __init__(self, primary_key: Optional[List[str]] = None):
+        """
+        :param primary_key: the keys of the primary key columns of the parent
+        """
+        self.primary_key = primary_key or []
+        self._items = {}
+        self._last_key = None
+        self._layout = None
+
+    def _layout_of(self, row: dict) -> Tuple[tuple, List[str], List[str]]:
+        # all the rows of a select have the same keys, the layout is computed once
+        keys = tuple(row)
+        if self._layout is None or self._layout[0] != keys:
+            foreign_keys = [key for key in keys if '_foreign' in key]
+            parent_keys = [key for key in self.primary_key if key in row] or \
+                          [key for key in keys if '_foreign' not in key]
+            self._layout = keys, foreign_keys, parent_keys
+        return self._layout
+
+    def feed(self, rows: List[dict]):
+        if not rows:
+            return
+        _, foreign_keys, parent_keys = self._layout_of(rows[0])
+        foreign_key_set = set(foreign_keys)
+        for row in rows:
+            key = tuple(row[parent_key] for parent_key in parent_keys)
+            try:
+                hash(key)
+            except TypeError:
+                # e.g. the value of JSON/ARRAY column in the parent without primary key
+                key = repr(key)
+            item = self._items.get(key, None)
+            if item is None:
+                item = {column: value for column, value in row.items() if column not in foreign_key_set}
+                for foreign_key in foreign_keys:
+                    item[foreign_key] = []
+                self._items[key] = item
+            for foreign_key in foreign_keys:
+                item[foreign_key].append(row[foreign_key])
+            self._last_key = key
+
+    def pop(self, keep_last: bool = False) -> List[dict]:
+        """
+        the merged items in the order of the first row of each parent
+        """
+        held_back = {}
+        if keep_last and self._last_key in self._items:
+            held_back = {self._last_key: self._items.pop(self._last_key)}
+        items = list(self._items.values())
+        self._items = held_back
+        return items
+
+
+def group_find_many_join(list_of_dict: List[dict], primary_key: Optional[List[str]] = None) -> List[dict]:
+    join_aggregator = JoinAggregator(primary_key)
+    join_aggregator.feed(list_of_dict)
+    return join_aggregator.pop()
+
+
+def attach_relations(list_of_dict: List[dict], relations: list) -> List[dict]:
+    """
+    set <foreign_table>_foreign of each parent to the list of its related rows loaded by RelationLoading.select_in,
+    the parent without related row has an empty list
+
+    :param relations: (RelationStatement, the related rows) of each relation
+    """
+    for relation, rows in relations:
+        related_rows = {}
+        for row in rows:
+            related_row = dict(row._mapping)
+            related_rows.setdefault(related_row.pop(RELATION_KEY_KEYWORD), []).append(related_row)
+        for item in list_of_dict:
+            item[relation.name] = related_rows.get(item[relation.parent_key], [])
+    return list_of_dict
+
+
+def encode_cursor(keys: List[str], values: list) -> str:
+    payload = jsonable_encoder({'k': keys, 'v': values}, custom_encoder={Decimal: str})
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor: str, keys: List[str], columns: List[Column]) -> list:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        cursor_keys, values = payload['k'], payload['v']
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(400, 'cursor is not valid')
+    if cursor_keys != keys or len(values) != len(columns):
+        raise InvalidCursor(400, 'cursor does not match the order_by_columns of this request')
+    result = []
+    for column, value in zip(columns, values):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            result.append(value)
+            continue
+        try:
+            result.append(parse_obj_as(Optional[python_type], value))
+        except ValidationError:
+            raise InvalidCursor(400, f'cursor value of {column.key} is not valid')
+    return result
+
+
+def cursor_query_builder(order_by: List[Tuple[Column, bool]], values: list, row_value=True) -> BinaryExpression:
+    """
+    build the seek predicate for keyset pagination, order_by is a list of (column, descending)
+    """
+    directions = {descending for _, descending in order_by}
+    if row_value and len(directions) == 1:
+        columns = tuple_(*[column for column, _ in order_by])
+        if directions.pop():
+            return columns < tuple_(*values)
+        return columns > tuple_(*values)
+    query = []
+    for index, (column, descending) in enumerate(order_by):
+        sub_query = [previous_column == values[previous_index]
+                     for previous_index, (previous_column, _) in enumerate(order_by[:index])]
+        sub_query.append(column < values[index] if descending else column > values[index])
+        query.append(and_(*sub_query))
+    return or_(*query)
 
 
 def path_query_builder(params, model) -> List[Union[BinaryExpression]]:
@@ -0,0 +1,59 @@
+from urllib.parse import urlencode
+
+from sqlalchemy import Boolean, Column, Float, Integer, String, Text, UniqueConstraint
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from tests.test_implementations.test_memory_sqlalchemy.api_async_test import app, Base
+
+
+class BulkLoadTable(Base):
+    __tablename__ = 'test_async_bulk_load_memory'
+    __table_args__ = (
+        UniqueConstraint('code'),
+    )
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String, nullable=False)
+    bool_value = Column(Boolean, nullable=False, default=False)
+    float4_value = Column(Float, nullable=False)
+    text_value = Column(Text)
+
+
+test_bulk_load = crud_router_builder(db_model=BulkLoadTable,
+                                     crud_methods=[CrudMethods.BULK_LOAD, CrudMethods.FIND_MANY],
+                                     prefix="/test_async_bulk_load",
+                                     tags=["test"],
+                                     async_mode=True
+                                     )
+
+[app.include_router(i) for i in [test_bulk_load]]
+
+client = TestClient(app)
+
+
+def chunks(body, size=5):
+    body = body.encode()
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def test_bulk_load_csv():
+    params = urlencode({"columns": ['code', 'bool_value', 'float4_value', 'text_value']}, doseq=True)
+    response = client.post(f'/test_async_bulk_load/bulk_load?{params}',
+                           data=chunks('a,t,0.5,"first\nline"\nb,f,0.5,\n'))
+    assert response.status_code == 201
+    assert response.json() == {'row_count': 2}
+
+    rows = client.get('/test_async_bulk_load').json()
+    assert [(i['code'], i['bool_value'], i['text_value']) for i in rows] == [('a', True, 'first\nline'),
+                                                                             ('b', False, None)]
+
+    response = client.post(f'/test_async_bulk_load/bulk_load?{params}', data=chunks('a,t,0.5,\n'))
+    assert response.status_code == 409
+
+    response = client.post(f'/test_async_bulk_load/bulk_load?{params}&merge=true', data=chunks('a,t,0.6,merged\n'))
+    assert response.status_code == 201
+    rows = client.get('/test_async_bulk_load').json()
+    assert [(i['code'], i['float4_value'], i['text_value']) for i in rows] == [('a', 0.6, 'merged'),
+                                                                               ('b', 0.5, None)]
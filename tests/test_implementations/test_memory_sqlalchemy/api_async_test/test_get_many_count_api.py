@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+import tempfile
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, CountStrategy, SqlType
+
+app = FastAPI()
+
+Base = declarative_base()
+
+database_file = os.path.join(tempfile.mkdtemp(), 'test_count.db')
+engine = create_async_engine(f'sqlite+aiosqlite:///{database_file}', future=True)
+async_session = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+
+async def get_transaction_session() -> AsyncSession:
+    async with async_session() as session:
+        yield session
+
+
+class CountTable(Base):
+    __tablename__ = 'test_count_table'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+
+
+async def create_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+asyncio.get_event_loop().run_until_complete(create_table())
+
+test_create_many = crud_router_builder(db_model=CountTable,
+                                       db_session=get_transaction_session,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_count_creation_many",
+                                       sql_type=SqlType.sqlite,
+                                       async_mode=True,
+                                       tags=["test"])
+
+test_find_many = {count_strategy: crud_router_builder(db_model=CountTable,
+                                                      db_session=get_transaction_session,
+                                                      crud_methods=[CrudMethods.FIND_MANY],
+                                                      prefix=f"/test_get_many_count_{count_strategy}",
+                                                      sql_type=SqlType.sqlite,
+                                                      async_mode=True,
+                                                      count_strategy=count_strategy,
+                                                      tags=["test"])
+                  for count_strategy in CountStrategy}
+
+[app.include_router(i) for i in [test_create_many, *test_find_many.values()]]
+
+client = TestClient(app)
+
+
+def test_count_strategy():
+    data = [{"name": f"name_{i}"} for i in range(9)]
+    response = client.post('/test_count_creation_many', data=json.dumps(data))
+    assert response.status_code == 201
+
+    for count_strategy in CountStrategy:
+        response = client.get(f'/test_get_many_count_{count_strategy}?{urlencode({"limit": 3})}')
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        assert response.headers['x-total-count'] == '9'
+
+    response = client.get(f'/test_get_many_count_{CountStrategy.exact}?'
+                          f'{urlencode({"limit": 3, "name____str": "name_1%"})}')
+    assert response.status_code == 200
+    assert response.headers['x-total-count'] == '1'
@@ -0,0 +1,68 @@
+import json
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.response_cache import ResponseCacheBackend
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class AsyncResponseCacheTable(Base):
+    __tablename__ = 'test_async_response_cache'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    rank = Column(Integer)
+
+
+class AsyncDictBackend(ResponseCacheBackend):
+    # a backend of a shared store implements the async methods only
+    blocking = False
+
+    def __init__(self):
+        self.data = {}
+
+    async def async_get(self, key):
+        return self.data.get(key)
+
+    async def async_set(self, key, value, ttl=None):
+        self.data[key] = value
+
+
+app = FastAPI()
+
+test_async_response_cache = crud_router_builder(db_model=AsyncResponseCacheTable,
+                                                crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY,
+                                                              CrudMethods.CREATE_ONE, CrudMethods.PATCH_ONE],
+                                                response_cache=AsyncDictBackend(),
+                                                async_mode=True,
+                                                prefix="/test_async_response_cache",
+                                                tags=["test"])
+
+app.include_router(test_async_response_cache)
+
+
+def test_async_response_cache_invalidated_by_writes():
+    client = TestClient(app)
+    primary_key = client.post('/test_async_response_cache',
+                              data=json.dumps({"name": "a", "rank": 1})).json()['primary_key']
+    for cache_status in ['MISS', 'HIT']:
+        response = client.get('/test_async_response_cache', params={'name____list': 'a'})
+        assert response.headers['x-cache'] == cache_status
+        assert response.json()[0]['primary_key'] == primary_key
+        response = client.get(f'/test_async_response_cache/{primary_key}')
+        assert response.headers['x-cache'] == cache_status
+
+    response = client.patch(f'/test_async_response_cache/{primary_key}', data=json.dumps({"name": "b", "rank": 2}))
+    assert response.status_code == 200
+    response = client.get(f'/test_async_response_cache/{primary_key}')
+    assert response.headers['x-cache'] == 'MISS'
+    assert response.json()['name'] == 'b'
+    response = client.get('/test_async_response_cache', params={'name____list': 'a'})
+    assert response.status_code == 204
+    assert response.headers['x-cache'] == 'MISS'
+    assert test_async_response_cache.response_cache.stats['hits'] == 2
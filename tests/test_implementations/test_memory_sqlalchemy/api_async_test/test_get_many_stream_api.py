@@ -0,0 +1,133 @@
+import json
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, StreamFormat, CountStrategy, PaginationMode
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, UntitledTable256
+
+test_create_many = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_async_stream_creation_many",
+                                       tags=["test"],
+                                       async_mode=True,
+                                       exclude_columns=['bytea_value']
+                                       )
+
+test_find_many = crud_router_builder(db_model=UntitledTable256,
+                                     crud_methods=[CrudMethods.FIND_MANY],
+                                     prefix="/test_async_get_many_not_stream",
+                                     tags=["test"],
+                                     async_mode=True,
+                                     exclude_columns=['bytea_value']
+                                     )
+
+test_find_many_ndjson = crud_router_builder(db_model=UntitledTable256,
+                                            crud_methods=[CrudMethods.FIND_MANY],
+                                            prefix="/test_async_get_many_ndjson",
+                                            tags=["test"],
+                                            async_mode=True,
+                                            exclude_columns=['bytea_value'],
+                                            stream_format=StreamFormat.ndjson,
+                                            stream_chunk_size=3
+                                            )
+
+test_find_many_json_array = crud_router_builder(db_model=UntitledTable256,
+                                                crud_methods=[CrudMethods.FIND_MANY],
+                                                prefix="/test_async_get_many_json_array",
+                                                tags=["test"],
+                                                async_mode=True,
+                                                exclude_columns=['bytea_value'],
+                                                stream_format=StreamFormat.json_array,
+                                                stream_chunk_size=3,
+                                                count_strategy=CountStrategy.window
+                                                )
+
+test_find_many_cursor = crud_router_builder(db_model=UntitledTable256,
+                                            crud_methods=[CrudMethods.FIND_MANY],
+                                            prefix="/test_async_get_many_ndjson_cursor",
+                                            tags=["test"],
+                                            async_mode=True,
+                                            exclude_columns=['bytea_value'],
+                                            stream_format=StreamFormat.ndjson,
+                                            stream_chunk_size=2,
+                                            pagination_mode=PaginationMode.cursor
+                                            )
+
+[app.include_router(i) for i in [test_create_many, test_find_many, test_find_many_ndjson,
+                                 test_find_many_json_array, test_find_many_cursor]]
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+
+def create_example_data(num):
+    headers = {
+        'accept': 'application/json',
+        'Content-Type': 'application/json',
+    }
+    data = [{"float4_value": 0.6,
+             "int2_value": 11,
+             "int4_value": i,
+             "timestamp_value": "2021-07-23T02:38:24.963Z"} for i in range(num)]
+
+    response = client.post('/test_async_stream_creation_many', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_stream_ndjson_and_json_array():
+    sample_data = create_example_data(10)
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    query_string = urlencode(OrderedDict(primary_key____from=min(primary_key_list),
+                                         primary_key____to=max(primary_key_list)))
+
+    response = client.get(f'/test_async_get_many_not_stream?{query_string}')
+    assert response.status_code == 200
+    expected = response.json()
+    assert len(expected) == 10
+
+    response = client.get(f'/test_async_get_many_ndjson?{query_string}')
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    # the size of the result is unknown before the end of the stream
+    assert 'x-total-count' not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+    response = client.get(f'/test_async_get_many_json_array?{query_string}')
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/json'
+    assert response.headers['x-total-count'] == '10'
+    assert response.json() == expected
+
+    response = client.get(f'/test_async_get_many_ndjson?{query_string}&limit=2')
+    assert response.status_code == 200
+    assert response.headers['x-total-count'] == '2'
+    assert [json.loads(line) for line in response.text.splitlines()] == expected[:2]
+
+
+def test_stream_no_content():
+    response = client.get(f'/test_async_get_many_ndjson?{urlencode({"primary_key____from": -2, "primary_key____to": -1})}')
+    assert response.status_code == 204
+    response = client.get(f'/test_async_get_many_json_array?{urlencode({"primary_key____from": -2, "primary_key____to": -1})}')
+    assert response.status_code == 204
+
+
+def test_stream_cursor_pagination():
+    sample_data = create_example_data(7)
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = OrderedDict(primary_key____from=min(primary_key_list),
+                         primary_key____to=max(primary_key_list),
+                         limit=5)
+    response = client.get(f'/test_async_get_many_ndjson_cursor?{urlencode(params)}')
+    assert response.status_code == 200
+    first_page = [json.loads(line) for line in response.text.splitlines()]
+    params['cursor'] = response.headers['next_cursor']
+    response = client.get(f'/test_async_get_many_ndjson_cursor?{urlencode(params)}')
+    assert response.status_code == 200
+    second_page = [json.loads(line) for line in response.text.splitlines()]
+    assert 'next_cursor' not in response.headers
+    assert [i[primary_key_name] for i in first_page + second_page] == sorted(primary_key_list)
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import uuid
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.types import TypeDecorator
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+engine = create_async_engine('sqlite+aiosqlite://', future=True, connect_args={"check_same_thread": False},
+                             poolclass=StaticPool)
+async_session = sessionmaker(bind=engine, class_=AsyncSession, autocommit=False)
+
+
+async def get_transaction_session():
+    async with async_session() as session:
+        yield session
+
+
+class CoalesceTable(Base):
+    __tablename__ = 'test_coalesce'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    rank = Column(Integer)
+
+
+class GUID(TypeDecorator):
+    """
+    a UUID stored as str, the rows return uuid.UUID while the url gives str
+    """
+    impl = String(36)
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return uuid.UUID
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else str(uuid.UUID(str(value)))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else uuid.UUID(value)
+
+
+class CoalesceUUIDTable(Base):
+    __tablename__ = 'test_coalesce_uuid'
+    id = Column(GUID, primary_key=True)
+    name = Column(String, nullable=False)
+
+
+uuid_ids = [uuid.uuid4() for _ in range(2)]
+
+
+async def create_table(engine):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(CoalesceTable.__table__),
+                                 [{'id': i, 'name': f'name {i}', 'rank': i} for i in range(1, 6)])
+        await connection.execute(insert(CoalesceUUIDTable.__table__),
+                                 [{'id': i, 'name': f'name {index}'} for index, i in enumerate(uuid_ids)])
+
+
+asyncio.get_event_loop().run_until_complete(create_table(engine))
+
+test_coalesce = crud_router_builder(db_session=get_transaction_session,
+                                    db_model=CoalesceTable,
+                                    crud_methods=[CrudMethods.FIND_ONE],
+                                    find_one_coalesce_window=0.05,
+                                    find_one_coalesce_max_keys=3,
+                                    prefix="/test_coalesce",
+                                    tags=["test"])
+test_coalesce_uuid = crud_router_builder(db_session=get_transaction_session,
+                                         db_model=CoalesceUUIDTable,
+                                         crud_methods=[CrudMethods.FIND_ONE],
+                                         find_one_coalesce_window=0.05,
+                                         prefix="/test_coalesce_uuid",
+                                         tags=["test"])
+app = FastAPI()
+[app.include_router(i) for i in [test_coalesce, test_coalesce_uuid]]
+
+
+async def get(path, query_string=b''):
+    scope = {'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'root_path': '',
+             'path': path, 'raw_path': path.encode(), 'query_string': query_string, 'headers': [],
+             'client': ('testclient', 50000), 'server': ('testserver', 80)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status_code = [message for message in messages if message['type'] == 'http.response.start'][0]['status']
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return status_code, json.loads(body) if status_code == 200 else None
+
+
+def concurrent_get(*requests):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        responses = asyncio.get_event_loop().run_until_complete(asyncio.gather(*[get(*i) for i in requests]))
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    return responses, statements
+
+
+def test_coalesce_primary_keys_into_one_query():
+    stats = dict(test_coalesce.find_one_coalescer.stats)
+    responses, statements = concurrent_get(('/test_coalesce/1',), ('/test_coalesce/2',), ('/test_coalesce/2',),
+                                           ('/test_coalesce/99',))
+    assert responses == [(200, {'id': 1, 'name': 'name 1', 'rank': 1}),
+                         (200, {'id': 2, 'name': 'name 2', 'rank': 2}),
+                         (200, {'id': 2, 'name': 'name 2', 'rank': 2}),
+                         (404, None)]
+    statement, = statements
+    assert ' IN ' in statement
+    stats_after = test_coalesce.find_one_coalescer.stats
+    assert stats_after['requests'] - stats['requests'] == 4
+    assert stats_after['queries'] - stats['queries'] == 1
+    assert stats_after['deduplicated'] - stats['deduplicated'] == 1
+
+
+def test_coalesce_max_keys():
+    responses, statements = concurrent_get(*[(f'/test_coalesce/{i}',) for i in range(1, 6)])
+    assert [body['id'] for _, body in responses] == [1, 2, 3, 4, 5]
+    # the first window is full at 3 primary keys
+    assert len(statements) == 2
+
+
+def test_filtered_request_is_not_coalesced():
+    responses, statements = concurrent_get(('/test_coalesce/1', b'rank____to=1'),
+                                           ('/test_coalesce/2', b'rank____to=1'))
+    assert responses == [(200, {'id': 1, 'name': 'name 1', 'rank': 1}), (404, None)]
+    assert len(statements) == 2
+    assert all(' IN ' not in statement for statement in statements)
+
+
+def test_coalesce_uuid_primary_keys():
+    stats = dict(test_coalesce_uuid.find_one_coalescer.stats)
+    responses, statements = concurrent_get(*[(f'/test_coalesce_uuid/{i}',) for i in uuid_ids],
+                                           (f'/test_coalesce_uuid/{str(uuid_ids[0]).upper()}',))
+    assert responses == [(200, {'id': str(uuid_ids[0]), 'name': 'name 0'}),
+                         (200, {'id': str(uuid_ids[1]), 'name': 'name 1'}),
+                         (200, {'id': str(uuid_ids[0]), 'name': 'name 0'})]
+    assert len(statements) == 1
+    assert test_coalesce_uuid.find_one_coalescer.stats['deduplicated'] - stats['deduplicated'] == 1
+
+
+def test_coalesce_by_bind():
+    other_engine = create_async_engine('sqlite+aiosqlite://', future=True,
+                                       connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    asyncio.get_event_loop().run_until_complete(create_table(other_engine))
+    coalescer = test_coalesce.find_one_coalescer
+    stats = dict(coalescer.stats)
+
+    async def find_one(bind, primary_key):
+        async with AsyncSession(bind=bind) as session:
+            if bind is other_engine:
+                await session.execute(CoalesceTable.__table__.update().values(name='other'))
+            result = await coalescer.find_one(session, primary_key, None)
+            return [row.name for row in result.fetchall()]
+
+    async def find_all():
+        return await asyncio.gather(find_one(engine, 1), find_one(other_engine, 2), find_one(engine, 3))
+
+    # the request of the other bind is not served by the session of the first request
+    assert asyncio.get_event_loop().run_until_complete(find_all()) == [['name 1'], ['other'], ['name 3']]
+    assert coalescer.stats['queries'] - stats['queries'] == 2
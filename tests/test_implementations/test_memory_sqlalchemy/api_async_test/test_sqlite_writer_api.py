@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, text
+from sqlalchemy.orm import declarative_base
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.exceptions import SQLiteWriteQueueNotSupportedException
+from src.fastapi_quickcrud.misc.memory_sql import MemorySql
+from src.fastapi_quickcrud.misc.sqlite_writer import QueuedWrite
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class SQLiteWriterTable(Base):
+    __tablename__ = 'test_sqlite_writer'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String, nullable=False, unique=True)
+    rank = Column(Integer)
+
+
+file_db = MemorySql(True, database=os.path.join(tempfile.mkdtemp(), 'test.db'), read_pool_size=2)
+
+sqlite_writer_router = crud_router_builder(memory_db=file_db,
+                                            db_model=SQLiteWriterTable,
+                                            crud_methods=[CrudMethods.CREATE_ONE, CrudMethods.FIND_MANY],
+                                            prefix='/test_sqlite_writer',
+                                            sqlite_write_queue=True,
+                                            tags=["test"])
+app = FastAPI()
+app.include_router(sqlite_writer_router)
+
+
+async def request(method, path, body=b''):
+    scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http', 'root_path': '',
+             'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'headers': [(b'content-type', b'application/json')],
+             'client': ('testclient', 50000), 'server': ('testserver', 80)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status_code = [message for message in messages if message['type'] == 'http.response.start'][0]['status']
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return status_code, json.loads(body) if status_code == 200 else None
+
+
+def test_concurrent_writes_group_commit():
+    # more writes than the threads of the default executor, in one event loop
+    codes = [f'code_{i}' for i in range(40)]
+    # the duplicated code conflicts in the group of the others
+    responses = asyncio.get_event_loop().run_until_complete(asyncio.gather(
+        *[request('POST', '/test_sqlite_writer', json.dumps({"code": code, "rank": 1}).encode())
+          for code in codes + ['code_0']]))
+    assert sorted(status_code for status_code, _ in responses) == [201] * 40 + [409]
+    assert sqlite_writer_router.sqlite_writer.stats['writes'] == 41
+    assert sqlite_writer_router.sqlite_writer.stats['commits'] < 40
+
+    status_code, body = asyncio.get_event_loop().run_until_complete(request('GET', '/test_sqlite_writer'))
+    assert status_code == 200
+    assert sorted(i['code'] for i in body) == sorted(codes)
+
+
+def test_cancelled_write_is_not_queued():
+    writer = sqlite_writer_router.sqlite_writer
+
+    async def cancel_queued_write():
+        await writer._lock.acquire()
+        try:
+            task = asyncio.ensure_future(writer.async_acquire(QueuedWrite(writer)))
+            await asyncio.sleep(0)
+            assert writer._queued == 1
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            writer._lock.release()
+
+    asyncio.get_event_loop().run_until_complete(cancel_queued_write())
+    assert writer._queued == 0
+
+    status_code, _ = asyncio.get_event_loop().run_until_complete(
+        request('POST', '/test_sqlite_writer', json.dumps({"code": "after_cancel", "rank": 1}).encode()))
+    assert status_code == 201
+
+    async def count():
+        async with file_db.read_engine.connect() as connection:
+            return (await connection.execute(text("SELECT count(*) FROM test_sqlite_writer "
+                                                  "WHERE code = 'after_cancel'"))).scalar()
+
+    # committed by its own group
+    assert asyncio.get_event_loop().run_until_complete(count()) == 1
+
+
+def test_not_supported():
+    # StaticPool
+    with pytest.raises(SQLiteWriteQueueNotSupportedException):
+        crud_router_builder(db_model=SQLiteWriterTable,
+                            crud_methods=[CrudMethods.CREATE_ONE],
+                            async_mode=True,
+                            prefix='/test_sqlite_writer_static_pool',
+                            sqlite_write_queue=True)
@@ -0,0 +1,128 @@
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, \
+    ForeignKey, create_engine, event, select
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, WriteMode
+
+app = FastAPI()
+
+Base = declarative_base()
+metadata = Base.metadata
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+executed_statements = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    executed_statements.append(statement)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class Parent(Base):
+    __tablename__ = 'parent_one_to_many_core_delete'
+    id = Column(Integer, primary_key=True)
+    children = relationship("Child", cascade="all, delete-orphan")
+
+
+class Child(Base):
+    __tablename__ = 'child_one_to_many_core_delete'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('parent_one_to_many_core_delete.id'))
+
+
+class PassiveParent(Base):
+    __tablename__ = 'passive_parent_one_to_many_core_delete'
+    id = Column(Integer, primary_key=True)
+    children = relationship("PassiveChild", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class PassiveChild(Base):
+    __tablename__ = 'passive_child_one_to_many_core_delete'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('passive_parent_one_to_many_core_delete.id', ondelete='CASCADE'))
+
+
+crud_route_parent = crud_router_builder(db_session=get_transaction_session,
+                                        db_model=Parent,
+                                        crud_methods=[CrudMethods.DELETE_ONE, CrudMethods.DELETE_MANY],
+                                        prefix="/parent",
+                                        tags=["parent"],
+                                        write_mode=WriteMode.core
+                                        )
+
+crud_route_passive_parent = crud_router_builder(db_session=get_transaction_session,
+                                                db_model=PassiveParent,
+                                                crud_methods=[CrudMethods.DELETE_ONE, CrudMethods.DELETE_MANY],
+                                                prefix="/passive_parent",
+                                                tags=["passive_parent"],
+                                                write_mode=WriteMode.core
+                                                )
+
+[app.include_router(i) for i in [crud_route_parent, crud_route_passive_parent]]
+
+client = TestClient(app)
+
+
+def test_core_delete_fallback_to_orm_cascade():
+    executed_statements.clear()
+    response = client.delete('/parent/1')
+    assert response.status_code == 200
+    assert response.json() == {"id": 1}
+    assert not [i for i in executed_statements if 'RETURNING' in i]
+
+    db = session()
+    assert db.execute(select(Child.id).where(Child.parent_id == 1)).fetchall() == []
+    db.close()
+
+
+def test_core_delete_with_passive_deletes():
+    executed_statements.clear()
+    response = client.delete('/passive_parent?id____list=1&id____list=2')
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1}, {"id": 2}]
+    assert [i for i in executed_statements if i.startswith('DELETE') and 'RETURNING' in i]
+
+    db = session()
+    assert db.execute(select(PassiveChild.id)).fetchall() == [(5,)]
+    db.close()
+
+
+def setup_module(module):
+    Base.metadata.create_all(engine)
+
+    db = session()
+
+    db.add_all([Parent(id=1), Parent(id=2), PassiveParent(id=1), PassiveParent(id=2), PassiveParent(id=3)])
+    db.flush()
+    db.add_all([Child(id=1, parent_id=1), Child(id=2, parent_id=1), Child(id=3, parent_id=2)])
+    db.add_all([PassiveChild(id=1, parent_id=1), PassiveChild(id=2, parent_id=1),
+                PassiveChild(id=3, parent_id=2), PassiveChild(id=4, parent_id=2), PassiveChild(id=5, parent_id=3)])
+
+    db.commit()
+
+
+def teardown_module(module):
+    Base.metadata.drop_all(engine)
@@ -0,0 +1,118 @@
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, \
+    ForeignKey, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, StreamFormat
+
+app = FastAPI()
+
+Base = declarative_base()
+metadata = Base.metadata
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class Parent(Base):
+    __tablename__ = 'parent_one_to_many_stream'
+    id = Column(Integer, primary_key=True)
+    children = relationship("Child")
+
+
+class Child(Base):
+    __tablename__ = 'child_one_to_many_stream'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('parent_one_to_many_stream.id'))
+
+
+crud_route_parent = crud_router_builder(db_session=get_transaction_session,
+                                        db_model=Parent,
+                                        crud_methods=[CrudMethods.FIND_MANY],
+                                        prefix="/parent",
+                                        tags=["parent"],
+                                        stream_format=StreamFormat.json_array,
+                                        stream_chunk_size=1
+                                        )
+
+[app.include_router(i) for i in [crud_route_parent]]
+
+client = TestClient(app)
+
+
+def test_stream_get_many_with_join():
+    headers = {
+        'accept': '*/*',
+        'Content-Type': 'application/json',
+    }
+
+    response = client.get('/parent?join_foreign_table=child_one_to_many_stream', headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "child_one_to_many_stream_foreign": [
+                {
+                    "id": 1,
+                    "parent_id": 1
+                },
+                {
+                    "id": 2,
+                    "parent_id": 1
+                },
+                {
+                    "id": 3,
+                    "parent_id": 1
+                }
+            ],
+            "id": 1
+        },
+        {
+            "child_one_to_many_stream_foreign": [
+                {
+                    "id": 4,
+                    "parent_id": 2
+                }
+            ],
+            "id": 2
+        }
+    ]
+
+
+def test_stream_get_many_without_join():
+    response = client.get('/parent')
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1}, {"id": 2}]
+
+
+def setup_module(module):
+    Parent.__table__.create(engine, checkfirst=True)
+    Child.__table__.create(engine, checkfirst=True)
+
+    db = session()
+
+    db.add(Parent(id=1))
+    db.add(Parent(id=2))
+    db.flush()
+    db.add(Child(id=1, parent_id=1))
+    db.add(Child(id=2, parent_id=1))
+    db.add(Child(id=3, parent_id=1))
+    db.add(Child(id=4, parent_id=2))
+
+    db.commit()
+
+
+def teardown_module(module):
+    Child.__table__.drop(engine, checkfirst=True)
+    Parent.__table__.drop(engine, checkfirst=True)
@@ -0,0 +1,147 @@
+import json
+
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event, select, func
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.batch import batch_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', future=True, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(bind=engine, autocommit=False)
+opened_sessions = []
+
+
+def get_transaction_session():
+    db = session()
+    opened_sessions.append(db)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class BatchParent(Base):
+    __tablename__ = 'test_batch_parent'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
+    counter = Column(Integer, nullable=False, default=0)
+
+
+class BatchChild(Base):
+    __tablename__ = 'test_batch_child'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    parent_id = Column(Integer, ForeignKey('test_batch_parent.id'), nullable=False)
+    name = Column(String, nullable=False)
+
+
+Base.metadata.create_all(engine)
+
+parent_router = crud_router_builder(db_session=get_transaction_session,
+                                    db_model=BatchParent,
+                                    crud_methods=[CrudMethods.CREATE_ONE, CrudMethods.FIND_ONE,
+                                                  CrudMethods.PATCH_ONE],
+                                    batch_path='/batch',
+                                    prefix="/test_batch_parent",
+                                    tags=["test"])
+child_router = crud_router_builder(db_session=get_transaction_session,
+                                   db_model=BatchChild,
+                                   crud_methods=[CrudMethods.CREATE_MANY, CrudMethods.FIND_MANY],
+                                   prefix="/test_batch_child",
+                                   tags=["test"])
+
+app = FastAPI()
+[app.include_router(i) for i in [parent_router, child_router,
+                                 batch_router_builder(routers=[parent_router, child_router],
+                                                      db_session=get_transaction_session,
+                                                      prefix='/test_batch')]]
+
+client = TestClient(app)
+
+
+def count(model):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(model.__table__)).scalar()
+
+
+def test_batch_across_routers():
+    commits = []
+
+    def commit(connection):
+        commits.append(connection)
+
+    event.listen(engine, 'commit', commit)
+    del opened_sessions[:]
+    operations = [{"id": "parent", "method": "POST", "path": "/test_batch_parent",
+                   "body": {"name": "first", "counter": 0}},
+                  {"method": "POST", "path": "/test_batch_child",
+                   "body": [{"parent_id": "${parent.id}", "name": "a"}, {"parent_id": "${parent.id}", "name": "b"}]},
+                  {"method": "PATCH", "path": "/test_batch_parent/${parent.id}",
+                   "body": {"name": "first", "counter": 2}},
+                  {"method": "GET", "path": "/test_batch_child",
+                   "query": {"parent_id____list": ["${parent.id}"]}}]
+    try:
+        response = client.post('/test_batch/batch', data=json.dumps(operations))
+    finally:
+        event.remove(engine, 'commit', commit)
+    assert response.status_code == 200
+    results = response.json()
+    assert [i['status_code'] for i in results] == [201, 201, 200, 200]
+    parent_id = results[0]['body']['id']
+    assert [i['parent_id'] for i in results[1]['body']] == [parent_id, parent_id]
+    assert results[2]['body']['counter'] == 2
+    # the operations read the writes of the earlier operations in the transaction
+    assert sorted(i['name'] for i in results[3]['body']) == ['a', 'b']
+    assert results[3]['headers']['x-total-count'] == '2'
+    assert len(commits) == 1
+    # the operations do not open their sessions
+    assert len(opened_sessions) == 1
+
+
+def test_batch_rolls_back_on_error():
+    parent_count, child_count = count(BatchParent), count(BatchChild)
+    operations = [{"id": "parent", "method": "POST", "path": "/test_batch_parent",
+                   "body": {"name": "second", "counter": 0}},
+                  {"method": "POST", "path": "/test_batch_parent/batch",
+                   "body": {"name": "ignored"}},
+                  {"method": "POST", "path": "/test_batch_child",
+                   "body": [{"parent_id": "${parent.id}", "name": "c"}]}]
+    # the batch route is not a route of the operations
+    response = client.post('/test_batch_parent/batch', data=json.dumps(operations))
+    assert response.status_code == 405
+    assert [i['status_code'] for i in response.json()] == [201, 405]
+    assert count(BatchParent) == parent_count
+
+    operations[1:] = [{"method": "POST", "path": "/test_batch_parent", "body": {"name": "second", "counter": 1}}]
+    response = client.post('/test_batch_parent/batch', data=json.dumps(operations))
+    assert response.status_code == 409
+    assert count(BatchParent) == parent_count
+
+    operations[1:] = [{"method": "POST", "path": "/test_batch_child", "body": [{"parent_id": "${missing.id}"}]}]
+    response = client.post('/test_batch/batch', data=json.dumps(operations))
+    assert response.status_code == 400
+    assert count(BatchParent) == parent_count and count(BatchChild) == child_count
+
+    operations[1:] = [{"method": "POST", "path": "/test_batch_child", "body": [{"parent_id": "${parent.id}"}]}]
+    response = client.post('/test_batch/batch', data=json.dumps(operations))
+    assert response.status_code == 422
+    assert count(BatchParent) == parent_count
+
+
+def test_nested_batch():
+    parent_count = count(BatchParent)
+    operations = [{"method": "POST", "path": "/test_batch_parent",
+                   "body": {"name": "nested", "counter": 0}},
+                  {"method": "POST", "path": "/test_batch_parent/batch",
+                   "body": [{"method": "POST", "path": "/test_batch_parent", "body": {"name": "inner", "counter": 0}}]}]
+    # the batch route of the parent router is not an operation of the batch across the routers, the path only
+    # matches the route of /test_batch_parent/{primary_key}
+    response = client.post('/test_batch/batch', data=json.dumps(operations))
+    assert response.status_code == 405
+    assert [i['status_code'] for i in response.json()] == [201, 405]
+    assert count(BatchParent) == parent_count
@@ -0,0 +1,105 @@
+from urllib.parse import urlencode
+
+from sqlalchemy import BigInteger, Boolean, Column, Date, DateTime, Float, Integer, LargeBinary, String, Text, \
+    UniqueConstraint
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.bulk_load import BlockingStreamReader
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, Base
+
+
+class BulkLoadTable(Base):
+    __tablename__ = 'test_bulk_load_memory'
+    __table_args__ = (
+        UniqueConstraint('code'),
+    )
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String, nullable=False)
+    bool_value = Column(Boolean, nullable=False, default=False)
+    bytea_value = Column(LargeBinary)
+    date_value = Column(Date)
+    float4_value = Column(Float, nullable=False)
+    int8_value = Column(BigInteger, default=99)
+    text_value = Column(Text)
+    timestamp_value = Column(DateTime)
+
+
+test_bulk_load = crud_router_builder(db_model=BulkLoadTable,
+                                     crud_methods=[CrudMethods.BULK_LOAD, CrudMethods.FIND_MANY],
+                                     prefix="/test_bulk_load",
+                                     tags=["test"],
+                                     exclude_columns=['bytea_value']
+                                     )
+
+[app.include_router(i) for i in [test_bulk_load]]
+
+client = TestClient(app)
+
+columns = ['primary_key', 'code', 'bool_value', 'float4_value', 'text_value', 'date_value', 'timestamp_value']
+
+csv_body = ('primary_key,code,bool_value,float4_value,text_value,date_value,timestamp_value\n'
+            '1,a,true,0.5,"multiple\nlines, with comma",2021-07-24,2021-07-24T02:54:53\n'
+            '2,b,f,0.5,,2021-07-25,\n'
+            '3,c,1,0.5,"with ""quote""",,2021-07-26T02:54:53Z\n')
+
+
+def chunks(body, size=7):
+    # the records are split into more than one chunk
+    body = body.encode()
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def test_bulk_load_csv():
+    params = urlencode({"columns": columns, "header": True}, doseq=True)
+    response = client.post(f'/test_bulk_load/bulk_load?{params}', data=chunks(csv_body))
+    assert response.status_code == 201
+    assert response.json() == {'row_count': 3}
+    assert response.headers['x-total-count'] == '3'
+
+    rows = client.get('/test_bulk_load').json()
+    assert [i['primary_key'] for i in rows] == [1, 2, 3]
+    assert [i['bool_value'] for i in rows] == [True, False, True]
+    assert [i['text_value'] for i in rows] == ['multiple\nlines, with comma', None, 'with "quote"']
+    assert [i['date_value'] for i in rows] == ['2021-07-24', '2021-07-25', None]
+    assert [i['timestamp_value'] for i in rows] == ['2021-07-24T02:54:53', None, '2021-07-26T02:54:53']
+    # the default value of the column is applied to the column which is not loaded
+    assert [i['int8_value'] for i in rows] == [99, 99, 99]
+
+    # the unique columns got conflict
+    response = client.post(f'/test_bulk_load/bulk_load?{params}', data=chunks(csv_body))
+    assert response.status_code == 409
+
+    params = urlencode({"columns": ['code', 'float4_value', 'text_value'], "merge": True}, doseq=True)
+    response = client.post(f'/test_bulk_load/bulk_load?{params}', data=chunks('c,0.7,merged\nd,0.8,new\n'))
+    assert response.status_code == 201
+    assert response.json() == {'row_count': 2}
+    rows = client.get('/test_bulk_load').json()
+    assert [(i['code'], i['float4_value'], i['text_value']) for i in rows[2:]] == [('c', 0.7, 'merged'),
+                                                                                   ('d', 0.8, 'new')]
+
+
+def test_bulk_load_invalid_request():
+    params = urlencode({"columns": ['bytea_value']}, doseq=True)
+    response = client.post(f'/test_bulk_load/bulk_load?{params}', data='\\x00\n')
+    assert response.status_code == 400
+
+    params = urlencode({"columns": ['code', 'float4_value']}, doseq=True)
+    response = client.post(f'/test_bulk_load/bulk_load?{params}', data='e,0.5,extra\n')
+    assert response.status_code == 400
+
+    response = client.post(f'/test_bulk_load/bulk_load?{params}', data='e,not a float\n')
+    assert response.status_code == 400
+
+    response = client.post(f'/test_bulk_load/bulk_load?{params}&format=binary', data=b'PGCOPY\n')
+    assert response.status_code == 415
+
+
+def test_blocking_stream_reader_read_size():
+    reader = BlockingStreamReader(iter([b'ab', b'cdef', b'g']))
+    assert reader.read(3) == b'abc'
+    assert reader.read(1) == b'd'
+    assert reader.read() == b'efg'
+    assert reader.read(8192) == b''
@@ -0,0 +1,215 @@
+import datetime
+import json
+from urllib.parse import urlencode
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, JSON, MetaData, Table, create_engine
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import ReturningUpdate, returning_rows
+from src.fastapi_quickcrud.misc.type import CrudMethods, WriteMode
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, UntitledTable256
+
+test_create_many = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_core_write_creation_many",
+                                       tags=["test"],
+                                       exclude_columns=['bytea_value']
+                                       )
+
+test_orm_write = crud_router_builder(db_model=UntitledTable256,
+                                     crud_methods=[CrudMethods.PATCH_MANY, CrudMethods.UPDATE_MANY,
+                                                   CrudMethods.PATCH_ONE, CrudMethods.UPDATE_ONE,
+                                                   CrudMethods.DELETE_ONE, CrudMethods.DELETE_MANY],
+                                     prefix="/test_orm_write",
+                                     tags=["test"],
+                                     exclude_columns=['bytea_value']
+                                     )
+
+test_core_write = crud_router_builder(db_model=UntitledTable256,
+                                      crud_methods=[CrudMethods.PATCH_MANY, CrudMethods.UPDATE_MANY,
+                                                    CrudMethods.PATCH_ONE, CrudMethods.UPDATE_ONE,
+                                                    CrudMethods.DELETE_ONE, CrudMethods.DELETE_MANY],
+                                      prefix="/test_core_write",
+                                      tags=["test"],
+                                      exclude_columns=['bytea_value'],
+                                      write_mode=WriteMode.core
+                                      )
+
+test_orm_create_one = crud_router_builder(db_model=UntitledTable256,
+                                          crud_methods=[CrudMethods.CREATE_ONE],
+                                          prefix="/test_orm_write_creation_one",
+                                          tags=["test"],
+                                          exclude_columns=['bytea_value']
+                                          )
+
+test_core_create_one = crud_router_builder(db_model=UntitledTable256,
+                                           crud_methods=[CrudMethods.CREATE_ONE],
+                                           prefix="/test_core_write_creation_one",
+                                           tags=["test"],
+                                           exclude_columns=['bytea_value'],
+                                           write_mode=WriteMode.core
+                                           )
+
+test_core_create_many = crud_router_builder(db_model=UntitledTable256,
+                                            crud_methods=[CrudMethods.CREATE_MANY],
+                                            prefix="/test_core_write_creation_many_by_core",
+                                            tags=["test"],
+                                            exclude_columns=['bytea_value'],
+                                            write_mode=WriteMode.core
+                                            )
+
+[app.include_router(i) for i in [test_create_many, test_orm_write, test_core_write,
+                                 test_orm_create_one, test_core_create_one, test_core_create_many]]
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+update_data = {"bool_value": True, "char_value": "string", "date_value": "2021-07-24", "float4_value": 1.5,
+               "float8_value": 2.5, "int2_value": 3, "int4_value": 4, "int8_value": 5,
+               "numeric_value": 6, "text_value": "string", "time_value": "18:18:18",
+               "timestamp_value": "2021-07-24T02:54:53.285", "timestamptz_value": "2021-07-24T02:54:53.285+00:00",
+               "varchar_value": "string", "timetz_value": "18:18:18+00:00"}
+
+
+def create_example_data(num):
+    data = [{"float4_value": 0.6,
+             "int2_value": 11,
+             "int4_value": i} for i in range(num)]
+
+    response = client.post('/test_core_write_creation_many', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    return [i[primary_key_name] for i in response.json()]
+
+
+def without_primary_key(data):
+    # the core write mode returns the value stored in database, sqlite drops the time zone
+    return [{key: value for key, value in i.items()
+             if key not in (primary_key_name, 'timestamptz_value', 'timetz_value')} for i in data]
+
+
+def test_patch_many_and_put_many():
+    orm_primary_key_list = create_example_data(3)
+    core_primary_key_list = create_example_data(3)
+    orm_params = urlencode({"primary_key____from": min(orm_primary_key_list),
+                            "primary_key____to": max(orm_primary_key_list),
+                            "int4_value____list": [0, 1]}, doseq=True)
+    core_params = urlencode({"primary_key____from": min(core_primary_key_list),
+                             "primary_key____to": max(core_primary_key_list),
+                             "int4_value____list": [0, 1]}, doseq=True)
+
+    patch_data = {"int2_value": 22, "text_value": "patched"}
+    orm_response = client.patch(f'/test_orm_write?{orm_params}', headers=headers, data=json.dumps(patch_data))
+    core_response = client.patch(f'/test_core_write?{core_params}', headers=headers, data=json.dumps(patch_data))
+    assert orm_response.status_code == core_response.status_code == 200
+    assert orm_response.headers['x-total-count'] == core_response.headers['x-total-count'] == '2'
+    assert without_primary_key(orm_response.json()) == without_primary_key(core_response.json())
+    assert [i[primary_key_name] for i in core_response.json()] == core_primary_key_list[:2]
+
+    orm_response = client.put(f'/test_orm_write?{orm_params}', headers=headers, data=json.dumps(update_data))
+    core_response = client.put(f'/test_core_write?{core_params}', headers=headers, data=json.dumps(update_data))
+    assert orm_response.status_code == core_response.status_code == 200
+    assert without_primary_key(orm_response.json()) == without_primary_key(core_response.json())
+
+    core_params = urlencode({"primary_key____from": -2, "primary_key____to": -1})
+    response = client.patch(f'/test_core_write?{core_params}', headers=headers, data=json.dumps(patch_data))
+    assert response.status_code == 204
+
+
+def test_patch_one_and_put_one():
+    orm_primary_key, core_primary_key = create_example_data(1) + create_example_data(1)
+
+    patch_data = {"int2_value": 33}
+    orm_response = client.patch(f'/test_orm_write/{orm_primary_key}', headers=headers, data=json.dumps(patch_data))
+    core_response = client.patch(f'/test_core_write/{core_primary_key}', headers=headers,
+                                 data=json.dumps(patch_data))
+    assert orm_response.status_code == core_response.status_code == 200
+    assert core_response.json()[primary_key_name] == core_primary_key
+    assert without_primary_key([orm_response.json()]) == without_primary_key([core_response.json()])
+
+    orm_response = client.put(f'/test_orm_write/{orm_primary_key}', headers=headers, data=json.dumps(update_data))
+    core_response = client.put(f'/test_core_write/{core_primary_key}', headers=headers,
+                               data=json.dumps(update_data))
+    assert orm_response.status_code == core_response.status_code == 200
+    assert without_primary_key([orm_response.json()]) == without_primary_key([core_response.json()])
+
+    response = client.put(f'/test_core_write/{core_primary_key}?int2_value____from=100', headers=headers,
+                          data=json.dumps(update_data))
+    assert response.status_code == 404
+
+
+def test_delete_one_and_delete_many():
+    orm_primary_key_list = create_example_data(3)
+    core_primary_key_list = create_example_data(3)
+    orm_params = urlencode({"primary_key____from": min(orm_primary_key_list),
+                            "primary_key____to": max(orm_primary_key_list),
+                            "int4_value____list": [0, 1]}, doseq=True)
+    core_params = urlencode({"primary_key____from": min(core_primary_key_list),
+                             "primary_key____to": max(core_primary_key_list),
+                             "int4_value____list": [0, 1]}, doseq=True)
+
+    orm_response = client.delete(f'/test_orm_write?{orm_params}', headers=headers)
+    core_response = client.delete(f'/test_core_write?{core_params}', headers=headers)
+    assert orm_response.status_code == core_response.status_code == 200
+    assert orm_response.headers['x-total-count'] == core_response.headers['x-total-count'] == '2'
+    assert without_primary_key(orm_response.json()) == without_primary_key(core_response.json())
+    assert [i[primary_key_name] for i in core_response.json()] == core_primary_key_list[:2]
+
+    core_response = client.delete(f'/test_core_write?{core_params}', headers=headers)
+    assert core_response.status_code == 204
+
+    orm_response = client.delete(f'/test_orm_write/{orm_primary_key_list[2]}', headers=headers)
+    core_response = client.delete(f'/test_core_write/{core_primary_key_list[2]}', headers=headers)
+    assert orm_response.status_code == core_response.status_code == 200
+    assert core_response.json()[primary_key_name] == core_primary_key_list[2]
+    assert without_primary_key([orm_response.json()]) == without_primary_key([core_response.json()])
+
+    core_response = client.delete(f'/test_core_write/{core_primary_key_list[2]}', headers=headers)
+    assert core_response.status_code == 404
+
+
+def test_create_one_and_create_many():
+    data = dict(update_data, int4_value=7)
+    orm_response = client.post('/test_orm_write_creation_one', headers=headers, data=json.dumps(data))
+    core_response = client.post('/test_core_write_creation_one', headers=headers, data=json.dumps(data))
+    assert orm_response.status_code == core_response.status_code == 201
+    assert core_response.json()[primary_key_name] == orm_response.json()[primary_key_name] + 1
+    assert without_primary_key([orm_response.json()]) == without_primary_key([core_response.json()])
+
+    # the default value of the column is applied to the omitted field
+    data = [{"float4_value": 0.6, "int2_value": 11, "int4_value": i} for i in range(5)] + \
+           [{"float4_value": 0.7, "int2_value": 12, "int4_value": 5, "text_value": "text"}, data]
+    orm_response = client.post('/test_core_write_creation_many', headers=headers, data=json.dumps(data))
+    core_response = client.post('/test_core_write_creation_many_by_core', headers=headers,
+                                data=json.dumps(data))
+    assert orm_response.status_code == core_response.status_code == 201
+    assert orm_response.headers['x-total-count'] == core_response.headers['x-total-count'] == '7'
+    assert without_primary_key(orm_response.json()) == without_primary_key(core_response.json())
+    orm_primary_key_list = [i[primary_key_name] for i in orm_response.json()]
+    assert [i[primary_key_name] for i in core_response.json()] == \
+           list(range(max(orm_primary_key_list) + 1, max(orm_primary_key_list) + 8))
+
+
+def test_sqlite_returning_types():
+    engine = create_engine('sqlite://', future=True)
+    returning_table = Table('test_returning_types', MetaData(),
+                            Column('id', Integer, primary_key=True),
+                            Column('timestamp_value', DateTime),
+                            Column('json_value', JSON),
+                            Column('bool_value', Boolean))
+    returning_table.create(engine)
+    with engine.begin() as connection:
+        connection.execute(returning_table.insert(), [{'id': 1, 'timestamp_value': datetime.datetime(2021, 7, 23),
+                                                       'json_value': {'a': 1}, 'bool_value': True}])
+        stmt = ReturningUpdate(returning_table).values(bool_value=False).returning(*returning_table.columns)
+        # the values are converted as the values of a select
+        assert returning_rows(connection.execute(stmt)) == [{'id': 1,
+                                                             'timestamp_value': datetime.datetime(2021, 7, 23),
+                                                             'json_value': {'a': 1},
+                                                             'bool_value': False}]
@@ -0,0 +1,110 @@
+import json
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from sqlalchemy import event, text
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.memory_sql import sync_memory_db
+from src.fastapi_quickcrud.misc.type import CrudMethods, CountStrategy
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, UntitledTable256
+
+test_create_many = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_count_creation_many",
+                                       tags=["test"],
+                                       exclude_columns=['bytea_value']
+                                       )
+
+count_routers = {}
+for count_strategy in CountStrategy:
+    count_routers[count_strategy] = crud_router_builder(db_model=UntitledTable256,
+                                                        crud_methods=[CrudMethods.FIND_MANY],
+                                                        prefix=f"/test_get_many_count_{count_strategy}",
+                                                        tags=["test"],
+                                                        exclude_columns=['bytea_value'],
+                                                        count_strategy=count_strategy
+                                                        )
+
+[app.include_router(i) for i in [test_create_many, *count_routers.values()]]
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+
+def create_example_data(num):
+    headers = {
+        'accept': 'application/json',
+        'Content-Type': 'application/json',
+    }
+    data = [{"float4_value": 0.6,
+             "int2_value": 11,
+             "int4_value": 1} for _ in range(num)]
+
+    response = client.post('/test_count_creation_many', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    return response.json()
+
+
+def get_total_count(count_strategy, params=None):
+    query_string = urlencode(OrderedDict(**(params or {}), limit=2))
+    response = client.get(f'/test_get_many_count_{count_strategy}?{query_string}')
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    return int(response.headers['x-total-count'])
+
+
+def test_exact_and_window_count():
+    sample_data = create_example_data(7)
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = {"primary_key____from": min(primary_key_list),
+              "primary_key____to": max(primary_key_list)}
+    assert get_total_count(CountStrategy.exact, params) == 7
+    assert get_total_count(CountStrategy.window, params) == 7
+    assert get_total_count(CountStrategy.exact) == get_total_count(CountStrategy.window)
+
+
+def test_cached_count():
+    sample_data = create_example_data(5)
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = {"primary_key____from": min(primary_key_list)}
+    assert get_total_count(CountStrategy.cached, params) == 5
+    create_example_data(3)
+    assert get_total_count(CountStrategy.cached, params) == 5
+    assert get_total_count(CountStrategy.exact, params) == 8
+
+    params = {"primary_key____from": min(primary_key_list), "int4_value____list": 1}
+    assert get_total_count(CountStrategy.cached, params) == 8
+
+
+def test_estimated_count():
+    sample_data = create_example_data(4)
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = {"primary_key____from": min(primary_key_list)}
+    # sqlite can not estimate a filtered query
+    assert get_total_count(CountStrategy.estimated, params) == get_total_count(CountStrategy.exact, params)
+
+    with sync_memory_db.engine.begin() as connection:
+        connection.execute(text('DROP TABLE IF EXISTS sqlite_stat1'))
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(sync_memory_db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        estimated_count = get_total_count(CountStrategy.estimated)
+    finally:
+        event.remove(sync_memory_db.engine, 'before_cursor_execute', before_cursor_execute)
+    # fallback to exact count before ANALYZE, after the SAVEPOINT of the failed estimate
+    assert estimated_count == get_total_count(CountStrategy.exact)
+    assert any(statement.startswith('ROLLBACK TO SAVEPOINT') for statement in statements)
+
+    with sync_memory_db.engine.begin() as connection:
+        connection.execute(text('ANALYZE'))
+    analyzed_count = get_total_count(CountStrategy.exact)
+    create_example_data(2)
+    assert get_total_count(CountStrategy.estimated) == analyzed_count
+    assert get_total_count(CountStrategy.exact) == analyzed_count + 2
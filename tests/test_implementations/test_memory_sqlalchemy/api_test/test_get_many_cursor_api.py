@@ -0,0 +1,116 @@
+import json
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, PaginationMode
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, UntitledTable256
+
+test_create_many = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_cursor_creation_many",
+                                       tags=["test"],
+                                       exclude_columns=['bytea_value']
+                                       )
+
+test_find_many = crud_router_builder(db_model=UntitledTable256,
+                                     crud_methods=[CrudMethods.FIND_MANY],
+                                     prefix="/test_get_many_by_cursor",
+                                     tags=["test"],
+                                     exclude_columns=['bytea_value'],
+                                     pagination_mode=PaginationMode.cursor
+                                     )
+
+[app.include_router(i) for i in [test_create_many, test_find_many]]
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+
+def create_example_data(int4_values):
+    headers = {
+        'accept': 'application/json',
+        'Content-Type': 'application/json',
+    }
+    data = [{"float4_value": 0.6,
+             "int2_value": 11,
+             "int4_value": int4_value,
+             "timestamp_value": "2021-07-23T02:38:24.963Z"} for int4_value in int4_values]
+
+    response = client.post('/test_cursor_creation_many', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    return response.json()
+
+
+def fetch_all_pages(params, limit):
+    result = []
+    cursor = None
+    while True:
+        page_params = OrderedDict(**params, limit=limit)
+        if cursor:
+            page_params['cursor'] = cursor
+        response = client.get(f'/test_get_many_by_cursor?{urlencode(page_params, doseq=True)}')
+        if response.status_code == 204:
+            break
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        result += page
+        cursor = response.headers.get('next_cursor')
+        if not cursor:
+            break
+    return result
+
+
+def test_cursor_pagination_by_primary_key():
+    sample_data = create_example_data(range(11))
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = {"primary_key____from": min(primary_key_list),
+              "primary_key____to": max(primary_key_list)}
+
+    result = fetch_all_pages(params, limit=3)
+    assert [i[primary_key_name] for i in result] == sorted(primary_key_list)
+
+
+def test_cursor_pagination_with_duplicate_sort_value():
+    sample_data = create_example_data([3, 1, 2, 3, 1, 2, 3, 1, 2, 3])
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = {"primary_key____from": min(primary_key_list),
+              "primary_key____to": max(primary_key_list),
+              "order_by_columns": "int4_value:DESC"}
+
+    result = fetch_all_pages(params, limit=4)
+    expected = sorted(sample_data, key=lambda i: (-i['int4_value'], i[primary_key_name]))
+    assert [i[primary_key_name] for i in result] == [i[primary_key_name] for i in expected]
+
+    params["order_by_columns"] = ["int4_value:DESC", "primary_key:DESC"]
+    result = fetch_all_pages(params, limit=3)
+    expected = sorted(sample_data, key=lambda i: (-i['int4_value'], -i[primary_key_name]))
+    assert [i[primary_key_name] for i in result] == [i[primary_key_name] for i in expected]
+
+
+def test_cursor_pagination_with_mixed_ordering():
+    sample_data = create_example_data([2, 1, 2, 1, 2, 1])
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    params = {"primary_key____from": min(primary_key_list),
+              "primary_key____to": max(primary_key_list),
+              "order_by_columns": ["int4_value:ASC", "primary_key:DESC"]}
+
+    result = fetch_all_pages(params, limit=4)
+    expected = sorted(sample_data, key=lambda i: (i['int4_value'], -i[primary_key_name]))
+    assert [i[primary_key_name] for i in result] == [i[primary_key_name] for i in expected]
+
+
+def test_invalid_cursor():
+    create_example_data([1])
+    response = client.get('/test_get_many_by_cursor?limit=1&cursor=not_a_cursor')
+    assert response.status_code == 400
+
+    response = client.get('/test_get_many_by_cursor?limit=1&order_by_columns=int4_value')
+    assert response.status_code == 200
+    cursor = response.headers['next_cursor']
+    response = client.get(f'/test_get_many_by_cursor?limit=1&cursor={cursor}')
+    assert response.status_code == 400
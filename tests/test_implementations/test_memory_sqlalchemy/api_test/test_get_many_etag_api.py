@@ -0,0 +1,121 @@
+import json
+
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, Integer, String, event
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.memory_sql import sync_memory_db
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class ETagTable(Base):
+    __tablename__ = 'test_etag'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    updated_at = Column(DateTime)
+
+
+app = FastAPI()
+
+crud_methods = [CrudMethods.FIND_ONE, CrudMethods.FIND_MANY, CrudMethods.CREATE_MANY, CrudMethods.PATCH_ONE]
+
+test_payload_etag = crud_router_builder(db_model=ETagTable,
+                                        crud_methods=crud_methods,
+                                        etag=True,
+                                        async_mode=False,
+                                        prefix="/test_payload_etag",
+                                        tags=["test"])
+
+test_version_etag = crud_router_builder(db_model=ETagTable,
+                                        crud_methods=crud_methods,
+                                        etag_column='updated_at',
+                                        async_mode=False,
+                                        prefix="/test_version_etag",
+                                        tags=["test"])
+
+[app.include_router(i) for i in [test_payload_etag, test_version_etag]]
+
+
+def create_rows(client):
+    response = client.post('/test_payload_etag', data=json.dumps([{"name": "etag", "updated_at": "2021-01-01T00:00:00"},
+                                                                 {"name": "etag", "updated_at": "2021-01-02T00:00:00"}]))
+    assert response.status_code == 201
+    return [i['primary_key'] for i in response.json()]
+
+
+def test_payload_etag():
+    client = TestClient(app)
+    first, _ = create_rows(client)
+    for day, url in enumerate(['/test_payload_etag?name____list=etag', f'/test_payload_etag/{first}'], 3):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['etag']
+        assert not etag.startswith('W/')
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+        assert not response.content
+        assert client.get(url, headers={'If-None-Match': '"other", ' + etag}).status_code == 304
+        assert client.get(url, headers={'If-None-Match': '"other"'}).status_code == 200
+
+        response = client.patch(f'/test_payload_etag/{first}', data=json.dumps({"name": "etag",
+                                                                                 "updated_at": f"2021-01-0{day}T00:00:00"}))
+        assert response.status_code == 200
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['etag'] != etag
+
+
+def test_version_etag():
+    client = TestClient(app)
+    first, second = create_rows(client)
+    url = f'/test_version_etag?primary_key____from={first}&primary_key____to={second}'
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers['etag']
+    assert etag.startswith('W/')
+    # another page of the same rows
+    assert client.get(url + '&limit=1').headers['etag'] != etag
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(sync_memory_db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, headers={'If-None-Match': etag})
+    finally:
+        event.remove(sync_memory_db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 304
+    # the rows are not fetched
+    assert len(statements) == 1
+    assert 'max(' in statements[0]
+
+    response = client.patch(f'/test_version_etag/{second}', data=json.dumps({"name": "etag",
+                                                                             "updated_at": "2021-01-03T00:00:00"}))
+    assert response.status_code == 200
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+
+    response = client.get(f'/test_version_etag/{first}')
+    assert client.get(f'/test_version_etag/{first}',
+                      headers={'If-None-Match': response.headers['etag']}).status_code == 304
+
+
+def test_if_none_match_of_missing_row():
+    client = TestClient(app)
+    first, _ = create_rows(client)
+    for prefix in ['/test_payload_etag', '/test_version_etag']:
+        assert client.get(f'{prefix}/{first}', headers={'If-None-Match': '*'}).status_code == 304
+        response = client.get(f'{prefix}/0')
+        assert response.status_code == 404
+        assert client.get(f'{prefix}/0', headers={'If-None-Match': '*'}).status_code == 404
+        # the etag of the version of no row
+        assert client.get(f'{prefix}/0', headers={'If-None-Match': response.headers.get('etag', '*')}).status_code == 404
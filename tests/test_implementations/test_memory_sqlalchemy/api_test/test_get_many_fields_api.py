@@ -0,0 +1,108 @@
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, create_engine, event, insert
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', future=True, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(bind=engine, autocommit=False)
+
+
+def get_transaction_session():
+    db = session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class FieldsParent(Base):
+    __tablename__ = 'test_fields_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    children = relationship('FieldsChild')
+
+
+class FieldsChild(Base):
+    __tablename__ = 'test_fields_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_fields_parent.id'))
+    name = Column(String)
+    payload = Column(Text)
+
+
+Base.metadata.create_all(engine)
+with engine.begin() as connection:
+    connection.execute(insert(FieldsParent.__table__), [{'id': 1, 'name': 'parent', 'body': 'heavy'}])
+    connection.execute(insert(FieldsChild.__table__), [{'id': 1, 'parent_id': 1, 'name': 'a', 'payload': 'heavy'},
+                                                       {'id': 2, 'parent_id': 1, 'name': 'b', 'payload': 'heavy'}])
+
+app = FastAPI()
+
+test_fields = crud_router_builder(db_session=get_transaction_session,
+                                  db_model=FieldsParent,
+                                  crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                  sparse_fieldsets=True,
+                                  default_fields=['name'],
+                                  prefix="/test_fields",
+                                  tags=["test"])
+
+app.include_router(test_fields)
+
+client = TestClient(app)
+
+
+def selected(url, **kwargs):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, **kwargs)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+    select_statement, = statements
+    return response.json(), select_statement.split('FROM')[0]
+
+
+def test_default_fields_of_find_many():
+    response, select_list = selected('/test_fields')
+    assert response == [{'id': 1, 'name': 'parent'}]
+    assert 'body' not in select_list
+
+    response, select_list = selected('/test_fields', params={'fields': ['name', 'body']})
+    assert response == [{'id': 1, 'name': 'parent', 'body': 'heavy'}]
+
+
+def test_fields_of_find_one():
+    response, _ = selected('/test_fields/1')
+    assert response == {'id': 1, 'name': 'parent', 'body': 'heavy'}
+
+    response, select_list = selected('/test_fields/1', params={'fields': 'body'})
+    assert response == {'id': 1, 'body': 'heavy'}
+    assert 'name' not in select_list
+
+
+def test_fields_of_joined_table():
+    response, select_list = selected('/test_fields', params={'join_foreign_table': 'test_fields_child',
+                                                              'fields': ['name', 'test_fields_child.name']})
+    assert response == [{'id': 1, 'name': 'parent',
+                         'test_fields_child_foreign': [{'name': 'a'}, {'name': 'b'}]}]
+    assert 'payload' not in select_list and 'body' not in select_list
+
+    # all the columns of the joined table if none of them is given
+    response, _ = selected('/test_fields/1', params={'join_foreign_table': 'test_fields_child', 'fields': 'name'})
+    assert response['test_fields_child_foreign'][0] == {'id': 1, 'parent_id': 1, 'name': 'a', 'payload': 'heavy'}
+
+
+def test_unknown_fields():
+    assert client.get('/test_fields', params={'fields': 'unknown'}).status_code == 422
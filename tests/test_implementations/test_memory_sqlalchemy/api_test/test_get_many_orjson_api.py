@@ -0,0 +1,84 @@
+import json
+from decimal import Decimal
+from urllib.parse import urlencode
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc import response as response_module
+from src.fastapi_quickcrud.misc.response import ORJSONResponse, orjson_dumps
+from src.fastapi_quickcrud.misc.type import CrudMethods, CountStrategy
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, UntitledTable256
+
+test_create_many = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_orjson_creation_many",
+                                       tags=["test"],
+                                       exclude_columns=['bytea_value']
+                                       )
+
+test_find = crud_router_builder(db_model=UntitledTable256,
+                                crud_methods=[CrudMethods.FIND_MANY, CrudMethods.FIND_ONE],
+                                prefix="/test_get_many_validated",
+                                tags=["test"],
+                                exclude_columns=['bytea_value', 'text_value']
+                                )
+
+test_find_orjson = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.FIND_MANY, CrudMethods.FIND_ONE],
+                                       prefix="/test_get_many_orjson",
+                                       tags=["test"],
+                                       exclude_columns=['bytea_value', 'text_value'],
+                                       count_strategy=CountStrategy.window,
+                                       response_class=ORJSONResponse
+                                       )
+
+[app.include_router(i) for i in [test_create_many, test_find, test_find_orjson]]
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+
+def test_orjson_response_same_as_validated_response():
+    headers = {
+        'accept': 'application/json',
+        'Content-Type': 'application/json',
+    }
+    data = [{"bool_value": True, "char_value": "string", "date_value": "2021-07-24", "float4_value": 0.5,
+             "float8_value": 10.5, "int2_value": 11, "int4_value": 2, "int8_value": 99, "numeric_value": 12.34,
+             "text_value": "excluded", "time_value": "18:18:18", "timestamp_value": "2021-07-24T02:54:53.285",
+             "timestamptz_value": "2021-07-24T02:54:53.285Z", "varchar_value": "string"},
+            {"float4_value": 0.6, "int2_value": 12, "int4_value": 2}]
+    response = client.post('/test_orjson_creation_many', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    primary_key_list = [i[primary_key_name] for i in response.json()]
+
+    params = urlencode({"primary_key____from": min(primary_key_list), "primary_key____to": max(primary_key_list)})
+    validated = client.get(f'/test_get_many_validated?{params}')
+    response = client.get(f'/test_get_many_orjson?{params}')
+    assert response.status_code == 200
+    assert response.headers['x-total-count'] == '2'
+    assert response.json() == validated.json()
+    assert all('text_value' not in i and 'bytea_value' not in i for i in response.json())
+
+    validated = client.get(f'/test_get_many_validated/{primary_key_list[0]}')
+    response = client.get(f'/test_get_many_orjson/{primary_key_list[0]}')
+    assert response.status_code == 200
+    assert response.json() == validated.json()
+
+    response = client.get(f'/test_get_many_orjson/{max(primary_key_list) + 1}')
+    assert response.status_code == 404
+
+
+def test_orjson_dumps_default():
+    # the binary is not utf-8
+    assert json.loads(orjson_dumps({'bytea_value': b'\xff\x00', 'numeric_value': Decimal('1.5')})) == \
+           {'bytea_value': '/wA=', 'numeric_value': 1.5}
+
+
+def test_orjson_not_installed(monkeypatch):
+    monkeypatch.setattr(response_module, 'orjson', None)
+    with pytest.raises(ImportError, match=r'fastapi-quickcrud\[orjson\]'):
+        orjson_dumps({})
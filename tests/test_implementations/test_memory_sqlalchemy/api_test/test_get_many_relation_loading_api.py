@@ -0,0 +1,205 @@
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, Table, create_engine, event, insert
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, RelationLoading, StreamFormat, PaginationMode
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', future=True, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(bind=engine, autocommit=False)
+
+
+def get_transaction_session():
+    db = session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+relation_parent_tag = Table('test_relation_parent_tag', Base.metadata,
+                            Column('parent_id', ForeignKey('test_relation_parent.id'), primary_key=True),
+                            Column('tag_id', ForeignKey('test_relation_tag.id'), primary_key=True))
+
+
+class RelationParent(Base):
+    __tablename__ = 'test_relation_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    comments = relationship('RelationComment')
+    likes = relationship('RelationLike')
+    tags = relationship('RelationTag', secondary=relation_parent_tag)
+
+
+class RelationComment(Base):
+    __tablename__ = 'test_relation_comment'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_relation_parent.id'))
+    text = Column(String)
+
+
+class RelationLike(Base):
+    __tablename__ = 'test_relation_like'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_relation_parent.id'))
+    user = Column(String)
+
+
+class RelationTag(Base):
+    __tablename__ = 'test_relation_tag'
+    id = Column(Integer, primary_key=True)
+    label = Column(String)
+
+
+Base.metadata.create_all(engine)
+with engine.begin() as connection:
+    connection.execute(insert(RelationParent.__table__), [{'id': 1, 'name': 'first'},
+                                                          {'id': 2, 'name': 'second'},
+                                                          {'id': 3, 'name': 'third'}])
+    connection.execute(insert(RelationComment.__table__), [{'id': 1, 'parent_id': 1, 'text': 'a'},
+                                                           {'id': 2, 'parent_id': 1, 'text': 'b'},
+                                                           {'id': 3, 'parent_id': 2, 'text': 'c'}])
+    connection.execute(insert(RelationLike.__table__), [{'id': 1, 'parent_id': 1, 'user': 'x'},
+                                                        {'id': 2, 'parent_id': 1, 'user': 'y'},
+                                                        {'id': 3, 'parent_id': 1, 'user': 'z'}])
+    connection.execute(insert(RelationTag.__table__), [{'id': 1, 'label': 'red'}, {'id': 2, 'label': 'blue'}])
+    connection.execute(insert(relation_parent_tag), [{'parent_id': 1, 'tag_id': 1}, {'parent_id': 1, 'tag_id': 2},
+                                                     {'parent_id': 2, 'tag_id': 2}])
+
+app = FastAPI()
+
+for relation_loading in RelationLoading:
+    app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                           db_model=RelationParent,
+                                           crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                           relation_loading=relation_loading,
+                                           prefix=f"/test_relation_{relation_loading}",
+                                           tags=["test"]))
+app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                       db_model=RelationParent,
+                                       crud_methods=[CrudMethods.FIND_MANY],
+                                       stream_format=StreamFormat.json_array,
+                                       stream_chunk_size=1,
+                                       prefix="/test_relation_join_stream",
+                                       tags=["test"]))
+for relation_loading in [RelationLoading.join, RelationLoading.select_in]:
+    app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                           db_model=RelationParent,
+                                           crud_methods=[CrudMethods.FIND_MANY],
+                                           relation_loading=relation_loading,
+                                           pagination_mode=PaginationMode.cursor,
+                                           prefix=f"/test_relation_cursor_{relation_loading}",
+                                           tags=["test"]))
+
+client = TestClient(app)
+
+join_query = '?join_foreign_table=test_relation_comment&join_foreign_table=test_relation_like'
+
+
+def executed(url):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+    return response.json(), statements
+
+
+def sorted_relations(items):
+    for item in items:
+        for key in [key for key in item if key.endswith('_foreign')]:
+            item[key] = sorted(item[key], key=lambda related: related['id'])
+    return items
+
+
+expected = [{'id': 1, 'name': 'first',
+             'test_relation_comment_foreign': [{'id': 1, 'parent_id': 1, 'text': 'a'},
+                                               {'id': 2, 'parent_id': 1, 'text': 'b'}],
+             'test_relation_like_foreign': [{'id': 1, 'parent_id': 1, 'user': 'x'},
+                                            {'id': 2, 'parent_id': 1, 'user': 'y'},
+                                            {'id': 3, 'parent_id': 1, 'user': 'z'}]},
+            {'id': 2, 'name': 'second',
+             'test_relation_comment_foreign': [{'id': 3, 'parent_id': 2, 'text': 'c'}],
+             'test_relation_like_foreign': []}]
+
+
+def test_join_limits_the_joined_rows():
+    response, _ = executed(f'/test_relation_join{join_query}&limit=2&order_by_columns=id')
+    # the 6 joined rows of the first parent are cut to 2
+    assert len(response) == 1
+    assert len(response[0]['test_relation_like_foreign']) == 2
+
+
+def test_select_in_loads_a_page_of_parents():
+    response, statements = executed(f'/test_relation_select_in{join_query}&limit=2&order_by_columns=id')
+    assert sorted_relations(response) == expected
+    # the parents, then one query per relation
+    assert len(statements) == 3
+    assert all('JOIN' not in statement for statement in statements)
+
+    response, _ = executed(f'/test_relation_select_in{join_query}&order_by_columns=id')
+    assert response[2] == {'id': 3, 'name': 'third',
+                           'test_relation_comment_foreign': [], 'test_relation_like_foreign': []}
+
+
+def test_json_agg_loads_a_page_of_parents():
+    response, statements = executed(f'/test_relation_json_agg{join_query}&limit=2&order_by_columns=id')
+    assert sorted_relations(response) == expected
+    statement, = statements
+    assert 'json_group_array' in statement and 'JOIN' not in statement
+
+
+def test_many_to_many():
+    for relation_loading in [RelationLoading.select_in, RelationLoading.json_agg]:
+        response, _ = executed(f'/test_relation_{relation_loading}?join_foreign_table=test_relation_tag'
+                               f'&order_by_columns=id')
+        assert [sorted(tag['label'] for tag in item['test_relation_tag_foreign']) for item in response] == \
+               [['blue', 'red'], ['blue'], []]
+
+
+def test_find_one():
+    for relation_loading in [RelationLoading.select_in, RelationLoading.json_agg]:
+        response, _ = executed(f'/test_relation_{relation_loading}/1{join_query}')
+        assert sorted_relations([response]) == expected[:1]
+
+
+def test_join_stream_parent_spans_chunks():
+    # the 2 joined rows of the first parent are streamed in 2 chunks
+    query = '?join_foreign_table=test_relation_comment&order_by_columns=name'
+    response, statements = executed(f'/test_relation_join_stream{query}')
+    assert sorted_relations(response) == [{key: value for key, value in item.items()
+                                           if key != 'test_relation_like_foreign'} for item in expected]
+    statement, = statements
+    # the joined rows of a parent are adjacent
+    assert statement.replace('\n', ' ').endswith('ORDER BY test_relation_parent.name ASC, test_relation_parent.id ASC')
+
+
+def test_cursor_pagination_of_parents():
+    # the limit of the join relation_loading counts the joined rows, a page could split the rows of a parent
+    response = client.get('/test_relation_cursor_join?join_foreign_table=test_relation_comment&limit=1')
+    assert response.status_code == 400
+
+    items = []
+    url = '/test_relation_cursor_select_in?join_foreign_table=test_relation_comment&limit=1'
+    response = client.get(url)
+    # a full page has the next cursor, the page after the last parent is empty
+    while response.status_code != 204:
+        assert response.status_code == 200
+        items += response.json()
+        if 'next_cursor' not in response.headers:
+            break
+        response = client.get(f"{url}&cursor={response.headers['next_cursor']}")
+    assert [{key: value for key, value in item.items() if key != 'test_relation_like_foreign'}
+            for item in sorted_relations(items[:2])] == \
+           [{key: value for key, value in item.items() if key != 'test_relation_like_foreign'} for item in expected]
+    assert [item['id'] for item in items] == [1, 2, 3]
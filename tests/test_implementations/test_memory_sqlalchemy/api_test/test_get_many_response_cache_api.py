@@ -0,0 +1,133 @@
+import json
+import time
+
+from fastapi import Body, Depends, FastAPI
+from sqlalchemy import Column, Integer, String, update
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.memory_sql import sync_memory_db
+from src.fastapi_quickcrud.misc.response_cache import MemoryResponseCacheBackend
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class ResponseCacheTable(Base):
+    __tablename__ = 'test_response_cache'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    rank = Column(Integer)
+
+
+class StaleResponseCacheTable(Base):
+    __tablename__ = 'test_stale_response_cache'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+
+
+app = FastAPI()
+
+test_response_cache = crud_router_builder(db_model=ResponseCacheTable,
+                                          crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY,
+                                                        CrudMethods.CREATE_MANY, CrudMethods.PATCH_ONE],
+                                          response_cache=MemoryResponseCacheBackend(),
+                                          async_mode=False,
+                                          prefix="/test_response_cache",
+                                          tags=["test"])
+
+test_stale_response_cache = crud_router_builder(db_model=StaleResponseCacheTable,
+                                                crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY,
+                                                              CrudMethods.CREATE_ONE],
+                                                response_cache=MemoryResponseCacheBackend(),
+                                                response_cache_ttl=0.2,
+                                                response_cache_stale_ttl=60,
+                                                async_mode=False,
+                                                prefix="/test_stale_response_cache",
+                                                tags=["test"])
+
+[app.include_router(i) for i in [test_response_cache, test_stale_response_cache]]
+
+
+def test_response_cache_invalidated_by_writes():
+    client = TestClient(app)
+    response = client.post('/test_response_cache', data=json.dumps([{"name": "a"}, {"name": "b"}]))
+    assert response.status_code == 201
+    first, second = [i['primary_key'] for i in response.json()]
+
+    response = client.get('/test_response_cache', params={'name____list': ['a', 'b', 'c']})
+    assert response.headers['x-cache'] == 'MISS'
+    assert response.headers['x-total-count'] == '2'
+    response = client.get('/test_response_cache', params={'name____list': ['a', 'b', 'c']})
+    assert response.headers['x-cache'] == 'HIT'
+    assert response.headers['x-total-count'] == '2'
+    assert [i['name'] for i in response.json()] == ['a', 'b']
+    # another query
+    assert client.get('/test_response_cache', params={'name____list': 'a'}).headers['x-cache'] == 'MISS'
+
+    for primary_key in [first, second]:
+        assert client.get(f'/test_response_cache/{primary_key}').headers['x-cache'] == 'MISS'
+        assert client.get(f'/test_response_cache/{primary_key}').headers['x-cache'] == 'HIT'
+    response = client.get('/test_response_cache/100000')
+    assert response.status_code == 404
+    assert client.get('/test_response_cache/100000').headers['x-cache'] == 'HIT'
+
+    # invalidate the table and the written primary key
+    response = client.patch(f'/test_response_cache/{first}', data=json.dumps({"name": "c", "rank": 1}))
+    assert response.status_code == 200
+    response = client.get(f'/test_response_cache/{first}')
+    assert response.headers['x-cache'] == 'MISS'
+    assert response.json()['name'] == 'c'
+    assert client.get(f'/test_response_cache/{second}').headers['x-cache'] == 'HIT'
+    response = client.get('/test_response_cache', params={'name____list': ['a', 'b', 'c']})
+    assert response.headers['x-cache'] == 'MISS'
+    assert [i['name'] for i in response.json()] == ['c', 'b']
+
+    # invalidate the table and all the rows
+    client.post('/test_response_cache', data=json.dumps([{"name": "d"}]))
+    assert client.get(f'/test_response_cache/{second}').headers['x-cache'] == 'MISS'
+    assert client.get('/test_response_cache', params={'name____list': ['a', 'b', 'c']}).headers['x-cache'] == 'MISS'
+
+    stats = test_response_cache.response_cache.stats
+    assert stats['hits'] == 5
+    assert stats['misses'] == 9
+
+
+def test_stale_while_revalidate():
+    client = TestClient(app)
+    primary_key = client.post('/test_stale_response_cache', data=json.dumps({"name": "old"})).json()['primary_key']
+    assert client.get(f'/test_stale_response_cache/{primary_key}').headers['x-cache'] == 'MISS'
+
+    # written behind the router
+    with sync_memory_db.engine.begin() as connection:
+        connection.execute(update(StaleResponseCacheTable.__table__).values(name='new'))
+    time.sleep(0.2)
+
+    response = client.get(f'/test_stale_response_cache/{primary_key}')
+    assert response.headers['x-cache'] == 'STALE'
+    assert response.json()['name'] == 'old'
+    # refreshed by the background task of the stale response
+    response = client.get(f'/test_stale_response_cache/{primary_key}')
+    assert response.headers['x-cache'] == 'HIT'
+    assert response.json()['name'] == 'new'
+    assert test_stale_response_cache.response_cache.stats['refreshes'] == 1
+
+
+def test_invalidate_changed_primary_key():
+    response_cache = test_response_cache.response_cache
+    db_session = sync_memory_db.get_memory_db_session
+    update_app = FastAPI()
+
+    # the UPDATE_ONE of a body model which has the primary key
+    @update_app.put('/{primary_key}',
+                    dependencies=[Depends(response_cache.invalidate_dependency(db_session, async_mode=False))])
+    def update_one(primary_key: int, body: dict = Body(...), session=Depends(db_session)):
+        session.commit()
+
+    old_versions = [response_cache._versions({'primary_key': i}) for i in ['1', '2', '3']]
+    response = TestClient(update_app).put('/1', data=json.dumps({"primary_key": 2, "name": "moved"}))
+    assert response.status_code == 200
+    new_versions = [response_cache._versions({'primary_key': i}) for i in ['1', '2', '3']]
+    # the rows of the old and the new primary key
+    assert [old[1] != new[1] for old, new in zip(old_versions, new_versions)] == [True, True, False]
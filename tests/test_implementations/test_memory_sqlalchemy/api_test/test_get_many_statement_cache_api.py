@@ -0,0 +1,105 @@
+import json
+from urllib.parse import urlencode
+
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemySQLITEQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from tests.test_implementations.test_memory_sqlalchemy.api_test import app, UntitledTable256
+
+test_create_many = crud_router_builder(db_model=UntitledTable256,
+                                       crud_methods=[CrudMethods.CREATE_MANY],
+                                       prefix="/test_statement_cache_creation_many",
+                                       tags=["test"],
+                                       exclude_columns=['bytea_value']
+                                       )
+
+test_find_many = crud_router_builder(db_model=UntitledTable256,
+                                     crud_methods=[CrudMethods.FIND_MANY, CrudMethods.FIND_ONE],
+                                     prefix="/test_get_many_statement_cache",
+                                     tags=["test"],
+                                     exclude_columns=['bytea_value']
+                                     )
+
+[app.include_router(i) for i in [test_create_many, test_find_many]]
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+
+def create_example_data(int4_values):
+    headers = {
+        'accept': 'application/json',
+        'Content-Type': 'application/json',
+    }
+    data = [{"float4_value": 0.6,
+             "int2_value": 11,
+             "int4_value": int4_value,
+             "varchar_value": f"cache {int4_value}"} for int4_value in int4_values]
+
+    response = client.post('/test_statement_cache_creation_many', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    return response.json()
+
+
+def find_many(params):
+    response = client.get(f'/test_get_many_statement_cache?{urlencode(params, doseq=True)}')
+    if response.status_code == 204:
+        return []
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_same_shape_different_values():
+    sample_data = create_example_data([101, 102, 103, 104])
+    primary_key_list = [i[primary_key_name] for i in sample_data]
+    min_key = min(primary_key_list)
+    for int4_value in [101, 102, 103, 104]:
+        result = find_many({"primary_key____from": min_key, "int4_value____list": [int4_value], "limit": 10})
+        assert [i['int4_value'] for i in result] == [int4_value]
+
+    result = find_many({"primary_key____from": min_key, "int4_value____list": [101, 103], "limit": 10})
+    assert [i['int4_value'] for i in result] == [101, 103]
+    result = find_many({"primary_key____from": min_key, "int4_value____list": [101, 103, 104], "limit": 1,
+                        "offset": 1})
+    assert [i['int4_value'] for i in result] == [103]
+    result = find_many({"primary_key____from": min_key, "varchar_value____str": ["cache 10%"],
+                        "varchar_value____str_____matching_pattern": ["case_sensitive"]})
+    assert sorted(i['int4_value'] for i in result) == [101, 102, 103, 104]
+
+    for primary_key, int4_value in zip(primary_key_list, [101, 102, 103, 104]):
+        response = client.get(f'/test_get_many_statement_cache/{primary_key}?int4_value____list={int4_value}')
+        assert response.status_code == 200
+        response = client.get(f'/test_get_many_statement_cache/{primary_key}?int4_value____list={int4_value + 1}')
+        assert response.status_code == 404
+
+
+def in_list(values, **kwargs):
+    return {"int4_value____list": values, "int4_value____list_____comparison_operator": "In", **kwargs}
+
+
+def test_statement_cache_by_shape():
+    query_service = SQLAlchemySQLITEQueryService(model=UntitledTable256, async_mode=False,
+                                                 foreign_table_mapping={}, statement_cache_size=2)
+    first = query_service.get_many(join_mode=None, query=in_list([1], limit=10))
+    second = query_service.get_many(join_mode=None, query=in_list([2], limit=20))
+    assert first.statement is second.statement
+    assert first.params != second.params
+    assert query_service.statement_cache.stats['hits'] == 1
+    assert query_service.statement_cache.stats['misses'] == 1
+
+    # the number of the values of the list and the presence of the offset are a part of the shape
+    third = query_service.get_many(join_mode=None, query=in_list([1, 2], limit=10))
+    fourth = query_service.get_many(join_mode=None, query=in_list([1], limit=10, offset=1))
+    assert third.statement is not first.statement
+    assert fourth.statement is not first.statement
+    assert query_service.statement_cache.stats['size'] == 2
+
+    query_service = SQLAlchemySQLITEQueryService(model=UntitledTable256, async_mode=False,
+                                                 foreign_table_mapping={}, statement_cache_size=0)
+    assert query_service.statement_cache is None
+    first = query_service.get_many(join_mode=None, query=in_list([1]))
+    second = query_service.get_many(join_mode=None, query=in_list([1]))
+    assert first.statement is not second.statement
@@ -0,0 +1,114 @@
+import dataclasses
+import json
+import types
+
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from pydantic import BaseModel
+from pydantic.fields import ModelField
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.lazy_route import LazyAPIRoute
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from tests.test_implementations.test_memory_sqlalchemy.api_test import UntitledTable256
+
+app = FastAPI()
+
+router_kwargs = dict(db_model=UntitledTable256,
+                     crud_methods=[CrudMethods.DELETE_ONE, CrudMethods.FIND_ONE, CrudMethods.CREATE_MANY,
+                                   CrudMethods.FIND_MANY, CrudMethods.POST_REDIRECT_GET],
+                     prefix="/test_lazy",
+                     tags=["test"],
+                     exclude_columns=['bytea_value'])
+
+test_lazy = crud_router_builder(lazy=True, **router_kwargs)
+
+app.include_router(test_lazy)
+
+client = TestClient(app)
+
+primary_key_name = UntitledTable256.primary_key_of_table
+
+
+def lazy_routes():
+    return [i for i in app.routes if isinstance(i, LazyAPIRoute)]
+
+
+def test_lazy_routes():
+    # registered in the same order as the eager routes, GET, POST, PUT, PATCH, DELETE
+    assert [(i.path, *i.methods) for i in lazy_routes()] == [('/test_lazy/{primary_key}', 'GET'),
+                                                             ('/test_lazy', 'GET'),
+                                                             ('/test_lazy', 'POST'),
+                                                             ('/test_lazy', 'POST'),
+                                                             ('/test_lazy/{primary_key}', 'DELETE')]
+    assert not any(i.materialized for i in lazy_routes())
+
+    headers = {
+        'accept': 'application/json',
+        'Content-Type': 'application/json',
+    }
+    data = [{"float4_value": 0.5, "int2_value": 11, "int4_value": 1},
+            {"float4_value": 0.6, "int2_value": 12, "int4_value": 2}]
+    response = client.post('/test_lazy', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    primary_key_list = [i[primary_key_name] for i in response.json()]
+    assert [(i.path, *i.methods) for i in lazy_routes() if i.materialized] == [('/test_lazy', 'POST')]
+
+    response = client.get(f'/test_lazy/{primary_key_list[0]}')
+    assert response.status_code == 200
+    assert response.json()['int4_value'] == 1
+    assert 'bytea_value' not in response.json()
+
+    response = client.get('/test_lazy', params={"primary_key____from": min(primary_key_list),
+                                                 "int4_value____list": [2]})
+    assert response.status_code == 200
+    assert [i[primary_key_name] for i in response.json()] == primary_key_list[1:]
+
+    response = client.delete(f'/test_lazy/{primary_key_list[0]}')
+    assert response.status_code == 200
+    response = client.get(f'/test_lazy/{primary_key_list[0]}')
+    assert response.status_code == 404
+
+
+def test_lazy_openapi():
+    paths = client.get('/openapi.json').json()['paths']
+    assert set(paths['/test_lazy']) == {'get', 'post'}
+    assert set(paths['/test_lazy/{primary_key}']) == {'get', 'delete'}
+    assert all(i.materialized for i in lazy_routes())
+
+
+def comparable(value):
+    # the objects built for each route, compared by what they describe
+    if isinstance(value, types.FunctionType):
+        return value.__qualname__
+    if dataclasses.is_dataclass(value):
+        return [(field.name, comparable(field.type)) for field in dataclasses.fields(value)]
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        # the names of the models of the routers of a table are numbered
+        return json.dumps(value.schema())
+    if isinstance(value, ModelField):
+        return value.name, value.required, comparable(value.type_)
+    if isinstance(value, Dependant):
+        return [[(i.name, comparable(i.type_)) for i in params]
+                for params in [value.path_params, value.query_params, value.header_params, value.cookie_params,
+                               value.body_params]] + [len(value.dependencies)]
+    if isinstance(value, list):
+        return [comparable(i) for i in value]
+    return value
+
+
+def test_lazy_route_attributes_as_eager():
+    # the routes of a new router, none is materialized
+    lazy_routes = crud_router_builder(lazy=True, **router_kwargs).routes
+    eager_routes = crud_router_builder(**router_kwargs).routes
+    assert len(lazy_routes) == len(eager_routes)
+    for lazy_route, eager_route in zip(lazy_routes, eager_routes):
+        assert isinstance(lazy_route, LazyAPIRoute) and not lazy_route.materialized
+        # the attributes read by include_router are set on registration, reading any other one builds the route
+        attribute = sorted(set(vars(eager_route)) - set(vars(lazy_route)))[0]
+        assert comparable(getattr(lazy_route, attribute)) == comparable(getattr(eager_route, attribute))
+        assert lazy_route.materialized
+        assert set(vars(lazy_route)) == set(vars(eager_route))
+        for attribute, value in vars(eager_route).items():
+            assert comparable(getattr(lazy_route, attribute)) == comparable(value), attribute
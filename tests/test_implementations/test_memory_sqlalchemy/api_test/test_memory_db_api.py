@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, event, text
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.exceptions import AsyncModeMismatchException
+from src.fastapi_quickcrud.misc.memory_sql import MemorySql
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class MemoryDbTable(Base):
+    __tablename__ = 'test_memory_db'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    rank = Column(Integer)
+
+
+file_db = MemorySql(database=os.path.join(tempfile.mkdtemp(), 'test.db'), read_pool_size=2, cache_size=-4096)
+shared_cache_db = MemorySql(shared_cache=True, read_pool_size=2)
+
+app = FastAPI()
+[app.include_router(crud_router_builder(memory_db=memory_db,
+                                        db_model=MemoryDbTable,
+                                        crud_methods=[CrudMethods.CREATE_ONE, CrudMethods.FIND_ONE],
+                                        prefix=prefix,
+                                        tags=["test"]))
+ for memory_db, prefix in [(file_db, '/test_file_db'), (shared_cache_db, '/test_shared_cache_db')]]
+
+client = TestClient(app)
+
+
+def test_file_db_pragmas():
+    with file_db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert connection.execute(text('PRAGMA synchronous')).scalar() == 1
+        assert connection.execute(text('PRAGMA query_only')).scalar() == 0
+    with file_db.read_engine.connect() as connection:
+        assert connection.execute(text('PRAGMA cache_size')).scalar() == -4096
+        assert connection.execute(text('PRAGMA query_only')).scalar() == 1
+
+
+def test_reads_on_read_connections():
+    for memory_db, prefix in [(file_db, '/test_file_db'), (shared_cache_db, '/test_shared_cache_db')]:
+        response = client.post(prefix, data=json.dumps({"name": "first", "rank": 1}))
+        assert response.status_code == 201
+        primary_key = response.json()['id']
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(memory_db.read_engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = client.get(f'{prefix}/{primary_key}')
+        finally:
+            event.remove(memory_db.read_engine, 'before_cursor_execute', before_cursor_execute)
+        assert response.status_code == 200
+        assert response.json() == {'id': primary_key, 'name': 'first', 'rank': 1}
+        assert len(statements) == 1
+        assert memory_db.engine.pool.size() == 1
+        assert memory_db.read_engine.pool.size() == 2
+
+
+def test_shared_cache_reads_committed():
+    response = client.post('/test_shared_cache_db', data=json.dumps({"name": "committed", "rank": 1}))
+    primary_key = response.json()['id']
+    with shared_cache_db.engine.connect() as connection:
+        connection.execute(text('UPDATE test_memory_db SET name = :name WHERE id = :id'),
+                           {'name': 'uncommitted', 'id': primary_key})
+        threading.Timer(0.2, connection.rollback).start()
+        started = time.monotonic()
+        # the read waits for the write transaction, and does not read its uncommitted row
+        response = client.get(f'/test_shared_cache_db/{primary_key}')
+    assert response.json()['name'] == 'committed'
+    assert time.monotonic() - started >= 0.2
+
+
+def test_memory_db_async_mode_mismatch():
+    with pytest.raises(AsyncModeMismatchException):
+        crud_router_builder(memory_db=shared_cache_db,
+                            async_mode=True,
+                            db_model=MemoryDbTable,
+                            crud_methods=[CrudMethods.FIND_ONE],
+                            prefix='/test_async_mode_mismatch')
@@ -0,0 +1,101 @@
+import os
+
+from fastapi import FastAPI, Depends
+from sqlalchemy import Column, Integer, MetaData, String, Table, text
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.lazy_route import LazyAPIRoute
+from src.fastapi_quickcrud.misc.openapi import openapi_with_fragments
+from src.fastapi_quickcrud.misc.schema_builder import schema_hash, _stable_repr
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from tests.test_implementations.test_memory_sqlalchemy.api_test import UntitledTable256
+
+
+def build_app(include_prefix="/v1", **kwargs):
+    app = FastAPI()
+    router = crud_router_builder(db_model=UntitledTable256,
+                                 crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY, CrudMethods.PATCH_ONE],
+                                 prefix="/test_openapi_cache",
+                                 tags=["test"],
+                                 exclude_columns=['bytea_value'],
+                                 **kwargs)
+    app.include_router(router, prefix=include_prefix)
+
+    @app.get("/ping")
+    def ping():
+        return "pong"
+
+    app.openapi = openapi_with_fragments(app)
+    return app
+
+
+def schema_names(openapi):
+    return set(openapi['components']['schemas'])
+
+
+def test_deterministic_model_names():
+    # the operation ids and the names of the body schemas of a prerendered router are not changed by the prefix of
+    # include_router
+    expected = build_app(include_prefix="").openapi()
+    openapi = build_app(include_prefix="", prerender_openapi=True).openapi()
+    assert schema_names(openapi) == schema_names(expected)
+    assert 'test_build_myself_memory' in str(schema_names(openapi))
+
+    openapi = build_app(prerender_openapi=True).openapi()
+    assert set(openapi['paths']) == {'/v1/test_openapi_cache', '/v1/test_openapi_cache/{primary_key}', '/ping'}
+    assert set(openapi['paths']['/v1/test_openapi_cache/{primary_key}']) == {'get', 'patch'}
+
+
+def test_same_router_twice():
+    # the routers of the same table and options share the models of the same names
+    app = build_app()
+    app.include_router(crud_router_builder(db_model=UntitledTable256,
+                                           crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY,
+                                                         CrudMethods.PATCH_ONE],
+                                           prefix="/test_openapi_cache_2",
+                                           exclude_columns=['bytea_value']))
+    names = schema_names(app.openapi()) - schema_names(build_app().openapi())
+    # only the body of the operation of the second router is added by fastapi
+    assert names == {'Body_partial_update_one_by_primary_key_test_openapi_cache_2__primary_key__patch'}
+
+
+def test_schema_hash_of_defaults_and_comment():
+    def table(**kwargs):
+        return Table('test_schema_hash', MetaData(), Column('id', Integer, primary_key=True),
+                     Column('name', String, **kwargs))
+
+    hashes = {schema_hash(table()),
+              schema_hash(table(default='a')),
+              schema_hash(table(default='b')),
+              schema_hash(table(server_default='a')),
+              schema_hash(table(server_default=text("'b'"))),
+              schema_hash(table(comment='a'))}
+    assert len(hashes) == 6
+    assert schema_hash(table(default='a')) == schema_hash(table(default='a'))
+
+
+def dependency():
+    pass
+
+
+def test_stable_repr_of_router_kwargs():
+    value = _stable_repr({'dependencies': [Depends(dependency)], 'default_response_class': FastAPI,
+                          'callbacks': lambda: None})
+    assert '0x' not in value
+    assert 'test_openapi_cache_api.dependency' in value
+
+
+def test_openapi_cache_dir(tmp_path):
+    openapi = build_app(lazy=True, openapi_cache_dir=str(tmp_path)).openapi()
+    cache_files = os.listdir(tmp_path)
+    assert len(cache_files) == 1
+
+    app = build_app(lazy=True, openapi_cache_dir=str(tmp_path))
+    assert app.openapi()['paths'] == openapi['paths']
+    assert set(app.openapi()['components']['schemas']) == set(openapi['components']['schemas'])
+    # loaded from the cache file, the routes are not built for the openapi
+    assert not any(i.materialized for i in app.routes if isinstance(i, LazyAPIRoute))
+    assert os.listdir(tmp_path) == cache_files
+
+    build_app(lazy=True, openapi_cache_dir=str(tmp_path), pagination_mode='cursor')
+    assert len(os.listdir(tmp_path)) == 2
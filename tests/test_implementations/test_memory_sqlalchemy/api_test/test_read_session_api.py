@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, create_engine, insert
+from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.responses import Response
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.read_session import ReadSessionRouter
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+Base = declarative_base()
+
+
+class ReadSessionTable(Base):
+    __tablename__ = 'test_read_session'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+
+
+# the sqlite files stand in for the primary and the read replicas
+database_dir = tempfile.mkdtemp()
+engines = {name: create_engine(f'sqlite:///{os.path.join(database_dir, name)}.db', future=True,
+                               connect_args={"check_same_thread": False})
+           for name in ['primary', 'replica_1', 'replica_2']}
+for engine in engines.values():
+    Base.metadata.create_all(engine)
+
+
+def session_of(name):
+    session_maker = sessionmaker(bind=engines[name], autocommit=False)
+
+    def get_session():
+        session = session_maker()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    return get_session
+
+
+app = FastAPI()
+
+test_read_session = crud_router_builder(db_model=ReadSessionTable,
+                                        db_session=session_of('primary'),
+                                        read_db_session=[session_of('replica_1'), session_of('replica_2')],
+                                        read_your_writes_seconds=60,
+                                        read_your_writes_secret='secret',
+                                        crud_methods=[CrudMethods.CREATE_ONE, CrudMethods.FIND_ONE,
+                                                      CrudMethods.FIND_MANY],
+                                        sql_type=SqlType.sqlite,
+                                        async_mode=False,
+                                        prefix="/test_read_session",
+                                        tags=["test"])
+
+test_read_session_redirect = crud_router_builder(db_model=ReadSessionTable,
+                                                 db_session=session_of('primary'),
+                                                 read_db_session=session_of('replica_1'),
+                                                 read_your_writes_seconds=60,
+                                                 crud_methods=[CrudMethods.POST_REDIRECT_GET, CrudMethods.FIND_ONE],
+                                                 sql_type=SqlType.sqlite,
+                                                 async_mode=False,
+                                                 prefix="/test_read_session_redirect",
+                                                 tags=["test"])
+
+[app.include_router(i) for i in [test_read_session, test_read_session_redirect]]
+
+read_your_writes_key = 'quickcrud-read-your-writes'
+
+
+def test_read_your_writes():
+    client = TestClient(app)
+    response = client.post('/test_read_session', data=json.dumps({"name": "written"}))
+    assert response.status_code == 201
+    primary_key = response.json()['primary_key']
+    assert read_your_writes_key in response.cookies
+    mark = response.headers[read_your_writes_key]
+
+    # marked by the cookie, read from the primary
+    response = client.get(f'/test_read_session/{primary_key}')
+    assert response.status_code == 200
+    assert response.json()['name'] == 'written'
+
+    # not replicated yet
+    assert TestClient(app).get(f'/test_read_session/{primary_key}').status_code == 404
+    # marked by the header
+    response = TestClient(app).get(f'/test_read_session/{primary_key}', headers={read_your_writes_key: mark})
+    assert response.status_code == 200
+    # the forged marks
+    expire_at, _, signature = mark.partition(':')
+    for forged in ['1e20', f'{float(expire_at) + 1}:{signature}', f'{expire_at}:{"0" * len(signature)}']:
+        response = TestClient(app).get(f'/test_read_session/{primary_key}', headers={read_your_writes_key: forged})
+        assert response.status_code == 404
+    # signed by the secret, but for a longer window than the router's
+    longer_window = Response()
+    ReadSessionRouter(session_of('primary'), session_of('replica_1'),
+                      read_your_writes_seconds=3600,
+                      read_your_writes_secret='secret').mark(longer_window)
+    response = TestClient(app).get(f'/test_read_session/{primary_key}',
+                                   headers={read_your_writes_key: longer_window.headers[read_your_writes_key]})
+    assert response.status_code == 404
+
+
+def test_read_replicas_round_robin():
+    with engines['replica_1'].begin() as connection:
+        connection.execute(insert(ReadSessionTable.__table__).values(primary_key=1000, name='replica'))
+    client = TestClient(app)
+    status_codes = [client.get('/test_read_session/1000').status_code for _ in range(4)]
+    assert sorted(status_codes) == [200, 200, 404, 404]
+    assert status_codes[0] != status_codes[1]
+
+
+def test_post_redirect_get_reads_the_primary():
+    client = TestClient(app)
+    response = client.post('/test_read_session_redirect', data=json.dumps({"name": "redirected"}),
+                           allow_redirects=False)
+    assert response.status_code == 303
+    assert read_your_writes_key in response.cookies
+
+    response = client.post('/test_read_session_redirect', data=json.dumps({"name": "redirected"}),
+                           allow_redirects=True)
+    assert response.status_code == 200
+    assert response.json()['name'] == 'redirected'
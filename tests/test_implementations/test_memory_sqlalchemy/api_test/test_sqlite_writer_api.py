@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, event
+from sqlalchemy.orm import declarative_base
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.memory_sql import MemorySql
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class SQLiteWriterSyncTable(Base):
+    __tablename__ = 'test_sqlite_writer_sync'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String, nullable=False, unique=True)
+    rank = Column(Integer)
+
+
+file_db = MemorySql(database=os.path.join(tempfile.mkdtemp(), 'test.db'), read_pool_size=2)
+
+sqlite_writer_router = crud_router_builder(memory_db=file_db,
+                                           db_model=SQLiteWriterSyncTable,
+                                           crud_methods=[CrudMethods.CREATE_ONE, CrudMethods.FIND_MANY,
+                                                         CrudMethods.PATCH_ONE],
+                                           prefix='/test_sqlite_writer_sync',
+                                           sqlite_write_queue=True,
+                                           tags=["test"])
+app = FastAPI()
+app.include_router(sqlite_writer_router)
+
+
+async def request(method, path, body=b''):
+    scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http', 'root_path': '',
+             'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'headers': [(b'content-type', b'application/json')],
+             'client': ('testclient', 50000), 'server': ('testserver', 80)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status_code = [message for message in messages if message['type'] == 'http.response.start'][0]['status']
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return status_code, json.loads(body) if status_code in (200, 201) else None
+
+
+def test_concurrent_sync_writes_group_commit():
+    threads = set()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT'):
+            threads.add(threading.current_thread().name)
+
+    event.listen(file_db.engine, 'before_cursor_execute', before_cursor_execute)
+    # more writes than the threads of the thread pool, in one event loop
+    codes = [f'code_{i}' for i in range(60)]
+    try:
+        responses = asyncio.get_event_loop().run_until_complete(asyncio.gather(
+            *[request('POST', '/test_sqlite_writer_sync', json.dumps({"code": code, "rank": 1}).encode())
+              for code in codes + ['code_0']]))
+    finally:
+        event.remove(file_db.engine, 'before_cursor_execute', before_cursor_execute)
+    # the duplicated code conflicts in the group of the others
+    assert sorted(status_code for status_code, _ in responses) == [201] * 60 + [409]
+    # the writes run on the writer thread
+    thread, = threads
+    assert thread.startswith('sqlite-writer')
+    assert sqlite_writer_router.sqlite_writer.stats['writes'] == 61
+    assert sqlite_writer_router.sqlite_writer.stats['commits'] < 60
+
+    status_code, body = asyncio.get_event_loop().run_until_complete(request('GET', '/test_sqlite_writer_sync'))
+    assert status_code == 200
+    assert sorted(i['code'] for i in body) == sorted(codes)
+
+
+def test_sync_write_session_per_write():
+    status_code, body = asyncio.get_event_loop().run_until_complete(
+        request('POST', '/test_sqlite_writer_sync', json.dumps({"code": "session", "rank": 1}).encode()))
+    assert status_code == 201
+    primary_key = body['id']
+
+    # the writes of one group run with their own sessions, the patches read the row committed by the other
+    responses = asyncio.get_event_loop().run_until_complete(asyncio.gather(
+        *[request('PATCH', f'/test_sqlite_writer_sync/{primary_key}', json.dumps({"rank": rank}).encode())
+          for rank in (2, 3)]))
+    assert [status_code for status_code, _ in responses] == [200, 200]
+    assert [body['rank'] for _, body in responses] == [2, 3]
@@ -0,0 +1,105 @@
+import json
+import warnings
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemySQLITEQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', future=True, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(bind=engine, autocommit=False)
+
+
+def get_transaction_session():
+    db = session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class UpsertTable(Base):
+    __tablename__ = 'test_upsert'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String, nullable=False, unique=True)
+    name = Column(String)
+    rank = Column(Integer)
+
+
+Base.metadata.create_all(engine)
+
+app = FastAPI()
+[app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                        db_model=UpsertTable,
+                                        crud_methods=[crud_method],
+                                        prefix=prefix,
+                                        tags=["test"]))
+ for crud_method, prefix in [(CrudMethods.UPSERT_ONE, '/test_upsert_one'),
+                             (CrudMethods.UPSERT_MANY, '/test_upsert_many')]]
+
+client = TestClient(app)
+
+
+def test_upsert_one():
+    response = client.post('/test_upsert_one', data=json.dumps({"code": "a", "name": "first", "rank": 1}))
+    assert response.status_code == 201
+    inserted = response.json()
+    assert inserted['code'] == 'a' and inserted['name'] == 'first'
+
+    response = client.post('/test_upsert_one', data=json.dumps({"code": "a", "name": "second", "rank": 2,
+                                                                "on_conflict": {"update_columns": ["name"]}}))
+    assert response.status_code == 201
+    assert response.json() == {'id': inserted['id'], 'code': 'a', 'name': 'second', 'rank': 1}
+
+    response = client.post('/test_upsert_one', data=json.dumps({"code": "a", "name": "third", "rank": 3}))
+    assert response.status_code == 409
+    # the message of the database, as the other dialects
+    assert 'unique constraint' in response.text.lower()
+
+
+def test_upsert_many_in_batches(monkeypatch):
+    client.post('/test_upsert_many', data=json.dumps({"insert": [{"code": "b", "name": "old", "rank": 0}]}))
+    # 4 columns of a row, 2 rows of a batch
+    monkeypatch.setattr(SQLAlchemySQLITEQueryService, 'max_bind_params', 8)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    rows = [{"code": code, "name": "new", "rank": 1} for code in ['b', 'c', 'd', 'e', 'f']]
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.post('/test_upsert_many',
+                               data=json.dumps({"insert": rows, "on_conflict": {"update_columns": ["name", "rank"]}}))
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 201
+    assert [(i['code'], i['name'], i['rank']) for i in response.json()] == [(i['code'], 'new', 1) for i in rows]
+    assert response.headers['x-total-count'] == '5'
+    assert len([i for i in statements if 'ON CONFLICT' in i]) == 3
+
+
+def test_on_conflict_statement_cache_key():
+    query_service = SQLAlchemySQLITEQueryService(model=UpsertTable, async_mode=False, foreign_table_mapping={})
+    with warnings.catch_warnings():
+        # the ON CONFLICT clause of SQLAlchemy warns that it is not cached
+        warnings.simplefilter('error')
+        name_merge = query_service.bulk_insert(columns=['code', 'name'], unique_fields=['code'], merge=True)
+        rank_merge = query_service.bulk_insert(columns=['code', 'rank'], unique_fields=['code'], merge=True)
+        [upsert_stmt] = query_service.upsert(insert_arg={"code": "a", "name": "first",
+                                                         "on_conflict": SimpleNamespace(update_columns=['name'])},
+                                             unique_fields=['code'])
+        assert name_merge._generate_cache_key() is not None
+        assert name_merge._generate_cache_key() == query_service.bulk_insert(columns=['code', 'name'],
+                                                                             unique_fields=['code'],
+                                                                             merge=True)._generate_cache_key()
+        assert name_merge._generate_cache_key() != rank_merge._generate_cache_key()
+        assert upsert_stmt._post_values_clause._generate_cache_key() is not None
@@ -0,0 +1,96 @@
+import asyncio
+from urllib.parse import urlencode
+
+from sqlalchemy import BigInteger, Boolean, Column, Date, Float, Integer, String, Text, UniqueConstraint, text
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from tests.test_implementations.test_sqlalchemy.api_test_async import app, Base, engine, get_transaction_session
+
+
+class BulkLoadTable(Base):
+    __tablename__ = 'test_bulk_load_copy_async'
+    __table_args__ = (
+        UniqueConstraint('code'),
+    )
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String, nullable=False)
+    bool_value = Column(Boolean, nullable=False, server_default=text("false"))
+    date_value = Column(Date)
+    float4_value = Column(Float, nullable=False)
+    int8_value = Column(BigInteger, server_default=text("99"))
+    text_value = Column(Text)
+
+
+def setup_module(module):
+    async def create_table():
+        async with engine.begin() as conn:
+            await conn.run_sync(BulkLoadTable.__table__.create, checkfirst=True)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(create_table())
+
+
+def teardown_module(module):
+    async def drop_table():
+        async with engine.begin() as conn:
+            await conn.run_sync(BulkLoadTable.__table__.drop, checkfirst=True)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(drop_table())
+
+
+test_bulk_load = crud_router_builder(db_session=get_transaction_session,
+                                     db_model=BulkLoadTable,
+                                     async_mode=True,
+                                     crud_methods=[CrudMethods.BULK_LOAD, CrudMethods.FIND_MANY],
+                                     prefix="/test_bulk_load_copy_async",
+                                     tags=["test"]
+                                     )
+
+[app.include_router(i) for i in [test_bulk_load]]
+
+client = TestClient(app)
+
+columns = ['primary_key', 'code', 'bool_value', 'float4_value', 'text_value', 'date_value']
+
+csv_body = ('primary_key,code,bool_value,float4_value,text_value,date_value\n'
+            '1,a,true,0.5,"multiple\nlines, with comma",2021-07-24\n'
+            '2,b,f,0.5,,2021-07-25\n'
+            '3,c,1,0.5,"with ""quote""",\n')
+
+
+def chunks(body, size=7):
+    # the records are split into more than one chunk
+    body = body.encode()
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def test_bulk_load_csv_by_copy():
+    params = urlencode({"columns": columns, "header": True}, doseq=True)
+    response = client.post(f'/test_bulk_load_copy_async/bulk_load?{params}', data=chunks(csv_body))
+    assert response.status_code == 201
+    assert response.json() == {'row_count': 3}
+    assert response.headers['x-total-count'] == '3'
+
+    rows = client.get('/test_bulk_load_copy_async').json()
+    assert [i['primary_key'] for i in rows] == [1, 2, 3]
+    assert [i['bool_value'] for i in rows] == [True, False, True]
+    assert [i['text_value'] for i in rows] == ['multiple\nlines, with comma', None, 'with "quote"']
+    assert [i['date_value'] for i in rows] == ['2021-07-24', '2021-07-25', None]
+    assert [i['int8_value'] for i in rows] == [99, 99, 99]
+
+    # the unique columns got conflict
+    response = client.post(f'/test_bulk_load_copy_async/bulk_load?{params}', data=chunks(csv_body))
+    assert response.status_code == 409
+
+    params = urlencode({"columns": ['code', 'float4_value', 'text_value'], "merge": True}, doseq=True)
+    response = client.post(f'/test_bulk_load_copy_async/bulk_load?{params}',
+                           data=chunks('c,0.7,merged\nd,0.8,new\n'))
+    assert response.status_code == 201
+    assert response.json() == {'row_count': 2}
+    rows = client.get('/test_bulk_load_copy_async').json()
+    assert [(i['code'], i['float4_value'], i['text_value']) for i in rows[2:]] == [('c', 0.7, 'merged'),
+                                                                                   ('d', 0.8, 'new')]